@@ -48,6 +48,14 @@ DATABASES = {
     "default": env.db("DATABASE_URL", default="postgres:///survey_app_repo")
 }
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Read replicas, views decorated with read_from_replica read from a random one
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[])):
+    DATABASES[f"replica_{index}"] = env.db_url_config(url)
+    DATABASE_REPLICAS.append(f"replica_{index}")
+DATABASE_ROUTERS = ["survey_app_repo.utils.db_router.ReplicaRouter"]
+# Seconds a client reads from primary after writing, must be longer than replication lag
+DATABASE_REPLICA_STICKY_SECONDS = env.int("DATABASE_REPLICA_STICKY_SECONDS", default=10)
 
 # URLS
 # ------------------------------------------------------------------------------
@@ -130,6 +138,8 @@ AUTH_PASSWORD_VALIDATORS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "survey_app_repo.utils.instrumentation.ServerTimingMiddleware",
+    "survey_app_repo.utils.db_router.StickyPrimaryMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -270,3 +280,35 @@ SOCIALACCOUNT_ADAPTER = "survey_app_repo.users.adapters.SocialAccountAdapter"
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Keep answers of in-progress survey responses in cache and write them to database when
+# response is completed, cache must not evict keys before flush_answer_buffers runs
+SURVEY_BUFFER_ANSWERS = env.bool("SURVEY_BUFFER_ANSWERS", default=False)
+# Seconds buffered answers are kept in cache
+SURVEY_ANSWER_BUFFER_TIMEOUT = env.int("SURVEY_ANSWER_BUFFER_TIMEOUT", default=7 * 24 * 60 * 60)
+# Seconds cached page fragments live, fragments are keyed on content version so this only
+# controls how long renderings of old versions take space in cache
+SURVEY_FRAGMENT_CACHE_TIMEOUT = env.int("SURVEY_FRAGMENT_CACHE_TIMEOUT", default=24 * 60 * 60)
+# Response counts of the survey list are shown up to this many seconds late, so its cached
+# rendering and ETag aren't replaced by every completed response
+SURVEY_LIST_COUNT_DELAY = env.int("SURVEY_LIST_COUNT_DELAY", default=60)
+# Number of latest requests of each view kept for request stats percentiles
+REQUEST_STATS_WINDOW = env.int("REQUEST_STATS_WINDOW", default=1000)
+# Seconds after last update an incomplete response is abandoned, respondent tokens expire then
+# and delete_abandoned_responses removes it
+SURVEY_ABANDONED_RESPONSE_AGE = env.int("SURVEY_ABANDONED_RESPONSE_AGE", default=30 * 24 * 60 * 60)
+# Where background tasks run, "database" queues them for run_task_worker and "thread" runs
+# them on a thread pool of the web process
+SURVEY_TASK_BACKEND = env("SURVEY_TASK_BACKEND", default="database")
+SURVEY_TASK_THREADS = env.int("SURVEY_TASK_THREADS", default=2)
+# Run tasks right away in the enqueueing code instead of after commit
+SURVEY_TASKS_EAGER = env.bool("SURVEY_TASKS_EAGER", default=False)
+# Failed queued tasks are retried after SURVEY_TASK_RETRY_DELAY seconds, doubling each attempt
+SURVEY_TASK_MAX_ATTEMPTS = env.int("SURVEY_TASK_MAX_ATTEMPTS", default=5)
+SURVEY_TASK_RETRY_DELAY = env.int("SURVEY_TASK_RETRY_DELAY", default=60)
+# Admin change lists of tables with more rows than this show the planner's estimate instead of
+# counting them
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int("ADMIN_ESTIMATED_COUNT_THRESHOLD", default=100000)
+# Result snapshots only count responses completed this many seconds ago, so responses whose
+# completing transaction was still open during a refresh aren't skipped by its high-water mark
+# Snapshots are refreshed by the refresh_result_snapshots command, scheduled with cron
+SURVEY_SNAPSHOT_SETTLE_SECONDS = env.int("SURVEY_SNAPSHOT_SETTLE_SECONDS", default=60)
@@ -58,3 +58,4 @@ INSTALLED_APPS += ["django_extensions"]  # noqa F405
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+SURVEY_TASK_BACKEND = env("SURVEY_TASK_BACKEND", default="thread")
@@ -15,6 +15,12 @@ SECRET_KEY = env(
 # https://docs.djangoproject.com/en/dev/ref/settings/#test-runner
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# DATABASES
+# ------------------------------------------------------------------------------
+# Second sqlite database for replica routing tests, views only use it when a test adds it to
+# DATABASE_REPLICAS
+DATABASES["replica"] = {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}  # noqa F405
+
 # CACHES
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#caches
@@ -49,3 +55,7 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+# TestCase never commits so tasks would never run after commit
+SURVEY_TASKS_EAGER = True
+# Counts of survey list are expected to change right away
+SURVEY_LIST_COUNT_DELAY = 0
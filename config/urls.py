@@ -6,6 +6,7 @@ from django.views.generic import TemplateView
 from django.views import defaults as default_views
 
 from survey_app_repo.survey import views as survey_views
+from survey_app_repo.utils.views import request_stats_view
 
 urlpatterns = [
     path("", survey_views.surveys, name="home"),
@@ -14,11 +15,13 @@ urlpatterns = [
     ),
     # Django Admin, use {% url 'admin:index' %}
     path(settings.ADMIN_URL, admin.site.urls),
+    path("stats/requests/", request_stats_view, name="request_stats"),
     # User management
     path("users/", include("survey_app_repo.users.urls", namespace="users")),
     path("accounts/", include("allauth.urls")),
     # Survey
-    path("survey/", include("survey_app_repo.survey.urls", namespace="survey"))
+    path("survey/", include("survey_app_repo.survey.urls", namespace="survey")),
+    path("api/", include("survey_app_repo.survey.api.urls", namespace="api")),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 if settings.DEBUG:
@@ -2,6 +2,7 @@ import pytest
 from django.conf import settings
 from django.test import RequestFactory
 
+from survey_app_repo.survey.dataset import generate_dataset
 from survey_app_repo.users.tests.factories import UserFactory
 
 
@@ -18,3 +19,9 @@ def user() -> settings.AUTH_USER_MODEL:
 @pytest.fixture
 def request_factory() -> RequestFactory:
     return RequestFactory()
+
+
+@pytest.fixture
+def synthetic_dataset(db):
+    """Generates synthetic surveys, responses and answers, takes options of generate_dataset"""
+    return generate_dataset
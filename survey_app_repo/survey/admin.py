@@ -1,5 +1,16 @@
-from django.contrib import admin
-from .models import Survey, Question
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from survey_app_repo.utils.pagination import EstimatedCountPaginator, KeysetPaginationMixin
+
+from .importer import CSV_COLUMNS, SurveyImportError, get_format, import_surveys
+from .models import Survey, Question, SurveyResponse, ResponseText, ResponseChoice, SurveyResultSnapshot
 
 admin.site.site_header = 'Survey App Admin'
 
@@ -9,13 +20,90 @@ class QuestionInline(admin.StackedInline):
     extra = 0
 
 
+class SurveyResultSnapshotInline(admin.TabularInline):
+    '''Counts of choice answers read from snapshot instead of answers of responses'''
+    model = SurveyResultSnapshot
+    fields = ['question', 'value', 'count']
+    readonly_fields = fields
+    can_delete = False
+    max_num = 0
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('question')
+
+
+class SurveyImportForm(forms.Form):
+    file = forms.FileField(help_text='JSON with one survey and its questions per line or a list of surveys, '
+                                     f'or CSV with columns {", ".join(CSV_COLUMNS)}')
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        self.cleaned_data['file_format'] = get_format(upload.name)
+        if self.cleaned_data['file_format'] is None:
+            raise forms.ValidationError('Only .json, .jsonl, .ndjson and .csv files can be imported')
+        return upload
+
+
 class SurveyAdmin(admin.ModelAdmin):
-    list_display = ['title', 'created_date', 'published']
+    list_display = ['title', 'created_date', 'published', 'completed_response_count', 'snapshot_pending_count',
+                    'snapshot_refreshed_date']
     list_filter = ['created_date', 'published']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = ['completed_response_count', 'snapshot_completed_until', 'snapshot_response_count',
+                       'snapshot_refreshed_date']
+
+    inlines = [QuestionInline, SurveyResultSnapshotInline]
+
+    def get_urls(self):
+        return [path('import/', self.admin_site.admin_view(self.import_view), name='survey_survey_import')] + \
+            super().get_urls()
 
-    inlines = [QuestionInline]
+    def import_view(self, request):
+        '''Import surveys with many questions from a file instead of question inline forms'''
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        form = SurveyImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            lines = io.TextIOWrapper(form.cleaned_data['file'], encoding='utf-8-sig', newline='')
+            try:
+                survey_count, question_count = import_surveys(lines, form.cleaned_data['file_format'])
+            except SurveyImportError as error:
+                form.add_error('file', error.errors)
+            else:
+                self.message_user(request, f'Imported {survey_count} surveys with {question_count} questions',
+                                  messages.SUCCESS)
+                return redirect('admin:survey_survey_changelist')
+
+        context = dict(self.admin_site.each_context(request), title='Import surveys', form=form,
+                       opts=self.model._meta)
+        return TemplateResponse(request, 'admin/survey/survey/import.html', context)
 
 
 admin.site.register(Survey, SurveyAdmin)
 
 admin.site.register(Question)
+
+
+class SurveyResponseAdmin(KeysetPaginationMixin, admin.ModelAdmin):
+    list_display = ['pk', 'survey', 'user', 'completed_date', 'updated_date']
+    list_select_related = ['survey', 'user']
+    raw_id_fields = ['survey', 'user']
+
+
+class ResponseTextAdmin(KeysetPaginationMixin, admin.ModelAdmin):
+    list_display = ['pk', 'survey_response', 'question', 'response']
+    list_select_related = ['survey_response', 'question']
+    raw_id_fields = ['survey_response', 'question']
+
+
+class ResponseChoiceAdmin(KeysetPaginationMixin, admin.ModelAdmin):
+    list_display = ['pk', 'survey_response', 'question', 'value']
+    list_select_related = ['survey_response', 'question']
+    raw_id_fields = ['survey_response', 'question']
+
+
+admin.site.register(SurveyResponse, SurveyResponseAdmin)
+admin.site.register(ResponseText, ResponseTextAdmin)
+admin.site.register(ResponseChoice, ResponseChoiceAdmin)
@@ -0,0 +1,88 @@
+'''Descriptive statistics of numeric answers of surveys
+
+Statistics are computed from SurveyResultSnapshot, which counts answers of completed responses
+per (question, value), so reading them is one query over at most scale rows per question
+however many responses a survey has. Mean, std and percentiles are weighted by counts with
+numpy, percentiles interpolate linearly between answers like numpy.percentile does. Like
+choice results they cover responses counted by the last refresh_result_snapshots run and
+are cached until the snapshot is refreshed or questions change.
+'''
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Question, QuestionTypes, SurveyResultSnapshot
+from .versioning import get_survey_version
+
+NUMERIC_QUESTION_TYPES = [QuestionTypes.RATING.name]
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def get_cache_key(survey_id, version, refreshed_date):
+    refreshed = refreshed_date.timestamp() if refreshed_date else None
+    return f'survey:{survey_id}:statistics:{version}:{refreshed}'
+
+
+def load_counts(question_ids):
+    '''returns (question_ids, values, counts) arrays of snapshot rows of questions, sorted by question and value'''
+    rows = SurveyResultSnapshot.objects.filter(question_id__in=question_ids, count__gt=0) \
+                                       .order_by('question_id', 'value') \
+                                       .values_list('question_id', 'value', 'count')
+    counts = np.array(list(rows), dtype=np.int64).reshape(-1, 3)
+    return counts[:, 0], counts[:, 1], counts[:, 2]
+
+
+def weighted_percentile(values, counts, percents):
+    '''percentiles of values sorted ascending each given counts times, without repeating them'''
+    positions = np.asarray(percents, dtype=float) / 100 * (counts.sum() - 1)
+    lower = np.floor(positions)
+    # value at rank r is the first one whose cumulative count exceeds r
+    cumulative = np.cumsum(counts)
+    below = values[np.searchsorted(cumulative, lower, side='right')]
+    above = values[np.searchsorted(cumulative, np.minimum(lower + 1, cumulative[-1] - 1), side='right')]
+    return below + (above - below) * (positions - lower)
+
+
+def describe(values, counts, scale):
+    '''statistics of answers with each of values given counts times, histogram counts values from 1 to scale'''
+    total = int(counts.sum())
+    statistics = dict(count=total, mean=None, std=None, min=None, max=None, median=None,
+                      percentiles=None, histogram=None)
+    if not total:
+        return statistics
+
+    # rows of several questions are sorted by question, not by value
+    order = np.argsort(values, kind='stable')
+    values, counts = values[order], counts[order]
+    mean = np.average(values, weights=counts)
+    percentiles = weighted_percentile(values, counts, PERCENTILES + [50])
+    histogram = np.bincount(values, weights=counts, minlength=scale + 1)[1:]
+    statistics.update(mean=float(mean), std=float(np.sqrt(np.average((values - mean) ** 2, weights=counts))),
+                      min=int(values[0]), max=int(values[-1]), median=float(percentiles[-1]),
+                      percentiles={str(percent): float(value) for percent, value in zip(PERCENTILES, percentiles)},
+                      histogram=[dict(value=value, count=int(count)) for value, count in enumerate(histogram, 1)])
+    return statistics
+
+
+def compute_statistics(survey):
+    questions = list(Question.objects.filter(survey=survey, question_type__in=NUMERIC_QUESTION_TYPES))
+    question_ids, values, counts = load_counts([question.pk for question in questions])
+
+    # rows are sorted by question so rows of each question are a contiguous slice
+    starts = np.searchsorted(question_ids, [question.pk for question in questions], side='left')
+    ends = np.searchsorted(question_ids, [question.pk for question in questions], side='right')
+    scale = max((len(question.get_choices()) for question in questions), default=0)
+    return dict(survey=describe(values, counts, scale),
+                questions=[dict(question=question.pk, title=question.question,
+                                **describe(values[start:end], counts[start:end], len(question.get_choices())))
+                           for question, start, end in zip(questions, starts, ends)])
+
+
+def get_statistics(survey):
+    '''returns statistics of numeric answers counted in result snapshot of survey, cached until it is refreshed'''
+    key = get_cache_key(survey.pk, get_survey_version(survey.pk), survey.snapshot_refreshed_date)
+    statistics = cache.get(key)
+    if statistics is None:
+        statistics = compute_statistics(survey)
+        cache.set(key, statistics, settings.SURVEY_FRAGMENT_CACHE_TIMEOUT)
+    return statistics
@@ -0,0 +1,105 @@
+'''Write-behind buffer keeping answers of in-progress responses in cache
+
+When SURVEY_BUFFER_ANSWERS is on, answers are written to cache, one key per question of a
+response so concurrent writes never overwrite each other, and are flushed to their answer
+models with one upsert per model when the response is completed or by flush_answer_buffers command.
+'''
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SurveyResponse, get_answer_model
+from .question_index import get_question_index
+
+
+def is_enabled():
+    return settings.SURVEY_BUFFER_ANSWERS
+
+
+def get_answer_key(survey_response_id, question_id):
+    return f'survey:response:{survey_response_id}:answer:{question_id}'
+
+
+def get_updated_key(survey_response_id):
+    return f'survey:response:{survey_response_id}:updated'
+
+
+def store_answers(answers):
+    '''Write answers to buffer if enabled otherwise upsert them in database'''
+    if not is_enabled():
+        SurveyResponse.objects.filter(pk__in={answer.survey_response_id for answer in answers}) \
+                              .update(updated_date=timezone.now())
+        return upsert_answers(answers)
+
+    timeout = settings.SURVEY_ANSWER_BUFFER_TIMEOUT
+    cache.set_many({get_answer_key(answer.survey_response_id, answer.question_id): getattr(answer, answer.answer_field)
+                    for answer in answers}, timeout)
+    cache.set_many({get_updated_key(answer.survey_response_id): time.time() for answer in answers}, timeout)
+    return len(answers)
+
+
+def upsert_answers(answers):
+    '''Upsert answers of any answer models with one statement per model'''
+    answers_of_model = defaultdict(list)
+    for answer in answers:
+        answers_of_model[type(answer)].append(answer)
+    return sum(model.objects.upsert(model_answers) for model, model_answers in answers_of_model.items())
+
+
+def get_buffered_answer(survey_response, question):
+    '''returns unsaved answer in buffer, None if question is not answered in buffer'''
+    if not is_enabled() or survey_response is None:
+        return None
+
+    missing = object()
+    value = cache.get(get_answer_key(survey_response.pk, question.pk), missing)
+    if value is missing:
+        return None
+    model = get_answer_model(question.question_type)
+    return model(question=question, survey_response=survey_response, **{model.answer_field: value})
+
+
+def flush_answers(survey_responses):
+    '''Upsert buffered answers of given (survey_response_id, survey_id) pairs in one bulk write
+
+    buffer is cleared only after the write is committed, returns number of answers written
+    '''
+    keys = {}
+    for survey_response_id, survey_id in survey_responses:
+        for question_id, question_type in get_question_index(survey_id):
+            keys[get_answer_key(survey_response_id, question_id)] = (survey_response_id, question_id,
+                                                                     get_answer_model(question_type))
+
+    buffered = cache.get_many(keys.keys())
+    answers = []
+    for key, value in buffered.items():
+        survey_response_id, question_id, model = keys[key]
+        answers.append(model(survey_response_id=survey_response_id, question_id=question_id,
+                             **{model.answer_field: value}))
+    upsert_answers(answers)
+
+    flushed_keys = list(buffered.keys()) + [get_updated_key(pk) for pk, _ in survey_responses]
+    transaction.on_commit(lambda: cache.delete_many(flushed_keys))
+    return len(answers)
+
+
+def get_idle_responses(survey_responses, idle_seconds):
+    '''filter (survey_response_id, survey_id) pairs whose buffer was last written before idle_seconds'''
+    survey_responses = list(survey_responses)
+    updated = cache.get_many([get_updated_key(pk) for pk, _ in survey_responses])
+    cutoff = time.time() - idle_seconds
+    return [(pk, survey_id) for pk, survey_id in survey_responses
+            if updated.get(get_updated_key(pk), cutoff) < cutoff]
+
+
+def get_active_responses(survey_responses, idle_seconds):
+    '''filter (survey_response_id, survey_id) pairs whose buffer was written in last idle_seconds'''
+    survey_responses = list(survey_responses)
+    updated = cache.get_many([get_updated_key(pk) for pk, _ in survey_responses])
+    cutoff = time.time() - idle_seconds
+    return [(pk, survey_id) for pk, survey_id in survey_responses
+            if updated.get(get_updated_key(pk), cutoff - 1) >= cutoff]
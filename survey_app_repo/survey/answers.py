@@ -0,0 +1,52 @@
+'''Bulk persistence of answers to survey questions'''
+from .forms import FormRegistar
+from .models import Question
+from .answer_buffer import store_answers
+
+
+def validate_answers(survey_id, answers):
+    '''Validate answers to questions of survey with forms registered in FormRegistar
+
+    answers is a dict of form data keyed by question id, returns (answers, errors) with unsaved
+    answers not yet attached to a response and dict of errors keyed by question id
+    '''
+    questions = Question.objects.filter(survey_id=survey_id, pk__in=answers.keys())
+    questions = {question.pk: question for question in questions}
+    form_registar = FormRegistar.get_instance()
+
+    errors = {}
+    instances = []
+    for question_id, data in answers.items():
+        question = questions.get(question_id)
+        if question is None:
+            errors[question_id] = {'__all__': [{'message': "Question doesn't exists", 'code': 'invalid'}]}
+            continue
+
+        FormClass = form_registar.get_form_class_for(question.question_type)
+        form = FormClass.get_answer_form(question, None, data)
+        if form is None:
+            continue
+        if not form.is_valid():
+            errors[question_id] = form.errors.get_json_data()
+            continue
+        instances.append(form.save(commit=False))
+    return instances, errors
+
+
+def store_response_answers(survey_response, instances):
+    '''Store answers returned by validate_answers to survey_response with one upsert'''
+    for instance in instances:
+        instance.survey_response = survey_response
+    store_answers(instances)
+
+
+def save_answers(survey_response, answers):
+    '''Validate answers with forms registered in FormRegistar and store them with one upsert
+
+    answers is a dict of form data keyed by question id, returns dict of errors keyed by
+    question id, nothing is written if any answer is invalid
+    '''
+    instances, errors = validate_answers(survey_response.survey_id, answers)
+    if not errors:
+        store_response_answers(survey_response, instances)
+    return errors
@@ -0,0 +1,10 @@
+'''Keyset pagination for api lists'''
+from rest_framework.pagination import CursorPagination
+
+
+class PkCursorPagination(CursorPagination):
+    '''Pages through rows in pk order with an opaque cursor, page cost doesn't grow with its position'''
+    ordering = 'pk'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
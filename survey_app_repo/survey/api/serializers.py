@@ -0,0 +1,123 @@
+'''Serializers of survey api'''
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from ..forms import FormRegistar
+from ..models import Survey, Question, SurveyResponse, ResponseText, ResponseChoice, get_answer_model
+
+MAX_BULK_ANSWERS = 1000
+
+
+class QuestionSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Question
+        fields = ['id', 'survey', 'question', 'description', 'question_type', 'choices']
+
+
+class QuestionFilterSerializer(serializers.Serializer):
+    '''Query parameters filtering questions'''
+    survey = serializers.IntegerField(required=False)
+
+
+class SurveyResponseFilterSerializer(QuestionFilterSerializer):
+    '''Query parameters filtering survey responses'''
+    completed = serializers.BooleanField(required=False)
+
+
+class SurveySerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Survey
+        fields = ['id', 'title', 'summary', 'created_date', 'published', 'published_date', 'completed_response_count']
+
+
+class SurveyDetailSerializer(SurveySerializer):
+    '''Survey with its questions, queryset must prefetch questions'''
+    questions = QuestionSerializer(many=True, read_only=True)
+
+    class Meta(SurveySerializer.Meta):
+        fields = SurveySerializer.Meta.fields + ['questions']
+
+
+class ResponseTextSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = ResponseText
+        fields = ['question', 'response']
+
+
+class ResponseChoiceSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = ResponseChoice
+        fields = ['question', 'value']
+
+
+class SurveyResponseSerializer(serializers.ModelSerializer):
+    '''Survey response with its answers, queryset must prefetch responsetext_set and responsechoice_set'''
+    answers = ResponseTextSerializer(source='responsetext_set', many=True, read_only=True)
+    choice_answers = ResponseChoiceSerializer(source='responsechoice_set', many=True, read_only=True)
+
+    class Meta:
+        model = SurveyResponse
+        fields = ['id', 'survey', 'user', 'completed_date', 'updated_date', 'answers', 'choice_answers']
+
+
+class AnswerListSerializer(serializers.ListSerializer):
+
+    def to_internal_value(self, data):
+        '''check all questions and responses exist together in two queries instead of two per answer
+
+        errors are listed per answer like errors of fields of answers
+        '''
+        if isinstance(data, list) and len(data) > MAX_BULK_ANSWERS:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'At most {MAX_BULK_ANSWERS} answers can be written at once']})
+        attrs = super().to_internal_value(data)
+
+        responses, completed = {}, set()
+        for pk, survey_id, completed_date in SurveyResponse.objects \
+                .filter(pk__in={answer['survey_response'] for answer in attrs}) \
+                .values_list('pk', 'survey_id', 'completed_date'):
+            responses[pk] = survey_id
+            if completed_date is not None:
+                completed.add(pk)
+        form_registar = FormRegistar.get_instance()
+        questions, text_questions = {}, set()
+        for pk, survey_id, question_type in Question.objects \
+                .filter(pk__in={answer['question'] for answer in attrs}) \
+                .values_list('pk', 'survey_id', 'question_type'):
+            questions[pk] = survey_id
+            if form_registar.takes_answer(question_type) and get_answer_model(question_type) is ResponseText:
+                text_questions.add(pk)
+
+        errors = []
+        for answer in attrs:
+            error = {}
+            if answer['survey_response'] not in responses:
+                error['survey_response'] = ["Survey response doesn't exists"]
+            elif answer['survey_response'] in completed:
+                error['survey_response'] = ['Survey response is already completed']
+            if answer['question'] not in questions:
+                error['question'] = ["Question doesn't exists"]
+            elif answer['survey_response'] in responses and \
+                    questions[answer['question']] != responses[answer['survey_response']]:
+                error['question'] = ['Question is not of survey of survey response']
+            elif answer['question'] not in text_questions:
+                error['question'] = ['Question is not answered with text']
+            errors.append(error)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class AnswerSerializer(serializers.Serializer):
+    '''Answer written in bulk, relations are plain ids so they are validated together by list serializer'''
+    survey_response = serializers.IntegerField()
+    question = serializers.IntegerField()
+    response = serializers.CharField(max_length=400, allow_blank=True, allow_null=True, required=False)
+
+    class Meta:
+        list_serializer_class = AnswerListSerializer
@@ -0,0 +1,15 @@
+'''url patterns for survey api'''
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+
+from .views import SurveyViewSet, QuestionViewSet, SurveyResponseViewSet, BulkAnswerView
+
+router = DefaultRouter()
+router.register('surveys', SurveyViewSet)
+router.register('questions', QuestionViewSet)
+router.register('responses', SurveyResponseViewSet)
+
+app_name = "api"
+urlpatterns = [
+    path("answers/", BulkAnswerView.as_view(), name="answers"),
+] + router.urls
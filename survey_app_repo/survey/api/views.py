@@ -0,0 +1,89 @@
+'''Views of survey api'''
+from rest_framework import permissions, status, viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from survey_app_repo.utils.db_router import read_from_replica
+
+from ..models import Survey, Question, SurveyResponse, ResponseText
+from ..answer_buffer import store_answers
+from .pagination import PkCursorPagination
+from .serializers import (SurveySerializer, SurveyDetailSerializer, QuestionSerializer, SurveyResponseSerializer,
+                          AnswerSerializer, QuestionFilterSerializer, SurveyResponseFilterSerializer)
+
+
+class ReplicaReadMixin:
+    '''Read only api views read from replica unless client has to stick to primary'''
+
+    def dispatch(self, request, *args, **kwargs):
+        return read_from_replica(super().dispatch)(request, *args, **kwargs)
+
+
+class FilterMixin:
+    '''Views filtered by query parameters validated with filter_serializer_class, invalid ones are a 400'''
+    filter_serializer_class = None
+
+    def get_filters(self):
+        # plain dict so a missing boolean isn't read as an unchecked html checkbox
+        serializer = self.filter_serializer_class(data=self.request.query_params.dict())
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+
+class SurveyViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    '''Surveys, detail includes questions'''
+    queryset = Survey.objects.all()
+    pagination_class = PkCursorPagination
+
+    def get_queryset(self):
+        if self.action == 'retrieve':
+            return self.queryset.prefetch_related('questions')
+        return self.queryset
+
+    def get_serializer_class(self):
+        return SurveyDetailSerializer if self.action == 'retrieve' else SurveySerializer
+
+
+class QuestionViewSet(FilterMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    '''Questions, filtered to a survey with ?survey=<id>'''
+    queryset = Question.objects.all()
+    serializer_class = QuestionSerializer
+    filter_serializer_class = QuestionFilterSerializer
+    pagination_class = PkCursorPagination
+
+    def get_queryset(self):
+        queryset = self.queryset
+        filters = self.get_filters()
+        if 'survey' in filters:
+            queryset = queryset.filter(survey=filters['survey'])
+        return queryset
+
+
+class SurveyResponseViewSet(FilterMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    '''Responses with answers for staff, filtered with ?survey=<id> and ?completed=true|false'''
+    queryset = SurveyResponse.objects.prefetch_related('responsetext_set', 'responsechoice_set')
+    serializer_class = SurveyResponseSerializer
+    filter_serializer_class = SurveyResponseFilterSerializer
+    pagination_class = PkCursorPagination
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        queryset = self.queryset
+        filters = self.get_filters()
+        if 'survey' in filters:
+            queryset = queryset.filter(survey=filters['survey'])
+        if 'completed' in filters:
+            queryset = queryset.filter(completed_date__isnull=not filters['completed'])
+        return queryset
+
+
+class BulkAnswerView(APIView):
+    '''Write a list of answers of incomplete responses with one upsert, existing answers are replaced'''
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        serializer = AnswerSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        answers = [ResponseText(survey_response_id=answer['survey_response'], question_id=answer['question'],
+                                response=answer.get('response')) for answer in serializer.validated_data]
+        return Response({'written': store_answers(answers)}, status=status.HTTP_201_CREATED)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class SurveyConfig(AppConfig):
     name = 'survey_app_repo.survey'
+
+    def ready(self):
+        import survey_app_repo.survey.signals  # noqa F401
+        import survey_app_repo.survey.results  # noqa F401 registers tasks
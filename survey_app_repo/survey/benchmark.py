@@ -0,0 +1,121 @@
+'''Load test simulating concurrent respondents taking a survey with in-process clients
+
+Each respondent walks survey:detail, take_survey for every question and finish_survey with its
+own test client on a thread pool, latency and SQL query count are recorded per endpoint. Answers
+are posted as valid form data of each question type, an answer re-rendered instead of redirecting
+to next question was rejected and counts as an error.
+'''
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from survey_app_repo.utils.stats import percentile
+
+from .forms import FormRegistar
+from .models import Question, QuestionTypes
+
+METRICS = ['p50_ms', 'p95_ms', 'p99_ms', 'throughput', 'queries_mean']
+
+
+def get_answer_data(question, answer):
+    '''valid posted data answering question with random choices, None if question takes no answer'''
+    if not FormRegistar.get_instance().takes_answer(question.question_type):
+        return None
+    values = [value for value, _ in question.get_choices()]
+    if question.question_type == QuestionTypes.MULTI_CHOICE.name:
+        return dict(value=random.sample(values, random.randint(1, len(values))))
+    if question.question_type in (QuestionTypes.SINGLE_CHOICE.name, QuestionTypes.RATING.name):
+        return dict(value=random.choice(values))
+    return dict(response=answer)
+
+
+class Respondent:
+    '''Takes a survey once and records (endpoint, seconds, queries, error) of each request'''
+
+    def __init__(self, survey, questions, answer):
+        self.survey = survey
+        self.questions = questions
+        self.answer = answer
+        self.client = Client()
+        self.records = []
+
+    def request(self, endpoint, method, url, data=None, expected_status=None):
+        with CaptureQueriesContext(connections['default']) as queries:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(url, data=data)
+            elapsed = time.perf_counter() - start
+        error = response.status_code >= 400 or (expected_status is not None and
+                                                 response.status_code != expected_status)
+        self.records.append((endpoint, elapsed, len(queries), error))
+
+    def take_survey(self):
+        self.request('survey:detail', 'get', self.survey.get_absolute_url())
+
+        for index, question in enumerate(self.questions, 1):
+            url = reverse('survey:take_survey', args=[self.survey.pk, index])
+            self.request('survey:take_survey', 'get', url)
+            data = get_answer_data(question, self.answer)
+            if data is not None:
+                # valid answer redirects to next question, invalid one renders the question again
+                self.request('survey:take_survey[post]', 'post', url, data=data, expected_status=302)
+
+        url = reverse('survey:finish_survey', args=[self.survey.pk])
+        self.request('survey:finish_survey', 'get', url)
+        self.request('survey:finish_survey[post]', 'post', url, data={}, expected_status=302)
+        return self.records
+
+
+def take_survey(survey, questions, answer):
+    try:
+        return Respondent(survey, questions, answer).take_survey()
+    finally:
+        connections.close_all()
+
+
+def run_benchmark(survey, respondents=10, concurrency=4, answer='Benchmark answer'):
+    '''Run respondents on a pool of concurrency threads and return report of each endpoint'''
+    # questions are ordered like pages of take_survey
+    questions = list(Question.objects.filter(survey=survey))
+    start = time.perf_counter()
+    with override_settings(ALLOWED_HOSTS=['testserver']), ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: take_survey(survey, questions, answer), range(respondents)))
+    duration = time.perf_counter() - start
+
+    by_endpoint = defaultdict(list)
+    for endpoint, elapsed, queries, error in (record for records in results for record in records):
+        by_endpoint[endpoint].append((elapsed, queries, error))
+
+    endpoints = {}
+    for endpoint, records in sorted(by_endpoint.items()):
+        latencies = sorted(elapsed * 1000 for elapsed, _, _ in records)
+        queries = [count for _, count, _ in records]
+        endpoints[endpoint] = dict(
+            requests=len(records),
+            errors=len([error for _, _, error in records if error]),
+            throughput=len(records) / duration,
+            p50_ms=percentile(latencies, 50), p95_ms=percentile(latencies, 95), p99_ms=percentile(latencies, 99),
+            queries_mean=sum(queries) / len(queries), queries_max=max(queries))
+
+    requests = sum(endpoint['requests'] for endpoint in endpoints.values())
+    return dict(respondents=respondents, concurrency=concurrency, duration=duration,
+                requests=requests, throughput=requests / duration, endpoints=endpoints)
+
+
+def compare(baseline, report):
+    '''yields (endpoint, metric, baseline value, current value, change in percent) of common metrics'''
+    for endpoint, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(endpoint)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else None
+            yield endpoint, metric, before, after, change
@@ -0,0 +1,65 @@
+'''Survey bundle, everything a client needs to take a survey in one json document
+
+Bundle holds survey, its ordered questions and schemas of their answer forms. It is built once
+per survey version and kept in cache with a strong ETag computed from its content, so clients
+download it once and revalidate it with a 304.
+'''
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+
+from survey_app_repo.utils.db_router import use_primary_if_changed_since
+
+from .forms import FormRegistar
+from .models import Question
+from .versioning import get_survey_version, get_version_timestamp
+
+
+def get_cache_key(survey_id, version):
+    return f'survey:{survey_id}:bundle:{version}'
+
+
+def get_form_schema(form):
+    '''describe fields of answer form so client can render and validate it'''
+    fields = []
+    for name, field in form.fields.items():
+        widget = field.widget
+        fields.append(dict(name=name, type=getattr(widget, 'input_type', None) or type(widget).__name__.lower(),
+                           label=str(field.label or ''), help_text=str(field.help_text), required=field.required,
+                           max_length=getattr(field, 'max_length', None),
+                           choices=[[str(value), str(label)] for value, label in getattr(field, 'choices', [])]
+                           or None))
+    return dict(fields=fields) if fields else None
+
+
+def build_bundle(survey):
+    form_registar = FormRegistar.get_instance()
+    questions = []
+    for index, question in enumerate(Question.objects.filter(survey=survey), 1):
+        form = form_registar.get_form_class_for(question.question_type).get_form_instance(question, None)
+        questions.append(dict(id=question.pk, index=index, question=question.question,
+                              description=question.description, question_type=question.question_type,
+                              form=get_form_schema(form) if form is not None else None))
+
+    return dict(survey=dict(id=survey.pk, title=survey.title, summary=survey.summary,
+                            published_date=survey.published_date),
+                questions=questions,
+                submit_url=reverse('survey:submit_survey', args=[survey.pk]),
+                finish_url=reverse('survey:finish_survey', args=[survey.pk]))
+
+
+def get_bundle(survey):
+    '''returns (version, etag, json content) of survey bundle, built only if current version isn't cached'''
+    version = get_survey_version(survey.pk)
+    key = get_cache_key(survey.pk, version)
+    cached = cache.get(key)
+    if cached is None:
+        with use_primary_if_changed_since(get_version_timestamp(version)):
+            content = json.dumps(build_bundle(survey), cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+        cached = '"{}"'.format(hashlib.sha1(content).hexdigest()), content
+        cache.set(key, cached, settings.SURVEY_FRAGMENT_CACHE_TIMEOUT)
+    return (version,) + tuple(cached)
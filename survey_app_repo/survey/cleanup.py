@@ -0,0 +1,86 @@
+'''Removal of abandoned survey responses
+
+Incomplete responses not updated for SURVEY_ABANDONED_RESPONSE_AGE are deleted with their
+answers, optionally written to a newline delimited json archive first. Work is done in id range
+chunks, each in its own short transaction, so cleanup can run next to respondents without
+holding long locks or producing one huge write for replicas to apply.
+'''
+import json
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import answer_buffer
+from .models import SurveyResponse, ResponseText, ResponseChoice
+
+CHUNK_SIZE = 1000
+
+
+def get_cutoff(age=None):
+    '''returns time before which incomplete responses are abandoned, age is in seconds'''
+    if age is None:
+        age = settings.SURVEY_ABANDONED_RESPONSE_AGE
+    return timezone.now() - timedelta(seconds=age)
+
+
+def get_abandoned_responses(cutoff):
+    return SurveyResponse.objects.filter(completed_date=None, updated_date__lt=cutoff)
+
+
+def iter_id_ranges(queryset, chunk_size):
+    '''yields [start, end) ranges of pk covering queryset, each at most chunk_size ids wide'''
+    bounds = queryset.aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return
+    for start in range(bounds['first'], bounds['last'] + 1, chunk_size):
+        yield start, start + chunk_size
+
+
+def archive_responses(rows, archive):
+    '''write a json line with answers for each (pk, survey_id, user_id, updated_date) row'''
+    answers = defaultdict(dict)
+    for model in (ResponseText, ResponseChoice):
+        for survey_response_id, question_id, value in model.objects \
+                .filter(survey_response__in=[row[0] for row in rows]) \
+                .values_list('survey_response_id', 'question_id', model.answer_field):
+            answers[survey_response_id][str(question_id)] = value
+
+    for survey_response_id, survey_id, user_id, updated_date in rows:
+        row = dict(response_id=survey_response_id, survey_id=survey_id, user_id=user_id,
+                   updated_date=updated_date, answers=answers[survey_response_id])
+        archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+
+
+def delete_abandoned_responses(cutoff, chunk_size=CHUNK_SIZE, archive=None, pause=0):
+    '''delete incomplete responses last updated before cutoff
+
+    yields (responses, answers) deleted in each chunk, pause is seconds to sleep between chunks
+    '''
+    abandoned = get_abandoned_responses(cutoff)
+    idle_seconds = (timezone.now() - cutoff).total_seconds()
+
+    for start, end in iter_id_ranges(abandoned, chunk_size):
+        with transaction.atomic():
+            rows = list(abandoned.filter(pk__gte=start, pk__lt=end).select_for_update()
+                                 .values_list('pk', 'survey_id', 'user_id', 'updated_date'))
+            if rows and answer_buffer.is_enabled():
+                # answers still in buffer are activity not yet reflected in updated_date
+                active = set(answer_buffer.get_active_responses([row[:2] for row in rows], idle_seconds))
+                rows = [row for row in rows if row[:2] not in active]
+            if not rows:
+                continue
+
+            if archive is not None:
+                archive_responses(rows, archive)
+            _, deleted = SurveyResponse.objects.filter(pk__in=[row[0] for row in rows]).delete()
+
+        yield deleted.get(SurveyResponse._meta.label, 0), \
+            deleted.get(ResponseText._meta.label, 0) + deleted.get(ResponseChoice._meta.label, 0)
+        if pause:
+            time.sleep(pause)
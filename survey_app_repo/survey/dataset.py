@@ -0,0 +1,201 @@
+'''Synthetic surveys, questions, responses and answers in production like volumes
+
+Rows are generated survey by survey and written in batches, with COPY on Postgres and
+bulk_create elsewhere. Primary keys of surveys, questions and responses are assigned up front
+so answers can refer to them without reading anything back, sequences are reset afterwards.
+Signals don't run for generated rows, so result aggregates are left for rebuild_results and
+refresh_result_snapshots. Meant for development and performance test databases only.
+'''
+import io
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import (Survey, Question, QuestionTypes, SurveyResponse, ResponseText, ResponseChoice,
+                     CHOICE_QUESTION_TYPES, RATING_SCALE)
+from .question_index import invalidate_question_index
+from .versioning import bump_survey_version, bump_survey_list_version
+
+BATCH_SIZE = 10000
+# share of each question type in generated surveys
+QUESTION_TYPE_WEIGHTS = {
+    QuestionTypes.TEXT.name: 50,
+    QuestionTypes.SINGLE_CHOICE.name: 20,
+    QuestionTypes.RATING.name: 15,
+    QuestionTypes.MULTI_CHOICE.name: 10,
+    QuestionTypes.DESC.name: 5,
+}
+WORDS = ['good', 'bad', 'price', 'quality', 'service', 'fast', 'slow', 'friendly', 'expensive', 'cheap', 'clean',
+         'late', 'easy', 'hard', 'again', 'never', 'always', 'staff', 'food', 'delivery', 'app', 'website']
+ANSWER_POOL_SIZE = 500
+RESPONSE_PERIOD = timedelta(days=90)
+
+
+def get_next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def copy_objects(model, objs):
+    '''insert objects with Postgres COPY, values are prepared like bulk_create prepares them'''
+    fields = [field for field in model._meta.concrete_fields if not (field.primary_key and objs[0].pk is None)]
+    buffer = io.StringIO()
+    for obj in objs:
+        values = []
+        for field in fields:
+            value = field.get_db_prep_save(field.pre_save(obj, True), connection)
+            values.append(r'\N' if value is None else str(value).replace('\\', '\\\\').replace('\t', '\\t')
+                          .replace('\n', '\\n').replace('\r', '\\r'))
+        buffer.write('\t'.join(values) + '\n')
+    buffer.seek(0)
+
+    quote_name = connection.ops.quote_name
+    columns = ', '.join(quote_name(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN', buffer)
+
+
+def insert_objects(model, objs):
+    if not objs:
+        return
+    if connection.vendor == 'postgresql':
+        copy_objects(model, objs)
+    else:
+        model.objects.bulk_create(objs)
+
+
+class DatasetGenerator:
+    '''Generates surveys of questions_per_survey questions, each with about responses_per_survey responses
+
+    completion_ratio of responses are completed answering answer_ratio of their questions, the rest
+    are abandoned after answering some of the first questions
+    '''
+
+    def __init__(self, questions_per_survey=20, responses_per_survey=100, completion_ratio=0.6, answer_ratio=0.9,
+                 seed=None, batch_size=BATCH_SIZE):
+        self.questions_per_survey = questions_per_survey
+        self.responses_per_survey = responses_per_survey
+        self.completion_ratio = completion_ratio
+        self.answer_ratio = answer_ratio
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.pending = {model: [] for model in [Survey, Question, SurveyResponse, ResponseText, ResponseChoice]}
+        self.counts = dict.fromkeys(['surveys', 'questions', 'responses', 'completed', 'text_answers',
+                                     'choice_answers'], 0)
+
+        # few answers are given often and most rarely, like answers of real respondents
+        self.answers = [' '.join(self.random.choices(WORDS, k=self.random.randint(1, 8)))
+                        for _ in range(ANSWER_POOL_SIZE)]
+        self.answer_cum_weights = list(accumulate(1 / rank for rank in range(1, ANSWER_POOL_SIZE + 1)))
+        self.choice_counts = {}
+
+    def generate(self, survey_count):
+        '''generate survey_count surveys, returns counts of generated rows'''
+        self.next_ids = {model: get_next_id(model) for model in [Survey, Question, SurveyResponse]}
+        survey_ids = []
+        for _ in range(survey_count):
+            survey_ids.append(self.add_survey())
+            if len(self.pending[ResponseText]) + len(self.pending[ResponseChoice]) >= self.batch_size:
+                self.flush()
+        self.flush()
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Survey, Question, SurveyResponse]):
+                cursor.execute(sql)
+        for survey_id in survey_ids:
+            invalidate_question_index(survey_id)
+            bump_survey_version(survey_id)
+        bump_survey_list_version()
+        return dict(self.counts)
+
+    def flush(self):
+        # parents are written before rows referring to them
+        with transaction.atomic():
+            for model, objs in self.pending.items():
+                insert_objects(model, objs)
+                objs.clear()
+
+    def take_id(self, model):
+        pk = self.next_ids[model]
+        self.next_ids[model] += 1
+        return pk
+
+    def add_survey(self):
+        published_date = self.now - RESPONSE_PERIOD - timedelta(days=self.random.randint(1, 365))
+        survey = Survey(pk=self.take_id(Survey), title=f'Survey {self.counts["surveys"] + 1}',
+                        summary=' '.join(self.random.choices(WORDS, k=12)), published=True,
+                        published_date=published_date)
+        self.pending[Survey].append(survey)
+        self.counts['surveys'] += 1
+
+        question_types = self.random.choices(list(QUESTION_TYPE_WEIGHTS), weights=list(QUESTION_TYPE_WEIGHTS.values()),
+                                             k=self.questions_per_survey)
+        questions = [self.add_question(survey, question_type) for question_type in question_types]
+        answerable = [question for question in questions if question.question_type != QuestionTypes.DESC.name]
+
+        response_count = self.random.randint(self.responses_per_survey // 2, self.responses_per_survey * 3 // 2)
+        for _ in range(response_count):
+            if self.add_response(survey, answerable):
+                survey.completed_response_count += 1
+        return survey.pk
+
+    def add_question(self, survey, question_type):
+        choices = ''
+        if question_type in (QuestionTypes.SINGLE_CHOICE.name, QuestionTypes.MULTI_CHOICE.name):
+            choices = '\n'.join(f'Option {index}' for index in range(1, self.random.randint(3, 6) + 1))
+        question = Question(pk=self.take_id(Question), survey=survey, question_type=question_type, choices=choices,
+                            question=f'Question {self.counts["questions"] + 1}',
+                            description=' '.join(self.random.choices(WORDS, k=6)))
+        self.pending[Question].append(question)
+        self.choice_counts[question.pk] = len(question.get_choice_labels())
+        self.counts['questions'] += 1
+        return question
+
+    def add_response(self, survey, questions):
+        '''add response answering questions, returns if it is completed'''
+        started_date = self.now - self.random.random() * RESPONSE_PERIOD
+        completed = self.random.random() < self.completion_ratio
+        if completed:
+            completed_date = started_date + timedelta(seconds=self.random.randint(30, 1800))
+            answered = [question for question in questions if self.random.random() < self.answer_ratio]
+        else:
+            completed_date = None
+            answered = questions[:self.random.randint(0, len(questions))]
+
+        survey_response = SurveyResponse(pk=self.take_id(SurveyResponse), survey=survey, completed_date=completed_date,
+                                         updated_date=completed_date or started_date)
+        self.pending[SurveyResponse].append(survey_response)
+        self.counts['responses'] += 1
+        self.counts['completed'] += completed
+
+        for question in answered:
+            if question.question_type in CHOICE_QUESTION_TYPES:
+                self.pending[ResponseChoice].append(ResponseChoice(question_id=question.pk,
+                                                                   survey_response_id=survey_response.pk,
+                                                                   value=self.get_choice_value(question)))
+                self.counts['choice_answers'] += 1
+            else:
+                response = self.random.choices(self.answers, cum_weights=self.answer_cum_weights)[0]
+                self.pending[ResponseText].append(ResponseText(question_id=question.pk,
+                                                               survey_response_id=survey_response.pk,
+                                                               response=response))
+                self.counts['text_answers'] += 1
+        return completed
+
+    def get_choice_value(self, question):
+        if question.question_type == QuestionTypes.RATING.name:
+            return self.random.randint(1, RATING_SCALE)
+        choice_count = self.choice_counts[question.pk]
+        if question.question_type == QuestionTypes.MULTI_CHOICE.name:
+            return self.random.randint(1, (1 << choice_count) - 1)
+        return self.random.randrange(choice_count)
+
+
+def generate_dataset(surveys=10, **options):
+    '''generate surveys with questions, responses and answers, see DatasetGenerator for options'''
+    return DatasetGenerator(**options).generate(surveys)
@@ -0,0 +1,97 @@
+'''Streaming export of survey responses, one row per response with a column per question'''
+import csv
+import json
+from itertools import groupby
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .forms import FormRegistar
+from .models import Question, QuestionTypes, ResponseChoice, SurveyResponse, CHOICE_QUESTION_TYPES
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    '''File like object returning what is written so csv writer can be used in generator'''
+
+    def write(self, value):
+        return value
+
+
+def get_export_questions(survey):
+    form_registar = FormRegistar.get_instance()
+    return [question for question in Question.objects.filter(survey=survey)
+            if form_registar.takes_answer(question.question_type)]
+
+
+def iter_responses(survey, questions, completed_only=False, chunk_size=CHUNK_SIZE):
+    '''yields (response_id, user_id, completed_date, answers) of each response of survey
+
+    answers of all responses are read with one cursor ordered by response, so memory used
+    is one chunk and one response whatever the size of survey
+    '''
+    question_ids = {question.pk for question in questions}
+    choice_questions = {question.pk: question for question in questions
+                        if question.question_type in CHOICE_QUESTION_TYPES}
+    rows = SurveyResponse.objects.filter(survey=survey).order_by('pk')
+    choice_rows = ResponseChoice.objects.filter(survey_response__survey=survey, question__in=choice_questions.keys())
+    if completed_only:
+        rows = rows.exclude(completed_date=None)
+        choice_rows = choice_rows.filter(survey_response__completed_date__isnull=False)
+    rows = rows.values_list('pk', 'user_id', 'completed_date', 'responsetext__question_id',
+                            'responsetext__response').iterator(chunk_size=chunk_size)
+    # choice answers are read with a second cursor in same order and merged, a join would
+    # repeat each text answer for each choice answer
+    choice_answers = groupby(choice_rows.order_by('survey_response_id')
+                                        .values_list('survey_response_id', 'question_id', 'value')
+                                        .iterator(chunk_size=chunk_size), key=lambda row: row[0])
+    choice_response_id, choices = next(choice_answers, (None, []))
+
+    for (response_id, user_id, completed_date), answers in groupby(rows, key=lambda row: row[:3]):
+        answers = {question_id: response for *_, question_id, response in answers if question_id in question_ids}
+        while choice_response_id is not None and choice_response_id <= response_id:
+            if choice_response_id == response_id:
+                answers.update({question_id: decode_choice(choice_questions[question_id], value)
+                                for _, question_id, value in choices})
+            choice_response_id, choices = next(choice_answers, (None, []))
+        yield response_id, user_id, completed_date, answers
+
+
+def decode_choice(question, value):
+    '''rating of rating question, label of single choice and list of labels of multiple choice question'''
+    if question.question_type == QuestionTypes.RATING.name:
+        return value
+    labels = question.get_choice_answer(value)
+    if question.question_type == QuestionTypes.MULTI_CHOICE.name:
+        return labels
+    return labels[0] if labels else None
+
+
+def format_csv_answer(answer):
+    if isinstance(answer, list):
+        return '; '.join(answer)
+    return '' if answer is None else answer
+
+
+def export_csv(survey, **kwargs):
+    '''yields lines of csv export of survey'''
+    questions = get_export_questions(survey)
+    writer = csv.writer(Echo())
+    yield writer.writerow(['response_id', 'user_id', 'completed_date'] + [question.question for question in questions])
+
+    for response_id, user_id, completed_date, answers in iter_responses(survey, questions, **kwargs):
+        yield writer.writerow([response_id, user_id, completed_date.isoformat() if completed_date else '']
+                              + [format_csv_answer(answers.get(question.pk)) for question in questions])
+
+
+def export_ndjson(survey, **kwargs):
+    '''yields lines of newline delimited json export of survey'''
+    questions = get_export_questions(survey)
+    for response_id, user_id, completed_date, answers in iter_responses(survey, questions, **kwargs):
+        row = dict(response_id=response_id, user_id=user_id, completed_date=completed_date,
+                   answers={str(question.pk): answers.get(question.pk) for question in questions})
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORTERS = dict(csv=export_csv, ndjson=export_ndjson)
+CONTENT_TYPES = dict(csv='text/csv', ndjson='application/x-ndjson')
@@ -1,7 +1,8 @@
 '''Module for forms of survey app'''
 
 from django import forms
-from .models import QuestionTypes, ResponseText
+from .models import QuestionTypes, ResponseText, ResponseChoice
+from .answer_buffer import get_buffered_answer, store_answers
 
 
 class FormRegistar:
@@ -30,6 +31,10 @@ class FormRegistar:
         return self.register.get(question_type, BaseQuestionForm)
 
 
+    def takes_answer(self, question_type):
+        return question_type in self.register
+
+
 class BaseQuestionForm(forms.Form):
 
 
@@ -37,6 +42,11 @@ class BaseQuestionForm(forms.Form):
     def get_form_instance(question, survey_response, **kwargs):
         return None
 
+    @staticmethod
+    def get_answer_form(question, survey_response, data):
+        '''Bound form for posted answer without loading saved answer, None if question takes no answer'''
+        return None
+
 
 class TextQuestionForm(forms.ModelForm):
 
@@ -49,8 +59,15 @@ class TextQuestionForm(forms.ModelForm):
 
     @staticmethod
     def get_form_instance(question, survey_response, **kwargs):
-        '''Load response from database if exists'''
-        answer = ResponseText.objects.filter(survey_response=survey_response, question=question).first()
+        '''Load response from database if exists, posted answers are upserted so they skip the lookup
+
+        survey_response is None when respondent hasn't answered any question yet
+        '''
+        answer = None
+        if 'data' not in kwargs and survey_response is not None:
+            answer = get_buffered_answer(survey_response, question) or \
+                ResponseText.objects.filter(survey_response=survey_response, question=question).first()
+
         if answer is not None:
             form = TextQuestionForm(instance=answer, **kwargs)
         else:
@@ -60,7 +77,92 @@ class TextQuestionForm(forms.ModelForm):
         form.instance.survey_response = survey_response
         return form
 
+    @staticmethod
+    def get_answer_form(question, survey_response, data):
+        '''Bound form for posted answer, used when answers are written in bulk'''
+        form = TextQuestionForm(data=data)
+        form.instance.question = question
+        form.instance.survey_response = survey_response
+        return form
+
+    def save(self, commit=True):
+        '''Upsert the answer so it is one statement whether or not it was answered before'''
+        answer = super().save(commit=False)
+        if commit:
+            store_answers([answer])
+        return answer
+
+
+class ChoiceQuestionForm(forms.ModelForm):
+    '''Answer of single choice question, value field is built from choices of question'''
+
+    class Meta:
+        model = ResponseChoice
+        fields = ['value']
+
+    def __init__(self, *args, question, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['value'] = self.get_value_field(question)
+
+    @staticmethod
+    def get_value_field(question):
+        return forms.TypedChoiceField(choices=question.get_choices(), coerce=int, widget=forms.RadioSelect, label='')
+
+    @classmethod
+    def get_form_instance(cls, question, survey_response, **kwargs):
+        '''Load answer from buffer or database if exists, posted answers are upserted so they skip the lookup'''
+        answer = None
+        if 'data' not in kwargs and survey_response is not None:
+            answer = get_buffered_answer(survey_response, question) or \
+                ResponseChoice.objects.filter(survey_response=survey_response, question=question).first()
+
+        form = cls(question=question, instance=answer, **kwargs)
+        form.instance.question = question
+        form.instance.survey_response = survey_response
+        return form
+
+    @classmethod
+    def get_answer_form(cls, question, survey_response, data):
+        '''Bound form for posted answer, used when answers are written in bulk'''
+        return cls.get_form_instance(question, survey_response, data=data)
+
+    def save(self, commit=True):
+        '''Upsert the answer so it is one statement whether or not it was answered before'''
+        answer = super().save(commit=False)
+        if commit:
+            store_answers([answer])
+        return answer
+
+
+class MultiChoiceQuestionForm(ChoiceQuestionForm):
+    '''Answer of multiple choice question, selected choices are stored as bits of value'''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.value is not None:
+            self.initial['value'] = [bit for bit, _ in self.fields['value'].choices if self.instance.value & bit]
+
+    @staticmethod
+    def get_value_field(question):
+        return forms.TypedMultipleChoiceField(choices=question.get_choices(), coerce=int, required=False,
+                                              widget=forms.CheckboxSelectMultiple, label='')
+
+    def clean_value(self):
+        return sum(self.cleaned_data['value'])
+
+
+class RatingQuestionForm(ChoiceQuestionForm):
+    '''Answer of rating question, rating from 1 is stored as value'''
+
+    @staticmethod
+    def get_value_field(question):
+        return forms.TypedChoiceField(choices=question.get_choices(), coerce=int, label='',
+                                      widget=forms.RadioSelect(attrs={'class': 'rating'}))
+
 
 # register forms to question types
 registar = FormRegistar.get_instance()
 registar.register_form(QuestionTypes.TEXT.name, TextQuestionForm)
+registar.register_form(QuestionTypes.SINGLE_CHOICE.name, ChoiceQuestionForm)
+registar.register_form(QuestionTypes.MULTI_CHOICE.name, MultiChoiceQuestionForm)
+registar.register_form(QuestionTypes.RATING.name, RatingQuestionForm)
@@ -0,0 +1,211 @@
+'''Import surveys and their questions from JSON or CSV files
+
+JSON files have one survey per line, or a list of surveys, each with a list of questions. Lists
+are decoded a survey at a time as lines are read, so only about one survey is held in memory. CSV
+files have one question per row with title of its survey, consecutive rows of same title make
+one survey and choices are separated by "|". Surveys are read one at a time, validated with
+model validation and questions are written with bulk_create in batches, all in one transaction
+which is rolled back if any survey or question is invalid.
+'''
+import csv
+import json
+from itertools import groupby
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .forms import FormRegistar
+from .models import Survey, Question, QuestionTypes
+
+BATCH_SIZE = 1000
+# least number of characters read at once while decoding a survey of a json list
+JSON_READ_SIZE = 64 * 1024
+FORMATS = ['json', 'csv']
+CSV_COLUMNS = ['survey', 'summary', 'question', 'description', 'question_type', 'choices']
+SURVEY_FIELDS = ['title', 'summary', 'published', 'published_date']
+QUESTION_FIELDS = ['question', 'description', 'question_type', 'choices']
+
+
+class SurveyImportError(Exception):
+    '''Raised with list of errors found in file, nothing is imported then'''
+
+    def __init__(self, errors):
+        super().__init__('\n'.join(errors))
+        self.errors = errors
+
+
+def get_format(file_name):
+    '''format of file from its extension, None if it isn't importable'''
+    extension = file_name.rsplit('.', 1)[-1].lower()
+    if extension in ('json', 'jsonl', 'ndjson'):
+        return 'json'
+    return extension if extension in FORMATS else None
+
+
+def read_more(buffer, lines):
+    '''buffer with at least as many characters again read from lines, ValueError if none are left'''
+    chunk = []
+    size = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= max(len(buffer), JSON_READ_SIZE):
+            break
+    if not chunk:
+        raise ValueError('Unexpected end of list of surveys')
+    return buffer + ''.join(chunk)
+
+
+def read_json_list(buffer, lines):
+    '''yields items of json list starting in buffer and continuing in lines, decoding one item at a time'''
+    decoder = json.JSONDecoder()
+    # buffer starts with "[", after it comes an item or "]" and after each item "," or "]"
+    buffer = buffer.lstrip()[1:]
+    expect_item = True
+    first = True
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer:
+            buffer = read_more(buffer, lines)
+            continue
+
+        if buffer[0] == ']' and (first or not expect_item):
+            buffer = buffer[1:]
+            break
+        if expect_item:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as error:
+                # item may continue in lines not read yet, buffer grows twice as large each time
+                try:
+                    buffer = read_more(buffer, lines)
+                except ValueError:
+                    raise error from None
+                continue
+            yield item
+            buffer = buffer[end:]
+            expect_item = first = False
+        elif buffer[0] == ',':
+            buffer = buffer[1:]
+            expect_item = True
+        else:
+            raise ValueError('Expecting "," or "]" after survey in list of surveys')
+
+    if buffer.strip() or any(line.strip() for line in lines):
+        raise ValueError('Extra data after list of surveys')
+
+
+def read_json(lines):
+    '''yields (location, raw survey) from json lines, or from a json list of surveys'''
+    lines = iter(lines)
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        if line.lstrip().startswith('['):
+            for index, raw in enumerate(read_json_list(line, lines), 1):
+                yield f'Survey {index}', raw
+            return
+        yield f'Line {number}', json.loads(line)
+
+
+def read_csv(lines):
+    '''yields (location, raw survey) grouping consecutive rows of same survey title'''
+    rows = enumerate(csv.DictReader(lines), 2)
+    for title, survey_rows in groupby(rows, key=lambda row: (row[1].get('survey') or '').strip()):
+        survey_rows = list(survey_rows)
+        first_row = survey_rows[0][1]
+        yield f'Row {survey_rows[0][0]}', dict(
+            title=title, summary=first_row.get('summary') or '',
+            questions=[dict(question=row.get('question') or '', description=row.get('description') or '',
+                            question_type=row.get('question_type') or '',
+                            choices=(row.get('choices') or '').split('|'))
+                       for _, row in survey_rows])
+
+
+READERS = dict(json=read_json, csv=read_csv)
+
+
+def get_question_type_error(question_type):
+    if question_type not in QuestionTypes.__members__:
+        return f'Unknown question type "{question_type}"'
+    if question_type != QuestionTypes.DESC.name and not FormRegistar.get_instance().takes_answer(question_type):
+        return f'Question type "{question_type}" has no answer form'
+    return None
+
+
+def format_error(location, error):
+    if isinstance(error, ValidationError) and hasattr(error, 'error_dict'):
+        error = '; '.join(f'{field}: {" ".join(messages)}' for field, messages in error.message_dict.items())
+    elif isinstance(error, ValidationError):
+        error = ' '.join(error.messages)
+    return f'{location}: {error}'
+
+
+def build_survey(location, raw):
+    '''returns (survey, questions, errors) of raw survey, built and validated without queries'''
+    if not isinstance(raw, dict) or not isinstance(raw.get('questions', []), list):
+        return None, [], [f'{location}: Survey must be an object with a list of questions']
+
+    errors = []
+    survey = Survey(**{field: raw[field] for field in SURVEY_FIELDS if field in raw})
+    try:
+        survey.full_clean()
+    except ValidationError as error:
+        errors.append(format_error(location, error))
+
+    questions = []
+    for index, raw_question in enumerate(raw.get('questions', []), 1):
+        question_location = f'{location}, question {index}'
+        if not isinstance(raw_question, dict):
+            errors.append(f'{question_location}: Question must be an object')
+            continue
+        question = Question(**{field: raw_question[field] for field in QUESTION_FIELDS if field in raw_question})
+        question.question_type = str(question.question_type).strip().upper()
+        if isinstance(question.choices, list):
+            question.choices = '\n'.join(str(choice).strip() for choice in question.choices if str(choice).strip())
+
+        type_error = get_question_type_error(question.question_type)
+        if type_error:
+            errors.append(f'{question_location}: {type_error}')
+            continue
+        try:
+            question.full_clean(exclude=['survey'])
+        except ValidationError as error:
+            errors.append(format_error(question_location, error))
+        questions.append(question)
+    return survey, questions, errors
+
+
+def import_surveys(lines, file_format):
+    '''Import surveys from lines of file in file_format, returns (surveys, questions) imported
+
+    raises SurveyImportError listing every invalid survey and question, nothing is imported then
+    '''
+    errors = []
+    survey_count = question_count = 0
+    pending = []
+    with transaction.atomic():
+        try:
+            for location, raw in READERS[file_format](lines):
+                survey, questions, survey_errors = build_survey(location, raw)
+                errors.extend(survey_errors)
+                if errors:
+                    # keep validating to report every error but stop writing
+                    continue
+
+                survey.save()
+                for question in questions:
+                    question.survey = survey
+                pending.extend(questions)
+                survey_count += 1
+                question_count += len(questions)
+                if len(pending) >= BATCH_SIZE:
+                    Question.objects.bulk_create(pending)
+                    pending = []
+        except (ValueError, csv.Error) as error:
+            errors.append(f'File is not valid {file_format}: {error}')
+
+        if errors:
+            raise SurveyImportError(errors)
+        Question.objects.bulk_create(pending)
+    return survey_count, question_count
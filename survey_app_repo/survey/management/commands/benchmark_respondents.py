@@ -0,0 +1,70 @@
+'''Command to load test survey taking with concurrent in-process respondents'''
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import Survey, Question, QuestionTypes
+from ...benchmark import compare, run_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Simulate concurrent respondents taking a survey and report latency percentiles, throughput ' \
+           'and SQL queries of each endpoint. Responses to a survey given with --survey are left in database, ' \
+           'without it a temporary survey is created and deleted afterwards together with its responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey', type=int, help='Survey to take, a temporary survey is created if omitted')
+        parser.add_argument('--questions', type=int, default=10, help='Questions of temporary survey')
+        parser.add_argument('--respondents', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--output', help='Write report as json baseline to this file')
+        parser.add_argument('--baseline', help='Compare report with json baseline from earlier run')
+
+    def handle(self, *args, **options):
+        if options['survey'] is not None:
+            try:
+                _survey = Survey.objects.get(pk=options['survey'])
+            except Survey.DoesNotExist:
+                raise CommandError(f"Survey {options['survey']} doesn't exists")
+        else:
+            _survey = self.create_survey(options['questions'])
+
+        try:
+            report = run_benchmark(_survey, respondents=options['respondents'], concurrency=options['concurrency'])
+        finally:
+            if options['survey'] is None:
+                _survey.delete()
+
+        self.write_report(report)
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                self.write_comparison(json.load(baseline_file), report)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+
+    @staticmethod
+    def create_survey(question_count):
+        _survey = Survey.objects.create(title='Benchmark survey', published=True)
+        Question.objects.bulk_create([
+            Question(survey=_survey, question=f'Question {i}', description='Benchmark question',
+                     question_type=QuestionTypes.TEXT.name if i % 2 else QuestionTypes.DESC.name)
+            for i in range(question_count)])
+        return _survey
+
+    def write_report(self, report):
+        self.stdout.write(f"{report['respondents']} respondents, concurrency {report['concurrency']}, "
+                          f"{report['requests']} requests in {report['duration']:.2f}s "
+                          f"({report['throughput']:.1f} req/s)")
+        self.stdout.write(f"{'endpoint':<30}{'requests':>9}{'errors':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+                          f"{'req/s':>9}{'queries':>9}")
+        for endpoint, stats in report['endpoints'].items():
+            self.stdout.write(f"{endpoint:<30}{stats['requests']:>9}{stats['errors']:>7}{stats['p50_ms']:>9.1f}"
+                              f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['throughput']:>9.1f}"
+                              f"{stats['queries_mean']:>9.1f}")
+
+    def write_comparison(self, baseline, report):
+        self.stdout.write('Compared with baseline:')
+        for endpoint, metric, before, after, change in compare(baseline, report):
+            change = f'{change:+.1f}%' if change is not None else 'n/a'
+            self.stdout.write(f'{endpoint:<30}{metric:<14}{before:>10.2f} -> {after:>10.2f} {change:>9}')
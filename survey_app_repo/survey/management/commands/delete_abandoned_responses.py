@@ -0,0 +1,43 @@
+'''Command to delete incomplete survey responses abandoned by respondents'''
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...cleanup import CHUNK_SIZE, get_cutoff, delete_abandoned_responses
+
+
+class Command(BaseCommand):
+    help = 'Delete incomplete responses not updated for a while together with their answers, ' \
+           'works in small chunks so it can be run periodically at any time of day'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=float,
+                            help='Age of last update after which response is abandoned, '
+                                 'defaults to and can\'t be less than SURVEY_ABANDONED_RESPONSE_AGE')
+        parser.add_argument('--archive', help='Append deleted responses with answers to this ndjson file')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Width of id range deleted at once')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        days = options['older_than_days']
+        # respondents' cookies still point at responses younger than SURVEY_ABANDONED_RESPONSE_AGE
+        if days is not None and days * 24 * 60 * 60 < settings.SURVEY_ABANDONED_RESPONSE_AGE:
+            min_days = settings.SURVEY_ABANDONED_RESPONSE_AGE / (24 * 60 * 60)
+            raise CommandError(f'--older-than-days must be at least {min_days:g}, '
+                               'younger responses can still be resumed by respondents')
+        cutoff = get_cutoff(None if days is None else days * 24 * 60 * 60)
+        archive = open(options['archive'], 'a') if options['archive'] else None
+        total_responses = total_answers = 0
+
+        try:
+            for responses, answers in delete_abandoned_responses(cutoff, options['chunk_size'], archive,
+                                                                 options['pause']):
+                total_responses += responses
+                total_answers += answers
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Deleted {responses} responses with {answers} answers')
+        finally:
+            if archive is not None:
+                archive.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {total_responses} abandoned responses with {total_answers} answers'))
@@ -0,0 +1,38 @@
+'''Command to export responses of a survey'''
+from django.core.management.base import BaseCommand, CommandError
+
+from survey_app_repo.utils.db_router import use_replica
+
+from ...models import Survey
+from ...export import CHUNK_SIZE, EXPORTERS
+
+
+class Command(BaseCommand):
+    help = 'Stream responses of survey as csv or ndjson, one row per response and a column per question'
+
+    def add_arguments(self, parser):
+        parser.add_argument('survey_id', type=int)
+        parser.add_argument('--format', choices=list(EXPORTERS), default='csv')
+        parser.add_argument('--output', help='File to write to, stdout if omitted')
+        parser.add_argument('--completed-only', action='store_true')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        with use_replica():
+            self.export(options)
+
+    def export(self, options):
+        try:
+            _survey = Survey.objects.get(pk=options['survey_id'])
+        except Survey.DoesNotExist:
+            raise CommandError(f"Survey {options['survey_id']} doesn't exists")
+
+        lines = EXPORTERS[options['format']](_survey, completed_only=options['completed_only'],
+                                             chunk_size=options['chunk_size'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with open(options['output'], 'w', newline='') as output:
+            output.writelines(lines)
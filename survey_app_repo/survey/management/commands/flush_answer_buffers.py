@@ -0,0 +1,34 @@
+'''Command to flush buffered answers of abandoned survey responses to database'''
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...models import SurveyResponse
+from ...answer_buffer import flush_answers, get_idle_responses
+
+
+class Command(BaseCommand):
+    help = 'Write answers buffered in cache for incomplete responses to database, ' \
+           'run it periodically so buffered answers are saved before they expire'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-minutes', type=int, default=60,
+                            help='Flush responses whose buffer was not written for this many minutes')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        incomplete = SurveyResponse.objects.filter(completed_date=None).order_by('pk') \
+                                           .values_list('pk', 'survey_id').iterator(chunk_size=chunk_size)
+        flushed_responses = flushed_answers = 0
+
+        for chunk in iter(lambda: list(islice(incomplete, chunk_size)), []):
+            idle = get_idle_responses(chunk, options['idle_minutes'] * 60)
+            if not idle:
+                continue
+            with transaction.atomic():
+                flushed_answers += flush_answers(idle)
+            flushed_responses += len(idle)
+
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed_answers} answers of {flushed_responses} responses'))
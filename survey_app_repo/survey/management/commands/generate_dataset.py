@@ -0,0 +1,31 @@
+'''Command to fill database with synthetic surveys, responses and answers'''
+from django.core.management.base import BaseCommand, CommandError
+
+from ...dataset import BATCH_SIZE, generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Generate surveys with questions, responses and answers in production like volumes, ' \
+           'e.g. --surveys 1000 --questions 100 --responses 100 for about 10M answers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--surveys', type=int, default=10)
+        parser.add_argument('--questions', type=int, default=20, help='Questions of each survey')
+        parser.add_argument('--responses', type=int, default=100, help='Mean number of responses of each survey')
+        parser.add_argument('--completion-ratio', type=float, default=0.6, help='Share of responses completed')
+        parser.add_argument('--answer-ratio', type=float, default=0.9,
+                            help='Share of questions answered by completed responses')
+        parser.add_argument('--seed', type=int, help='Seed to generate same dataset again')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Answers written at once')
+
+    def handle(self, *args, **options):
+        for ratio in ['completion_ratio', 'answer_ratio']:
+            if not 0 <= options[ratio] <= 1:
+                raise CommandError(f'--{ratio.replace("_", "-")} must be between 0 and 1')
+
+        counts = generate_dataset(surveys=options['surveys'], questions_per_survey=options['questions'],
+                                  responses_per_survey=options['responses'],
+                                  completion_ratio=options['completion_ratio'], answer_ratio=options['answer_ratio'],
+                                  seed=options['seed'], batch_size=options['batch_size'])
+        self.stdout.write(', '.join(f'{count} {name.replace("_", " ")}' for name, count in counts.items()))
+        self.stdout.write(self.style.SUCCESS('Done, run rebuild_results and refresh_result_snapshots for results'))
@@ -0,0 +1,24 @@
+'''Command to import surveys and questions from JSON or CSV files'''
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importer import FORMATS, SurveyImportError, get_format, import_surveys
+
+
+class Command(BaseCommand):
+    help = 'Import surveys with their questions from JSON or CSV file, nothing is imported if any is invalid'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help='Format of file, guessed from its extension if omitted')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or get_format(options['path'])
+        if file_format is None:
+            raise CommandError(f"Can't tell format of {options['path']}, use --format")
+
+        with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+            try:
+                survey_count, question_count = import_surveys(lines, file_format)
+            except SurveyImportError as error:
+                raise CommandError(f'Nothing imported, fix these errors:\n{error}')
+        self.stdout.write(self.style.SUCCESS(f'Imported {survey_count} surveys with {question_count} questions'))
@@ -0,0 +1,12 @@
+'''Command to rebuild completed response counters of surveys'''
+from django.core.management.base import BaseCommand
+
+from ...models import Survey
+
+
+class Command(BaseCommand):
+    help = 'Recompute Survey.completed_response_count from completed SurveyResponse rows'
+
+    def handle(self, *args, **options):
+        updated = Survey.rebuild_completed_response_counts()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt completed response count of {updated} surveys'))
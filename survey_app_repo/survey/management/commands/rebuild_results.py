@@ -0,0 +1,22 @@
+'''Command to rebuild per question results of surveys'''
+from django.core.management.base import BaseCommand
+
+from ...models import Survey
+from ...results import rebuild_results
+
+
+class Command(BaseCommand):
+    help = 'Recompute per question result aggregates from completed responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('survey_ids', nargs='*', type=int, help='Surveys to rebuild, all surveys if omitted')
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.all()
+        if options['survey_ids']:
+            surveys = surveys.filter(pk__in=options['survey_ids'])
+
+        for _survey in surveys:
+            rebuild_results(_survey)
+            self.stdout.write(f'Rebuilt results of survey {_survey.pk}')
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,38 @@
+'''Command to refresh result snapshots of choice and rating questions
+
+Nothing refreshes snapshots otherwise, run it every minute from cron, see docs/project_setup.md
+'''
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from ...models import Survey
+from ...results import refresh_snapshot, rebuild_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Count answers of responses completed since last refresh in result snapshots of surveys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('survey_ids', nargs='*', type=int,
+                            help='Surveys to refresh, surveys with uncounted responses if omitted')
+        parser.add_argument('--rebuild', action='store_true', help='Count all completed responses again')
+        parser.add_argument('--settle-seconds', type=int, default=settings.SURVEY_SNAPSHOT_SETTLE_SECONDS,
+                            help='Leave out responses completed in last settle seconds')
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.all()
+        if options['survey_ids']:
+            surveys = surveys.filter(pk__in=options['survey_ids'])
+        elif not options['rebuild']:
+            surveys = surveys.filter(completed_response_count__gt=F('snapshot_response_count'))
+
+        until = timezone.now() - timedelta(seconds=options['settle_seconds'])
+        refresh = rebuild_snapshot if options['rebuild'] else refresh_snapshot
+        for survey_id in surveys.values_list('pk', flat=True):
+            count = refresh(survey_id, until)
+            self.stdout.write(f'Counted {count} responses in snapshot of survey {survey_id}')
+        self.stdout.write(self.style.SUCCESS('Done'))
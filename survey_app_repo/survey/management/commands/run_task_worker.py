@@ -0,0 +1,31 @@
+'''Command running background tasks queued in database'''
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...tasks import run_pending_tasks
+
+
+class Command(BaseCommand):
+    help = 'Run tasks queued by database task backend, keeps polling for new tasks unless --once is given'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Tasks claimed at once')
+        parser.add_argument('--lock-seconds', type=int, default=300,
+                            help='Seconds after which a claimed but unfinished task is run again')
+        parser.add_argument('--sleep', type=float, default=1, help='Seconds to wait when queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit when no task is available')
+
+    def handle(self, *args, **options):
+        succeeded = failed = 0
+        try:
+            while True:
+                done, errors = run_pending_tasks(options['batch_size'], options['lock_seconds'])
+                succeeded, failed = succeeded + done, failed + errors
+                if done + errors == 0:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded} tasks, {failed} failed'))
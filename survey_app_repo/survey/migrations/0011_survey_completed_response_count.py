@@ -0,0 +1,29 @@
+# Generated by Django 2.2.9 on 2026-10-18 20:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_completed_response_count(apps, schema_editor):
+    Survey = apps.get_model('survey', 'Survey')
+    SurveyResponse = apps.get_model('survey', 'SurveyResponse')
+    completed = SurveyResponse.objects.filter(survey=OuterRef('pk')).exclude(completed_date=None) \
+                                      .order_by().values('survey').annotate(count=Count('pk')).values('count')
+    Survey.objects.update(completed_response_count=Coalesce(Subquery(completed), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0010_auto_20200109_2116'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='completed_response_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_completed_response_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.9 on 2026-10-18 20:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0011_survey_completed_response_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answered_count', models.PositiveIntegerField(default=0)),
+                ('blank_count', models.PositiveIntegerField(default=0)),
+                ('total_length', models.BigIntegerField(default=0)),
+                ('min_length', models.PositiveIntegerField(blank=True, null=True)),
+                ('max_length', models.PositiveIntegerField(blank=True, null=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result', to='survey.Question')),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_results', to='survey.Survey')),
+            ],
+            options={
+                'ordering': ['question'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AnswerFrequency',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer', models.CharField(max_length=400)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_frequencies', to='survey.Question')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='answerfrequency',
+            index=models.Index(fields=['question', '-count'], name='survey_answ_questio_31e48e_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='answerfrequency',
+            unique_together={('question', 'answer')},
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE survey_responsetext ADD COLUMN search_vector tsvector",
+    "UPDATE survey_responsetext SET search_vector = to_tsvector('pg_catalog.english', coalesce(response, ''))",
+    "CREATE INDEX survey_responsetext_search_idx ON survey_responsetext USING GIN (search_vector)",
+    "CREATE TRIGGER survey_responsetext_search_update BEFORE INSERT OR UPDATE OF response ON survey_responsetext "
+    "FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.english', response)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP TRIGGER survey_responsetext_search_update ON survey_responsetext",
+    "ALTER TABLE survey_responsetext DROP COLUMN search_vector",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE survey_responsetext_fts USING fts5("
+    "response, content='survey_responsetext', content_rowid='id')",
+    "INSERT INTO survey_responsetext_fts(survey_responsetext_fts) VALUES ('rebuild')",
+    "CREATE TRIGGER survey_responsetext_fts_insert AFTER INSERT ON survey_responsetext BEGIN "
+    "INSERT INTO survey_responsetext_fts(rowid, response) VALUES (new.id, new.response); END",
+    "CREATE TRIGGER survey_responsetext_fts_delete AFTER DELETE ON survey_responsetext BEGIN "
+    "INSERT INTO survey_responsetext_fts(survey_responsetext_fts, rowid, response) "
+    "VALUES ('delete', old.id, old.response); END",
+    "CREATE TRIGGER survey_responsetext_fts_update AFTER UPDATE ON survey_responsetext BEGIN "
+    "INSERT INTO survey_responsetext_fts(survey_responsetext_fts, rowid, response) "
+    "VALUES ('delete', old.id, old.response); "
+    "INSERT INTO survey_responsetext_fts(rowid, response) VALUES (new.id, new.response); END",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER survey_responsetext_fts_insert",
+    "DROP TRIGGER survey_responsetext_fts_delete",
+    "DROP TRIGGER survey_responsetext_fts_update",
+    "DROP TABLE survey_responsetext_fts",
+]
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0012_questionresult_answerfrequency'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_statements(dict(postgresql=POSTGRES_FORWARD, sqlite=SQLITE_FORWARD)),
+                             run_statements(dict(postgresql=POSTGRES_BACKWARD, sqlite=SQLITE_BACKWARD))),
+    ]
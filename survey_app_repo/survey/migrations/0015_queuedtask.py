@@ -0,0 +1,30 @@
+# Generated by Django 2.2.9 on 2026-10-18 20:31
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0014_surveyresponse_updated_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedTask',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('arguments', models.TextField(default='[[], {}]')),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('available_date', models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='queuedtask',
+            index=models.Index(fields=['available_date'], name='survey_queu_availab_0d3e1d_idx'),
+        ),
+    ]
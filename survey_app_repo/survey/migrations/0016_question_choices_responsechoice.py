@@ -0,0 +1,41 @@
+# Generated by Django 2.2.9 on 2026-10-18 20:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0015_queuedtask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='choices',
+            field=models.TextField(blank=True, default='', help_text='One choice per line for choice questions, labels of ratings from lowest for rating questions which are 1 to 5 without labels'),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='question_type',
+            field=models.CharField(choices=[('DESC', 'Description'), ('TEXT', 'Text'), ('SINGLE_CHOICE', 'Single choice'), ('MULTI_CHOICE', 'Multiple choice'), ('RATING', 'Rating')], max_length=255),
+        ),
+        migrations.CreateModel(
+            name='ResponseChoice',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveIntegerField()),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='survey.Question')),
+                ('survey_response', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='survey.SurveyResponse')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='responsechoice',
+            index=models.Index(fields=['question', 'value'], name='survey_resp_questio_bf5de3_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='responsechoice',
+            unique_together={('question', 'survey_response')},
+        ),
+    ]
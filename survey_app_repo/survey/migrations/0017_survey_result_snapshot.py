@@ -0,0 +1,58 @@
+# Generated by Django 2.2.9 on 2026-10-18 20:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0016_question_choices_responsechoice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyResultSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['question', 'value'],
+            },
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='snapshot_completed_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='snapshot_refreshed_date',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='snapshot_response_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='surveyresponse',
+            index=models.Index(fields=['survey', 'completed_date'], name='survey_surv_survey__f29482_idx'),
+        ),
+        migrations.AddField(
+            model_name='surveyresultsnapshot',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='result_snapshots', to='survey.Question'),
+        ),
+        migrations.AddField(
+            model_name='surveyresultsnapshot',
+            name='survey',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='result_snapshots', to='survey.Survey'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='surveyresultsnapshot',
+            unique_together={('question', 'value')},
+        ),
+    ]
@@ -1,10 +1,14 @@
 '''Models for survey app'''
 from enum import Enum
 
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 
 # Create your models here.
 class Survey(models.Model):
@@ -14,11 +18,28 @@ class Survey(models.Model):
     created_date = models.DateTimeField(auto_now_add=True)
     published = models.BooleanField(default=False)
     published_date = models.DateTimeField(null=True, blank=True)
+    completed_response_count = models.PositiveIntegerField(default=0, editable=False)
+    # high-water mark of SurveyResultSnapshot, responses completed up to it are counted in snapshot
+    snapshot_completed_until = models.DateTimeField(null=True, blank=True, editable=False)
+    snapshot_response_count = models.PositiveIntegerField(default=0, editable=False)
+    snapshot_refreshed_date = models.DateTimeField(null=True, blank=True, editable=False)
+
+    @property
+    def snapshot_pending_count(self):
+        '''number of completed responses not yet counted in result snapshot'''
+        return max(self.completed_response_count - self.snapshot_response_count, 0)
 
     def get_absolute_url(self):
         '''returns absolute url of model'''
         return reverse('survey:detail', args=[self.pk])
 
+    @staticmethod
+    def rebuild_completed_response_counts():
+        '''recompute completed_response_count of every survey from SurveyResponse in one statement'''
+        completed = SurveyResponse.objects.filter(survey=OuterRef('pk')).exclude(completed_date=None) \
+                                          .order_by().values('survey').annotate(count=Count('pk')).values('count')
+        return Survey.objects.update(completed_response_count=Coalesce(Subquery(completed), 0))
+
     def __str__(self):
         return self.title
 
@@ -26,16 +47,61 @@ class Survey(models.Model):
 class QuestionTypes(Enum):
     DESC = 'Description'
     TEXT = 'Text'
+    SINGLE_CHOICE = 'Single choice'
+    MULTI_CHOICE = 'Multiple choice'
+    RATING = 'Rating'
+
+CHOICE_QUESTION_TYPES = [QuestionTypes.SINGLE_CHOICE.name, QuestionTypes.MULTI_CHOICE.name, QuestionTypes.RATING.name]
+RATING_SCALE = 5
+# choices of multiple choice question are bits of a positive integer
+MAX_MULTI_CHOICES = 31
+
+def get_answer_model(question_type):
+    '''model storing answers to questions of question_type'''
+    return ResponseChoice if question_type in CHOICE_QUESTION_TYPES else ResponseText
 
 class Question(models.Model):
     question = models.CharField(max_length=255)
     description = models.CharField(max_length=400)
     question_type = models.CharField(max_length=255, choices=[(tag.name, tag.value) for tag in QuestionTypes])
     survey = models.ForeignKey(Survey, related_name='questions', on_delete=models.CASCADE)
+    choices = models.TextField(default='', blank=True,
+                               help_text='One choice per line for choice questions, labels of ratings from lowest '
+                                         f'for rating questions which are 1 to {RATING_SCALE} without labels')
 
     def __str__(self):
         return self.question
 
+    def clean(self):
+        labels = self.get_choice_labels()
+        if self.question_type in CHOICE_QUESTION_TYPES and not labels:
+            raise ValidationError({'choices': 'Choice questions need at least one choice'})
+        if self.question_type == QuestionTypes.MULTI_CHOICE.name and len(labels) > MAX_MULTI_CHOICES:
+            raise ValidationError({'choices': f'Multiple choice questions can have at most '
+                                              f'{MAX_MULTI_CHOICES} choices'})
+
+    def get_choice_labels(self):
+        labels = [line.strip() for line in self.choices.splitlines() if line.strip()]
+        if self.question_type == QuestionTypes.RATING.name and not labels:
+            return [str(rating) for rating in range(1, RATING_SCALE + 1)]
+        return labels
+
+    def get_choices(self):
+        '''returns (stored value, label) of each choice, index of choice for single choice, bit of choice
+        for multiple choice and rating from 1 for rating questions'''
+        labels = self.get_choice_labels()
+        if self.question_type == QuestionTypes.MULTI_CHOICE.name:
+            return [(1 << index, label) for index, label in enumerate(labels)]
+        if self.question_type == QuestionTypes.RATING.name:
+            return [(index + 1, label) for index, label in enumerate(labels)]
+        return list(enumerate(labels))
+
+    def get_choice_answer(self, value):
+        '''returns labels of choices in stored value'''
+        if self.question_type == QuestionTypes.MULTI_CHOICE.name:
+            return [label for bit, label in self.get_choices() if value & bit]
+        return [label for choice, label in self.get_choices() if choice == value]
+
     class Meta:
         ordering = ['pk']
 
@@ -43,6 +109,67 @@ class SurveyResponse(models.Model):
     survey = models.ForeignKey(Survey, on_delete=models.CASCADE)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
     completed_date = models.DateTimeField(null=True, blank=True)
+    updated_date = models.DateTimeField(default=timezone.now, editable=False)
+
+    def complete(self):
+        '''mark response as completed and count it in survey, does nothing if already completed'''
+        from . import answer_buffer
+        from .results import add_completed_response
+        from .versioning import survey_list_counts_changed
+
+        completed_date = timezone.now()
+        with transaction.atomic():
+            if answer_buffer.is_enabled():
+                answer_buffer.flush_answers([(self.pk, self.survey_id)])
+            updated = SurveyResponse.objects.filter(pk=self.pk, completed_date=None) \
+                                            .update(completed_date=completed_date)
+            if not updated:
+                return False
+            Survey.objects.filter(pk=self.survey_id) \
+                          .update(completed_response_count=F('completed_response_count') + 1)
+            add_completed_response.enqueue(self.pk, self.survey_id)
+            survey_list_counts_changed()
+        self.completed_date = completed_date
+        return True
+
+    class Meta:
+        indexes = [models.Index(fields=['survey', 'completed_date'])]
+
+
+class AnswerQuerySet(models.QuerySet):
+    '''QuerySet of answer models, which have question, survey_response and the answer in answer_field'''
+
+    def upsert(self, answers):
+        '''Insert answers or update answer_field of existing ones with INSERT ... ON CONFLICT
+
+        postgres and sqlite share the syntax, so each batch of answers costs one statement and
+        concurrent writes of same answer don't fail on unique constraint
+        '''
+        answers = list({(answer.question_id, answer.survey_response_id): answer for answer in answers}.values())
+        answer_field = self.model.answer_field
+        connection = connections[self._db or router.db_for_write(self.model)]
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            for answer in answers:
+                self.update_or_create(question_id=answer.question_id, survey_response_id=answer.survey_response_id,
+                                      defaults={answer_field: getattr(answer, answer_field)})
+            return len(answers)
+
+        quote_name = connection.ops.quote_name
+        fields = [self.model._meta.get_field(name) for name in ('question', 'survey_response', answer_field)]
+        question, survey_response, response = [quote_name(field.column) for field in fields]
+        batch_size = connection.ops.bulk_batch_size(fields, answers)
+
+        with connection.cursor() as cursor:
+            for start in range(0, len(answers), batch_size):
+                batch = answers[start:start + batch_size]
+                values = ', '.join(['(%s, %s, %s)'] * len(batch))
+                cursor.execute(
+                    f'INSERT INTO {quote_name(self.model._meta.db_table)} ({question}, {survey_response}, {response}) '
+                    f'VALUES {values} ON CONFLICT ({question}, {survey_response}) '
+                    f'DO UPDATE SET {response} = excluded.{response}',
+                    [value for answer in batch
+                     for value in (answer.question_id, answer.survey_response_id, getattr(answer, answer_field))])
+        return len(answers)
 
 
 class ResponseText(models.Model):
@@ -50,7 +177,79 @@ class ResponseText(models.Model):
     survey_response = models.ForeignKey(SurveyResponse, on_delete=models.CASCADE)
     response = models.CharField(max_length=400, null=True, blank=True)
 
+    answer_field = 'response'
+    objects = AnswerQuerySet.as_manager()
+
     class Meta:
         unique_together = ['question', 'survey_response']
 
-    
\ No newline at end of file
+
+class ResponseChoice(models.Model):
+    '''Answer of choice or rating question as an integer, see Question.get_choices'''
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    survey_response = models.ForeignKey(SurveyResponse, on_delete=models.CASCADE)
+    value = models.PositiveIntegerField()
+
+    answer_field = 'value'
+    objects = AnswerQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ['question', 'survey_response']
+        indexes = [models.Index(fields=['question', 'value'])]
+
+
+class SurveyResultSnapshot(models.Model):
+    '''Number of completed responses answering a choice or rating question with a value
+
+    refreshed incrementally by refresh_result_snapshots, Survey.snapshot_completed_until tells up to when
+    '''
+    survey = models.ForeignKey(Survey, related_name='result_snapshots', on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, related_name='result_snapshots', on_delete=models.CASCADE)
+    value = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['question', 'value']
+        ordering = ['question', 'value']
+
+
+class QuestionResult(models.Model):
+    '''Aggregates of answers to a question from completed responses, updated as responses complete'''
+    question = models.OneToOneField(Question, related_name='result', on_delete=models.CASCADE)
+    survey = models.ForeignKey(Survey, related_name='question_results', on_delete=models.CASCADE)
+    answered_count = models.PositiveIntegerField(default=0)
+    blank_count = models.PositiveIntegerField(default=0)
+    total_length = models.BigIntegerField(default=0)
+    min_length = models.PositiveIntegerField(null=True, blank=True)
+    max_length = models.PositiveIntegerField(null=True, blank=True)
+
+    @property
+    def mean_length(self):
+        return self.total_length / self.answered_count if self.answered_count else None
+
+    class Meta:
+        ordering = ['question']
+
+
+class AnswerFrequency(models.Model):
+    '''Number of completed responses giving same (normalized) answer to a question'''
+    question = models.ForeignKey(Question, related_name='answer_frequencies', on_delete=models.CASCADE)
+    answer = models.CharField(max_length=400)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['question', 'answer']
+        indexes = [models.Index(fields=['question', '-count'])]
+
+
+class QueuedTask(models.Model):
+    '''Background task waiting to be run by run_task_worker, available_date is None once it failed for good'''
+    name = models.CharField(max_length=255)
+    arguments = models.TextField(default='[[], {}]')
+    created_date = models.DateTimeField(auto_now_add=True)
+    available_date = models.DateTimeField(default=timezone.now, null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(default='', blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['available_date'])]
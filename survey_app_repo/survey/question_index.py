@@ -0,0 +1,30 @@
+'''Cached ordered index of questions of each survey'''
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Question
+
+
+def get_cache_key(survey_id):
+    return f'survey:{survey_id}:question_index'
+
+
+def get_question_index(survey_id):
+    '''returns ordered list of (question_id, question_type) of survey, loads from database only on cache miss'''
+    key = get_cache_key(survey_id)
+    question_index = cache.get(key)
+
+    if question_index is None:
+        question_index = list(Question.objects.filter(survey_id=survey_id).values_list('pk', 'question_type'))
+        # empty index isn't cached, ids of surveys that don't exist would be kept forever
+        if question_index:
+            cache.set(key, question_index, None)
+
+    return question_index
+
+
+def invalidate_question_index(survey_id):
+    '''drop cached index now and again after commit, an index read before commit may be cached meanwhile'''
+    key = get_cache_key(survey_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
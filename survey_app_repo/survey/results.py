@@ -0,0 +1,190 @@
+'''Per question results of surveys
+
+results of text questions are kept as aggregates updated when responses are completed, choice
+and rating questions are read from SurveyResultSnapshot which counts their integer answers and
+is refreshed in batches of responses completed since its high-water mark
+'''
+from collections import Counter, defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .forms import FormRegistar
+from .models import (AnswerFrequency, Question, QuestionResult, QuestionTypes, ResponseChoice, ResponseText,
+                     Survey, SurveyResponse, SurveyResultSnapshot, CHOICE_QUESTION_TYPES, get_answer_model)
+from .tasks import task
+from .question_index import get_question_index
+
+TOP_ANSWERS = 5
+
+
+def normalize_answer(response):
+    return (response or '').strip().lower()[:400]
+
+
+def get_answerable_question_ids(survey_id):
+    '''ids of questions of survey answered with text'''
+    form_registar = FormRegistar.get_instance()
+    return [question_id for question_id, question_type in get_question_index(survey_id)
+            if form_registar.takes_answer(question_type) and get_answer_model(question_type) is ResponseText]
+
+
+def add_response_to_results(survey_response):
+    '''Add answers of a just completed response to aggregates of its survey'''
+    question_ids = get_answerable_question_ids(survey_response.survey_id)
+    if not question_ids:
+        return
+
+    answers = dict(ResponseText.objects.filter(survey_response=survey_response, question_id__in=question_ids)
+                                       .values_list('question_id', 'response'))
+    answers = {question_id: answer.strip() for question_id, answer in answers.items() if answer and answer.strip()}
+    blank = [question_id for question_id in question_ids if question_id not in answers]
+
+    with transaction.atomic():
+        QuestionResult.objects.bulk_create([
+            QuestionResult(question_id=question_id, survey_id=survey_response.survey_id)
+            for question_id in question_ids], ignore_conflicts=True)
+        if blank:
+            QuestionResult.objects.filter(question_id__in=blank).update(blank_count=F('blank_count') + 1)
+
+        for question_id, answer in answers.items():
+            length = len(answer)
+            QuestionResult.objects.filter(question_id=question_id).update(
+                answered_count=F('answered_count') + 1,
+                total_length=F('total_length') + length,
+                min_length=Least(Coalesce(F('min_length'), length), length),
+                max_length=Greatest(Coalesce(F('max_length'), length), length))
+
+        if answers:
+            frequencies = [AnswerFrequency(question_id=question_id, answer=normalize_answer(answer))
+                           for question_id, answer in answers.items()]
+            AnswerFrequency.objects.bulk_create(frequencies, ignore_conflicts=True)
+            AnswerFrequency.objects.filter(reduce(or_, [Q(question_id=frequency.question_id, answer=frequency.answer)
+                                                        for frequency in frequencies])) \
+                                   .update(count=F('count') + 1)
+
+
+@task
+def add_completed_response(survey_response_id, survey_id):
+    '''Background task adding a completed response to results'''
+    add_response_to_results(SurveyResponse(pk=survey_response_id, survey_id=survey_id))
+
+
+def rebuild_results(survey):
+    '''Recompute aggregates of survey from all its completed responses'''
+    question_ids = get_answerable_question_ids(survey.pk)
+    lengths = defaultdict(list)
+    frequencies = defaultdict(Counter)
+
+    answers = ResponseText.objects.filter(question_id__in=question_ids) \
+                                  .exclude(survey_response__completed_date=None) \
+                                  .values_list('question_id', 'response').iterator()
+    for question_id, answer in answers:
+        answer = (answer or '').strip()
+        if answer:
+            lengths[question_id].append(len(answer))
+            frequencies[question_id][normalize_answer(answer)] += 1
+
+    completed_count = survey.surveyresponse_set.exclude(completed_date=None).count()
+    with transaction.atomic():
+        QuestionResult.objects.filter(survey=survey).delete()
+        AnswerFrequency.objects.filter(question__survey=survey).delete()
+        QuestionResult.objects.bulk_create([
+            QuestionResult(question_id=question_id, survey=survey, answered_count=len(lengths[question_id]),
+                           blank_count=completed_count - len(lengths[question_id]),
+                           total_length=sum(lengths[question_id]), min_length=min(lengths[question_id], default=None),
+                           max_length=max(lengths[question_id], default=None))
+            for question_id in question_ids])
+        AnswerFrequency.objects.bulk_create([
+            AnswerFrequency(question_id=question_id, answer=answer, count=count)
+            for question_id, counter in frequencies.items() for answer, count in counter.items()])
+
+
+def refresh_snapshot(survey_id, until=None):
+    '''Count choice answers of responses of survey completed after its high-water mark and up to until
+
+    until defaults to SURVEY_SNAPSHOT_SETTLE_SECONDS ago, returns number of responses counted
+    '''
+    if until is None:
+        until = timezone.now() - timedelta(seconds=settings.SURVEY_SNAPSHOT_SETTLE_SECONDS)
+
+    with transaction.atomic():
+        survey = Survey.objects.select_for_update().get(pk=survey_id)
+        responses = SurveyResponse.objects.filter(survey_id=survey_id, completed_date__lte=until)
+        if survey.snapshot_completed_until is not None:
+            until = max(until, survey.snapshot_completed_until)
+            responses = responses.filter(completed_date__gt=survey.snapshot_completed_until)
+        response_count = responses.count()
+
+        counts = list(ResponseChoice.objects.filter(survey_response__in=responses)
+                                            .values_list('question', 'value').annotate(count=Count('pk')).order_by())
+        SurveyResultSnapshot.objects.bulk_create([
+            SurveyResultSnapshot(survey_id=survey_id, question_id=question_id, value=value)
+            for question_id, value, _ in counts], ignore_conflicts=True)
+        for question_id, value, count in counts:
+            SurveyResultSnapshot.objects.filter(question_id=question_id, value=value).update(count=F('count') + count)
+
+        Survey.objects.filter(pk=survey_id) \
+                      .update(snapshot_completed_until=until, snapshot_refreshed_date=timezone.now(),
+                              snapshot_response_count=F('snapshot_response_count') + response_count)
+    return response_count
+
+
+def rebuild_snapshot(survey_id, until=None):
+    '''Count choice answers of all responses of survey completed up to until again'''
+    with transaction.atomic():
+        Survey.objects.select_for_update().filter(pk=survey_id) \
+                      .update(snapshot_completed_until=None, snapshot_response_count=0)
+        SurveyResultSnapshot.objects.filter(survey_id=survey_id).delete()
+        return refresh_snapshot(survey_id, until)
+
+
+def get_choice_results(survey):
+    '''Results of choice and rating questions of survey read from its result snapshot'''
+    questions = Question.objects.filter(survey=survey, question_type__in=CHOICE_QUESTION_TYPES)
+    counts = defaultdict(dict)
+    for question_id, value, count in SurveyResultSnapshot.objects.filter(survey=survey) \
+                                                                 .values_list('question', 'value', 'count'):
+        counts[question_id][value] = count
+
+    completed_count = survey.snapshot_response_count
+    results = []
+    for question in questions:
+        values = counts[question.pk]
+        answered = sum(values.values())
+        if question.question_type == QuestionTypes.MULTI_CHOICE.name:
+            choices = [dict(answer=label, count=sum(count for value, count in values.items() if value & bit))
+                       for bit, label in question.get_choices()]
+        else:
+            choices = [dict(answer=label, count=values.get(value, 0)) for value, label in question.get_choices()]
+        result = dict(question=question.pk, title=question.question, question_type=question.question_type,
+                      answered=answered, blank=max(completed_count - answered, 0), choices=choices)
+        if question.question_type == QuestionTypes.RATING.name:
+            result['mean'] = sum(value * count for value, count in values.items()) / answered if answered else None
+        results.append(result)
+    return results
+
+
+def get_results(survey):
+    '''Results of survey, text questions are read from aggregates only'''
+    top_answers = AnswerFrequency.objects.filter(question=OuterRef('question')).order_by('-count').values('pk')
+    frequencies = defaultdict(list)
+    for frequency in AnswerFrequency.objects.filter(question__survey=survey,
+                                                    pk__in=Subquery(top_answers[:TOP_ANSWERS])) \
+                                            .order_by('question', '-count', 'answer'):
+        frequencies[frequency.question_id].append(dict(answer=frequency.answer, count=frequency.count))
+
+    results = QuestionResult.objects.filter(survey=survey).select_related('question')
+    results = [dict(question=result.question_id, title=result.question.question,
+                    question_type=result.question.question_type,
+                    answered=result.answered_count, blank=result.blank_count,
+                    length=dict(min=result.min_length, max=result.max_length, mean=result.mean_length),
+                    top_answers=frequencies[result.question_id])
+               for result in results]
+    return sorted(results + get_choice_results(survey), key=lambda result: result['question'])
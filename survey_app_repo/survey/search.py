@@ -0,0 +1,52 @@
+'''Full text search over free text answers
+
+Answers are indexed by triggers created in migration 0013, a tsvector column with GIN index on
+postgres and a FTS5 table on sqlite, so every way of writing answers keeps the index in sync.
+'''
+from django.db import connections, router
+
+from .models import ResponseText
+
+POSTGRES_SEARCH = '''
+    SELECT answer.id FROM survey_responsetext answer
+    INNER JOIN survey_question question ON question.id = answer.question_id
+    WHERE question.survey_id = %s AND answer.search_vector @@ plainto_tsquery('pg_catalog.english', %s)
+    ORDER BY ts_rank(answer.search_vector, plainto_tsquery('pg_catalog.english', %s)) DESC, answer.id
+    LIMIT %s OFFSET %s
+'''
+
+SQLITE_SEARCH = '''
+    SELECT answer.id FROM survey_responsetext_fts
+    INNER JOIN survey_responsetext answer ON answer.id = survey_responsetext_fts.rowid
+    INNER JOIN survey_question question ON question.id = answer.question_id
+    WHERE survey_responsetext_fts MATCH %s AND question.survey_id = %s
+    ORDER BY survey_responsetext_fts.rank, answer.id
+    LIMIT %s OFFSET %s
+'''
+
+
+def to_fts5_query(query):
+    '''quote each word so user input is matched as terms and never parsed as fts5 syntax'''
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in query.split())
+
+
+def search_answers(survey, query, limit, offset=0):
+    '''returns answers of survey matching all words of query, best matches first'''
+    if not query.split():
+        return []
+
+    connection = connections[router.db_for_read(ResponseText)]
+    if connection.vendor == 'postgresql':
+        sql, params = POSTGRES_SEARCH, [survey.pk, query, query, limit, offset]
+    elif connection.vendor == 'sqlite':
+        sql, params = SQLITE_SEARCH, [to_fts5_query(query), survey.pk, limit, offset]
+    else:
+        return list(ResponseText.objects.filter(question__survey=survey, response__icontains=query)
+                                        .select_related('question').order_by('pk')[offset:offset + limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        ids = [row[0] for row in cursor.fetchall()]
+
+    answers = ResponseText.objects.using(connection.alias).select_related('question').in_bulk(ids)
+    return [answers[pk] for pk in ids if pk in answers]
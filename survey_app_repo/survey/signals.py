@@ -0,0 +1,33 @@
+'''Signal receivers of survey app'''
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Survey, Question
+from .question_index import invalidate_question_index
+from .versioning import bump_survey_version, bump_survey_list_version, delete_survey_version
+
+
+@receiver([post_save, post_delete], sender=Survey)
+def survey_changed(sender, instance, signal, **kwargs):
+    '''survey ids can be reused after delete so drop anything cached for it'''
+    invalidate_question_index(instance.pk)
+    if signal is post_delete:
+        delete_survey_version(instance.pk)
+    else:
+        bump_survey_version(instance.pk)
+    bump_survey_list_version()
+
+
+@receiver(post_init, sender=Question)
+def question_loaded(sender, instance, **kwargs):
+    '''remember survey of question as loaded, read from __dict__ so deferred field isn't loaded'''
+    instance._loaded_survey_id = instance.__dict__.get('survey_id')
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    '''question moved to another survey changes both surveys'''
+    for survey_id in {instance._loaded_survey_id, instance.survey_id} - {None}:
+        invalidate_question_index(survey_id)
+        bump_survey_version(survey_id)
+    instance._loaded_survey_id = instance.survey_id
@@ -0,0 +1,117 @@
+'''Background tasks run outside of the request that enqueues them
+
+Tasks are functions registered with @task and enqueued with func.enqueue(*args, **kwargs),
+arguments must be json serializable. Backend is chosen with SURVEY_TASK_BACKEND:
+
+- "thread" runs tasks on a thread pool of the web process once the transaction enqueueing them
+  commits, for development
+- "database" adds tasks to QueuedTask table in the transaction enqueueing them, so they are
+  queued only if it commits, and run_task_worker command runs them, for production
+
+With SURVEY_TASKS_EAGER tasks run right away inside enqueue, tests use it as TestCase never commits.
+'''
+import json
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import QueuedTask
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+_executor = None
+
+
+def task(func):
+    '''register func as task under its dotted path and add enqueue method to it'''
+    name = f'{func.__module__}.{func.__qualname__}'
+    registry[name] = func
+    func.task_name = name
+    func.enqueue = partial(enqueue, name)
+    return func
+
+
+def enqueue(name, *args, **kwargs):
+    if name not in registry:
+        raise KeyError(f'Task {name} is not registered')
+
+    if settings.SURVEY_TASKS_EAGER:
+        run_task(name, args, kwargs)
+    elif settings.SURVEY_TASK_BACKEND == 'thread':
+        transaction.on_commit(lambda: get_executor().submit(run_in_thread, name, args, kwargs))
+    elif settings.SURVEY_TASK_BACKEND == 'database':
+        QueuedTask.objects.create(name=name, arguments=json.dumps([args, kwargs]))
+    else:
+        raise ValueError(f'Unknown task backend {settings.SURVEY_TASK_BACKEND}')
+
+
+def run_task(name, args=(), kwargs=None):
+    return registry[name](*args, **(kwargs or {}))
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.SURVEY_TASK_THREADS, thread_name_prefix='survey-task')
+    return _executor
+
+
+def run_in_thread(name, args, kwargs):
+    try:
+        run_task(name, args, kwargs)
+    except Exception:
+        logger.exception('Task %s failed', name)
+    finally:
+        connections.close_all()
+
+
+def claim_tasks(limit, lock_seconds):
+    '''take up to limit available tasks and hide them from other workers for lock_seconds
+
+    a task not finished by then, e.g. because its worker died, becomes available again
+    '''
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(QueuedTask.objects.select_for_update(skip_locked=True).filter(available_date__lte=now)
+                                     .order_by('pk').values_list('pk', flat=True)[:limit])
+        QueuedTask.objects.filter(pk__in=ids).update(available_date=now + timedelta(seconds=lock_seconds),
+                                                     attempts=F('attempts') + 1)
+    return list(QueuedTask.objects.filter(pk__in=ids).order_by('pk'))
+
+
+def run_queued_task(queued_task):
+    '''run task from queue, it is deleted when done and retried with backoff when it fails
+
+    the row is deleted in the transaction of the task, so a task is done exactly when its row is gone,
+    and a task whose lock expired while running waits for that run and is skipped if it succeeded
+    '''
+    try:
+        args, kwargs = json.loads(queued_task.arguments)
+        with transaction.atomic():
+            if not QueuedTask.objects.filter(pk=queued_task.pk).delete()[0]:
+                return True
+            run_task(queued_task.name, args, kwargs)
+    except Exception:
+        logger.exception('Task %s failed', queued_task.name)
+        available_date = None
+        if queued_task.attempts < settings.SURVEY_TASK_MAX_ATTEMPTS:
+            available_date = timezone.now() + timedelta(seconds=settings.SURVEY_TASK_RETRY_DELAY
+                                                        * 2 ** (queued_task.attempts - 1))
+        QueuedTask.objects.filter(pk=queued_task.pk).update(available_date=available_date,
+                                                            last_error=traceback.format_exc())
+        return False
+    return True
+
+
+def run_pending_tasks(limit=100, lock_seconds=300):
+    '''run a batch of available queued tasks, returns (succeeded, failed)'''
+    results = [run_queued_task(queued_task) for queued_task in claim_tasks(limit, lock_seconds)]
+    return results.count(True), results.count(False)
@@ -1,5 +1,8 @@
 '''Utility function to populate data needed for tests'''
+from django.core import signing
+
 from ..models import Survey, Question, QuestionTypes, SurveyResponse, ResponseText
+from ..tokens import COOKIE_SALT, get_cookie_name, get_token_value
 
 
 RAW_SURVEYS = [
@@ -69,6 +72,7 @@ def add_responses_to_surveys(surveys):
     for survey, dates in zip(surveys, completed_dates):
         for date in dates:
             SurveyResponse.objects.create(survey=survey, completed_date=date)
+    Survey.rebuild_completed_response_counts()
 
 
 def create_survey_with_text_question_and_answer():
@@ -92,3 +96,45 @@ def get_question_and_index_of_type(survey, qtype):
         if question.question_type == str(qtype):
             return question, i + 1
     return None
+
+
+def get_response_cookie(survey_response):
+    '''returns (name, value) of signed cookie identifying survey_response, as set by views'''
+    name = get_cookie_name(survey_response.survey_id)
+    return name, signing.get_cookie_signer(salt=name + COOKIE_SALT).sign(get_token_value(survey_response))
+
+
+def set_response_cookie(client, survey_response):
+    name, value = get_response_cookie(survey_response)
+    client.cookies[name] = value
+
+
+RAW_CHOICE_QUESTIONS = [
+    {
+        'question': 'Favourite colour',
+        'description': 'Pick one colour',
+        'question_type': QuestionTypes.SINGLE_CHOICE.name,
+        'choices': 'Red\nGreen\nBlue',
+    },
+    {
+        'question': 'Languages you speak',
+        'description': 'Pick all that apply',
+        'question_type': QuestionTypes.MULTI_CHOICE.name,
+        'choices': 'English\nNepali\nHindi',
+    },
+    {
+        'question': 'Rate this survey',
+        'description': 'From 1 to 5',
+        'question_type': QuestionTypes.RATING.name,
+    },
+]
+
+
+def create_survey_with_choice_questions():
+    '''create survey with a text question followed by single choice, multiple choice and rating questions'''
+    survey = Survey.objects.create(**RAW_SURVEYS[1])
+    Question.objects.create(survey=survey, question='Why', description='Tell us why',
+                            question_type=QuestionTypes.TEXT.name)
+    for raw in RAW_CHOICE_QUESTIONS:
+        Question.objects.create(survey=survey, **raw)
+    return survey
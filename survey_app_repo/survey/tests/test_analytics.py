@@ -0,0 +1,84 @@
+'''Test cases for statistics of numeric answers'''
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+import numpy as np
+
+from ..analytics import get_statistics, weighted_percentile
+from ..answers import save_answers
+from ..models import Question, QuestionTypes, SurveyResponse
+from ..results import refresh_snapshot
+from . import factory
+
+
+class TestStatistics(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.survey = factory.create_survey_with_choice_questions()
+        self.rating = Question.objects.get(survey=self.survey, question_type=QuestionTypes.RATING.name)
+        self.other_rating = Question.objects.create(survey=self.survey, question='How likely?',
+                                                    question_type=QuestionTypes.RATING.name)
+        for rating, other_rating in [('1', '5'), ('2', None), ('4', '5'), ('5', None)]:
+            self.add_response(rating, other_rating).complete()
+        self.add_response('3', '3')
+        self.refresh_snapshot()
+
+    def refresh_snapshot(self):
+        refresh_snapshot(self.survey.pk, timezone.now())
+        self.survey.refresh_from_db()
+
+    def add_response(self, rating, other_rating):
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        answers = {self.rating.pk: {'value': rating}}
+        if other_rating is not None:
+            answers[self.other_rating.pk] = {'value': other_rating}
+        save_answers(survey_response, answers)
+        return survey_response
+
+    def test_statistics_of_completed_answers(self):
+        statistics = get_statistics(self.survey)
+        rating, other_rating = statistics['questions']
+
+        self.assertEqual(rating['question'], self.rating.pk)
+        self.assertEqual((rating['count'], rating['mean'], rating['median'], rating['min'], rating['max']),
+                         (4, 3, 3, 1, 5))
+        self.assertAlmostEqual(rating['std'], 1.5811, places=4)
+        self.assertEqual(rating['percentiles']['25'], 1.75)
+        self.assertEqual([bucket['count'] for bucket in rating['histogram']], [1, 1, 0, 1, 1])
+
+        self.assertEqual((other_rating['count'], other_rating['mean'], other_rating['std']), (2, 5, 0))
+        self.assertEqual(statistics['survey']['count'], 6)
+        self.assertEqual(statistics['survey']['mean'], 22 / 6)
+
+    def test_question_without_answers(self):
+        question = Question.objects.create(survey=self.survey, question='Unanswered',
+                                           question_type=QuestionTypes.RATING.name)
+        result = get_statistics(self.survey)['questions'][-1]
+        self.assertEqual(result['question'], question.pk)
+        self.assertEqual(result['count'], 0)
+        self.assertIsNone(result['mean'])
+
+    def test_statistics_cached_until_snapshot_refreshed(self):
+        get_statistics(self.survey)
+        with self.assertNumQueries(0):
+            get_statistics(self.survey)
+
+        self.add_response('5', None).complete()
+        self.survey.refresh_from_db()
+        self.assertEqual(get_statistics(self.survey)['questions'][0]['count'], 4)
+        self.refresh_snapshot()
+        self.assertEqual(get_statistics(self.survey)['questions'][0]['count'], 5)
+
+    def test_weighted_percentile_matches_numpy(self):
+        values, counts = np.array([1, 2, 3, 5]), np.array([3, 1, 4, 2])
+        percents = [0, 5, 25, 50, 75, 95, 100]
+        np.testing.assert_allclose(weighted_percentile(values, counts, percents),
+                                   np.percentile(np.repeat(values, counts), percents))
+
+    def test_statistics_in_results_json(self):
+        self.client.force_login(get_user_model().objects.create(username='staff', is_staff=True))
+        response = self.client.get(reverse('survey:results_json', args=[self.survey.pk]))
+        self.assertEqual(response.json()['statistics']['survey']['count'], 6)
@@ -0,0 +1,52 @@
+'''Test cases for write-behind answer buffer'''
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import SurveyResponse, ResponseText, QuestionTypes
+from ..answer_buffer import get_buffered_answer
+from . import factory
+
+
+@override_settings(SURVEY_BUFFER_ANSWERS=True)
+class TestAnswerBuffer(TestCase):
+    '''Test answers are kept in cache until response is completed'''
+
+    def setUp(self):
+        cache.clear()
+        self.survey = factory.create_survey_with_questions()
+        self.question, self.index = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        self.survey_response = SurveyResponse.objects.create(survey=self.survey)
+        factory.set_response_cookie(self.client, self.survey_response)
+
+    def post_answer(self, answer):
+        url = reverse('survey:take_survey', args=[self.survey.pk, self.index])
+        return self.client.post(url, data=dict(response=answer))
+
+    def test_answer_kept_in_cache_and_shown_in_form(self):
+        self.post_answer('Buffered answer')
+        self.assertEqual(ResponseText.objects.count(), 0)
+        self.assertEqual(get_buffered_answer(self.survey_response, self.question).response, 'Buffered answer')
+
+        response = self.client.get(reverse('survey:take_survey', args=[self.survey.pk, self.index]))
+        self.assertContains(response, 'Buffered answer')
+
+    def test_answers_flushed_when_survey_finished(self):
+        self.post_answer('Buffered answer')
+        self.client.post(reverse('survey:finish_survey', args=[self.survey.pk]), data={})
+
+        answer = ResponseText.objects.get()
+        self.assertEqual((answer.survey_response, answer.question, answer.response),
+                         (self.survey_response, self.question, 'Buffered answer'))
+
+    def test_flush_command_writes_idle_buffers_only(self):
+        self.post_answer('Abandoned answer')
+
+        call_command('flush_answer_buffers', stdout=StringIO())
+        self.assertEqual(ResponseText.objects.count(), 0)
+
+        call_command('flush_answer_buffers', idle_minutes=0, stdout=StringIO())
+        self.assertEqual(ResponseText.objects.get().response, 'Abandoned answer')
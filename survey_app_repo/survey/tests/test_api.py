@@ -0,0 +1,147 @@
+'''Test cases for survey api'''
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import SurveyResponse, ResponseText, QuestionTypes
+from . import factory
+
+
+class APITestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create(username='staff', is_staff=True)
+
+    def count_selects(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len([query for query in queries if query['sql'].startswith('SELECT')])
+
+
+class TestSurveyAPI(APITestCase):
+    '''Test surveys and questions are listed with cursor pagination'''
+
+    def test_pages_through_surveys_with_cursor(self):
+        surveys = factory.create_surveys() + factory.create_surveys()
+        response = self.client.get(reverse('api:survey-list'), {'page_size': 4})
+
+        self.assertEqual([survey['id'] for survey in response.json()['results']], [survey.pk for survey in surveys[:4]])
+        self.assertNotIn('count', response.json())
+        response = self.client.get(response.json()['next'])
+        self.assertEqual([survey['id'] for survey in response.json()['results']], [survey.pk for survey in surveys[4:]])
+        self.assertIsNone(response.json()['next'])
+
+    def test_detail_has_questions_in_two_queries(self):
+        survey = factory.create_survey_with_questions()
+        url = reverse('api:survey-detail', args=[survey.pk])
+
+        self.assertEqual(self.count_selects(url), 2)
+        questions = self.client.get(url).json()['questions']
+        self.assertEqual([question['id'] for question in questions],
+                         list(survey.questions.values_list('pk', flat=True)))
+
+    def test_questions_filtered_by_survey(self):
+        survey = factory.create_survey_with_questions()
+        factory.create_survey_with_questions()
+
+        response = self.client.get(reverse('api:question-list'), {'survey': survey.pk})
+        self.assertEqual(len(response.json()['results']), survey.questions.count())
+
+        response = self.client.get(reverse('api:question-list'), {'survey': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('survey', response.json())
+
+
+class TestSurveyResponseAPI(APITestCase):
+    '''Test responses are only for staff and read with bounded queries'''
+
+    def setUp(self):
+        super().setUp()
+        self.survey = factory.create_survey_with_questions()
+        self.question, _ = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        self.url = reverse('api:surveyresponse-list')
+
+    def add_responses(self, count):
+        for _ in range(count):
+            survey_response = SurveyResponse.objects.create(survey=self.survey)
+            ResponseText.objects.create(survey_response=survey_response, question=self.question, response='Answer')
+
+    def test_only_staff_can_read_responses(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_query_count_does_not_grow_with_responses(self):
+        self.client.force_authenticate(self.staff)
+        self.add_responses(2)
+        few_responses = self.count_selects(self.url)
+
+        self.add_responses(10)
+        self.assertEqual(self.count_selects(self.url), few_responses)
+        answers = self.client.get(self.url).json()['results'][0]['answers']
+        self.assertEqual(answers, [{'question': self.question.pk, 'response': 'Answer'}])
+
+    def test_filters_completed(self):
+        self.client.force_authenticate(self.staff)
+        self.add_responses(2)
+        SurveyResponse.objects.first().complete()
+
+        self.assertEqual(len(self.client.get(self.url, {'completed': 'true'}).json()['results']), 1)
+        self.assertEqual(len(self.client.get(self.url, {'completed': 'false', 'survey': self.survey.pk})
+                             .json()['results']), 1)
+        self.assertEqual(len(self.client.get(self.url).json()['results']), 2)
+
+        response = self.client.get(self.url, {'completed': 'foo'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('completed', response.json())
+
+
+class TestBulkAnswerAPI(APITestCase):
+    '''Test answers are validated together and written with one upsert'''
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff)
+        self.survey = factory.create_survey_with_questions()
+        self.question, _ = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        self.responses = [SurveyResponse.objects.create(survey=self.survey) for _ in range(3)]
+        self.url = reverse('api:answers')
+
+    def test_writes_answers(self):
+        ResponseText.objects.create(survey_response=self.responses[0], question=self.question, response='old')
+        answers = [dict(survey_response=survey_response.pk, question=self.question.pk, response=f'new {index}')
+                   for index, survey_response in enumerate(self.responses)]
+
+        response = self.client.post(self.url, answers, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'written': 3})
+        self.assertEqual(list(ResponseText.objects.order_by('survey_response').values_list('response', flat=True)),
+                         ['new 0', 'new 1', 'new 2'])
+
+    def test_invalid_answers_write_nothing(self):
+        other_question = factory.create_survey_with_questions().questions.first()
+        self.responses[2].complete()
+        answers = [dict(survey_response=self.responses[0].pk, question=self.question.pk, response='ok'),
+                   dict(survey_response=self.responses[1].pk, question=other_question.pk, response='wrong survey'),
+                   dict(survey_response=self.responses[2].pk, question=self.question.pk, response='completed'),
+                   dict(survey_response=0, question=self.question.pk, response='missing')]
+
+        response = self.client.post(self.url, answers, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('question', errors[1])
+        self.assertIn('survey_response', errors[2])
+        self.assertIn('survey_response', errors[3])
+
+        answers = [dict(survey_response=self.responses[0].pk, question=self.question.pk, response='x' * 401)]
+        response = self.client.post(self.url, answers, format='json')
+        self.assertIn('response', response.json()[0])
+        self.assertEqual(ResponseText.objects.count(), 0)
+
+    def test_only_staff_can_write_answers(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(self.url, [], format='json').status_code, 403)
@@ -0,0 +1,72 @@
+'''Load tests of respondents taking a survey'''
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from ..models import ResponseChoice, Survey, SurveyResponse
+from ..benchmark import compare, percentile, run_benchmark
+from . import factory
+
+
+@pytest.mark.benchmark
+class TestBenchmark(TransactionTestCase):
+    '''Test benchmark walks whole survey for each respondent and reports every endpoint'''
+
+    def test_run_benchmark_reports_each_endpoint(self):
+        survey = factory.create_survey_with_questions()
+        # shared in-memory sqlite locks tables between connections, so test respondents one at a time
+        report = run_benchmark(survey, respondents=4, concurrency=1)
+
+        self.assertEqual(set(report['endpoints']), {'survey:detail', 'survey:take_survey', 'survey:take_survey[post]',
+                                                    'survey:finish_survey', 'survey:finish_survey[post]'})
+        self.assertEqual(report['endpoints']['survey:take_survey']['requests'], 4 * survey.questions.count())
+        self.assertTrue(all(stats['errors'] == 0 for stats in report['endpoints'].values()))
+        self.assertEqual(SurveyResponse.objects.exclude(completed_date=None).count(), 4)
+        self.assertEqual(Survey.objects.get(pk=survey.pk).completed_response_count, 4)
+
+    def test_choice_questions_answered_with_valid_values(self):
+        survey = factory.create_survey_with_choice_questions()
+        report = run_benchmark(survey, respondents=2, concurrency=1)
+
+        self.assertEqual(report['endpoints']['survey:take_survey[post]']['errors'], 0)
+        self.assertEqual(ResponseChoice.objects.count(), 2 * 3)
+
+    def test_rejected_answer_counts_as_error(self):
+        survey = factory.create_survey_with_choice_questions()
+        with mock.patch('survey_app_repo.survey.benchmark.get_answer_data', return_value=dict(value='invalid')):
+            report = run_benchmark(survey, respondents=1, concurrency=1)
+        # text answer may be blank so only the three choice questions reject it
+        self.assertEqual(report['endpoints']['survey:take_survey[post]']['errors'], 3)
+
+    def test_command_writes_baseline_and_compares(self):
+        output = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+        call_command('benchmark_respondents', respondents=2, concurrency=1, questions=2, output=output,
+                     stdout=StringIO())
+        with open(output) as baseline_file:
+            baseline = json.load(baseline_file)
+        self.assertEqual(baseline['respondents'], 2)
+        self.assertFalse(Survey.objects.exists())
+
+        out = StringIO()
+        call_command('benchmark_respondents', respondents=2, concurrency=1, questions=2, baseline=output, stdout=out)
+        self.assertIn('Compared with baseline', out.getvalue())
+
+
+class TestBenchmarkReport(TestCase):
+    '''Test percentiles of latencies and comparing reports with a baseline'''
+
+    def test_percentile(self):
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 99), 4)
+        self.assertIsNone(percentile([], 50))
+
+    def test_compare(self):
+        baseline = dict(endpoints={'a': dict(p50_ms=10.0)})
+        self.assertEqual(list(compare(baseline, dict(endpoints={'a': dict(p50_ms=15.0)}))),
+                         [('a', 'p50_ms', 10.0, 15.0, 50.0)])
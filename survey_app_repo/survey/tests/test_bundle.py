@@ -0,0 +1,65 @@
+'''Test cases for survey bundle endpoint'''
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Question, QuestionTypes
+from ..versioning import get_survey_version
+from . import factory
+
+
+class TestSurveyBundle(TestCase):
+    '''Test survey bundle is served from cache with ETag and changes with survey'''
+
+    def setUp(self):
+        cache.clear()
+        self.survey = factory.create_survey_with_questions()
+        self.url = reverse('survey:bundle', args=[self.survey.pk])
+
+    def test_bundle_has_questions_in_order_with_form_schemas(self):
+        bundle = self.client.get(self.url).json()
+
+        self.assertEqual(bundle['survey']['title'], self.survey.title)
+        self.assertEqual([question['id'] for question in bundle['questions']],
+                         list(self.survey.questions.values_list('pk', flat=True)))
+        for question in bundle['questions']:
+            if question['question_type'] == QuestionTypes.TEXT.name:
+                self.assertEqual(question['form']['fields'][0]['name'], 'response')
+                self.assertEqual(question['form']['fields'][0]['max_length'], 400)
+            else:
+                self.assertIsNone(question['form'])
+        self.assertEqual(bundle['submit_url'], reverse('survey:submit_survey', args=[self.survey.pk]))
+
+    def test_revalidation_with_etag_gives_304(self):
+        response = self.client.get(self.url)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('SELECT')]), 1)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+    def test_etag_changes_when_question_changes(self):
+        etag = self.client.get(self.url)['ETag']
+        Question.objects.create(survey=self.survey, question='Added', description='',
+                                question_type=QuestionTypes.TEXT.name)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['questions'][-1]['question'], 'Added')
+
+    def test_versioned_url_cached_long_and_redirects_when_outdated(self):
+        version = get_survey_version(self.survey.pk)
+        url = reverse('survey:bundle_version', args=[self.survey.pk, version])
+        response = self.client.get(url)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+        self.survey.title = 'Changed'
+        self.survey.save()
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse('survey:bundle_version',
+                                               args=[self.survey.pk, get_survey_version(self.survey.pk)]))
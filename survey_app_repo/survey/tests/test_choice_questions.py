@@ -0,0 +1,133 @@
+'''Test cases for single choice, multiple choice and rating questions'''
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Question, QuestionTypes, SurveyResponse, ResponseChoice, ResponseText
+from ..forms import FormRegistar, ChoiceQuestionForm, MultiChoiceQuestionForm, RatingQuestionForm
+from ..answers import save_answers
+from ..results import get_results, refresh_snapshot
+from ..export import export_csv, export_ndjson
+from ..bundle import build_bundle
+from . import factory
+
+
+class ChoiceQuestionTestCase(TestCase):
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_choice_questions()
+        self.text, self.single, self.multi, self.rating = Question.objects.filter(survey=self.survey)
+
+    def answer(self, question, data):
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        errors = save_answers(survey_response, {question.pk: data})
+        self.assertEqual(errors, {})
+        return survey_response
+
+
+class TestChoiceQuestion(ChoiceQuestionTestCase):
+    '''Test choices of questions are stored as integers'''
+
+    def test_forms_registered(self):
+        form_registar = FormRegistar.get_instance()
+        self.assertIs(form_registar.get_form_class_for(QuestionTypes.SINGLE_CHOICE.name), ChoiceQuestionForm)
+        self.assertIs(form_registar.get_form_class_for(QuestionTypes.MULTI_CHOICE.name), MultiChoiceQuestionForm)
+        self.assertIs(form_registar.get_form_class_for(QuestionTypes.RATING.name), RatingQuestionForm)
+
+    def test_choices_of_question(self):
+        self.assertEqual(self.single.get_choices(), [(0, 'Red'), (1, 'Green'), (2, 'Blue')])
+        self.assertEqual(self.multi.get_choices(), [(1, 'English'), (2, 'Nepali'), (4, 'Hindi')])
+        self.assertEqual(self.rating.get_choices(), [(value, str(value)) for value in range(1, 6)])
+        self.assertEqual(self.multi.get_choice_answer(5), ['English', 'Hindi'])
+
+    def test_choice_question_needs_choices(self):
+        self.single.choices = ''
+        with self.assertRaises(ValidationError):
+            self.single.full_clean()
+
+        self.multi.choices = '\n'.join(str(index) for index in range(32))
+        with self.assertRaises(ValidationError):
+            self.multi.full_clean()
+
+    def test_answers_stored_as_integers(self):
+        survey_response = self.answer(self.single, {'value': '2'})
+        save_answers(survey_response, {self.multi.pk: {'value': ['1', '4']}, self.rating.pk: {'value': '4'}})
+
+        values = dict(ResponseChoice.objects.filter(survey_response=survey_response)
+                                            .values_list('question', 'value'))
+        self.assertEqual(values, {self.single.pk: 2, self.multi.pk: 5, self.rating.pk: 4})
+        self.assertFalse(ResponseText.objects.exists())
+
+    def test_invalid_choice_rejected(self):
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        errors = save_answers(survey_response, {self.single.pk: {'value': '7'}, self.rating.pk: {}})
+        self.assertEqual(set(errors), {self.single.pk, self.rating.pk})
+
+    def test_saved_answer_loaded_in_form(self):
+        survey_response = self.answer(self.multi, {'value': ['2', '4']})
+        form = MultiChoiceQuestionForm.get_form_instance(self.multi, survey_response)
+        self.assertEqual(form.initial['value'], [2, 4])
+
+
+class TestTakeChoiceQuestion(ChoiceQuestionTestCase):
+    '''Test choice questions are answered through take_survey'''
+
+    def test_post_answer_and_show_it(self):
+        url = reverse('survey:take_survey', args=[self.survey.pk, 2])
+        response = self.client.post(url, data={'value': '1'})
+        self.assertRedirects(response, reverse('survey:take_survey', args=[self.survey.pk, 3]))
+        self.assertEqual(ResponseChoice.objects.get().value, 1)
+
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'survey/questions/SINGLE_CHOICE.html')
+        self.assertEqual(response.context['form']['value'].value(), 1)
+
+    def test_invalid_post_shows_errors_without_creating_response(self):
+        url = reverse('survey:take_survey', args=[self.survey.pk, 4])
+        response = self.client.post(url, data={})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors)
+        self.assertFalse(SurveyResponse.objects.exists())
+
+
+class TestChoiceResultsAndExport(ChoiceQuestionTestCase):
+    '''Test closed questions are counted and exported as labels'''
+
+    def setUp(self):
+        super().setUp()
+        for single, multi, rating in [('0', ['1', '2'], '5'), ('0', ['2'], '3'), ('2', [], '4')]:
+            survey_response = self.answer(self.single, {'value': single})
+            save_answers(survey_response, {self.multi.pk: {'value': multi}, self.rating.pk: {'value': rating}})
+            survey_response.complete()
+        self.answer(self.single, {'value': '1'})
+        refresh_snapshot(self.survey.pk, timezone.now())
+        self.survey.refresh_from_db()
+
+    def test_results_count_choices_of_completed_responses(self):
+        results = {result['question']: result for result in get_results(self.survey)}
+
+        self.assertEqual(results[self.single.pk]['choices'],
+                         [dict(answer='Red', count=2), dict(answer='Green', count=0), dict(answer='Blue', count=1)])
+        self.assertEqual([choice['count'] for choice in results[self.multi.pk]['choices']], [1, 2, 0])
+        self.assertEqual(results[self.rating.pk]['mean'], 4)
+        self.assertEqual(results[self.rating.pk]['answered'], 3)
+        self.assertEqual(list(results), [self.text.pk, self.single.pk, self.multi.pk, self.rating.pk])
+
+    def test_export_has_choice_labels(self):
+        rows = list(csv.reader(export_csv(self.survey)))
+        self.assertEqual(rows[1][4:], ['Red', 'English; Nepali', '5'])
+        self.assertEqual(rows[3][4:], ['Blue', '', '4'])
+        self.assertEqual(rows[4][4:], ['Green', '', ''])
+
+        row = json.loads(next(export_ndjson(self.survey)))
+        self.assertEqual(row['answers'][str(self.multi.pk)], ['English', 'Nepali'])
+        self.assertEqual(row['answers'][str(self.rating.pk)], 5)
+
+    def test_bundle_has_choices(self):
+        questions = build_bundle(self.survey)['questions']
+        self.assertEqual(questions[1]['form']['fields'][0]['choices'], [['0', 'Red'], ['1', 'Green'], ['2', 'Blue']])
+        self.assertEqual(questions[2]['form']['fields'][0]['type'], 'checkbox')
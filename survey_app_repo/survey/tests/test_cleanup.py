@@ -0,0 +1,79 @@
+'''Test cases for deleting abandoned survey responses'''
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import SurveyResponse, ResponseText, QuestionTypes
+from ..answer_buffer import store_answers
+from ..cleanup import get_cutoff, delete_abandoned_responses
+from . import factory
+
+
+class TestDeleteAbandonedResponses(TestCase):
+    '''Test incomplete responses not updated for a while are deleted in chunks'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+        self.question, _ = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        long_ago = timezone.now() - timedelta(days=40)
+
+        self.abandoned = []
+        for index in range(5):
+            survey_response = SurveyResponse.objects.create(survey=self.survey, updated_date=long_ago)
+            ResponseText.objects.create(survey_response=survey_response, question=self.question,
+                                        response=f'Answer {index}')
+            self.abandoned.append(survey_response)
+        self.completed = SurveyResponse.objects.create(survey=self.survey, updated_date=long_ago,
+                                                       completed_date=long_ago)
+        self.recent = SurveyResponse.objects.create(survey=self.survey)
+
+    def test_deletes_only_old_incomplete_responses_in_chunks(self):
+        chunks = list(delete_abandoned_responses(get_cutoff(), chunk_size=2))
+
+        self.assertEqual(chunks, [(2, 2), (2, 2), (1, 1)])
+        self.assertEqual(set(SurveyResponse.objects.all()), {self.completed, self.recent})
+        self.assertEqual(ResponseText.objects.count(), 0)
+
+    def test_answering_updates_response(self):
+        store_answers([ResponseText(survey_response=self.abandoned[0], question=self.question, response='Back')])
+
+        list(delete_abandoned_responses(get_cutoff()))
+        self.assertEqual(set(SurveyResponse.objects.all()), {self.abandoned[0], self.completed, self.recent})
+
+    @override_settings(SURVEY_BUFFER_ANSWERS=True)
+    def test_keeps_responses_with_recently_buffered_answers(self):
+        cache.clear()
+        store_answers([ResponseText(survey_response=self.abandoned[0], question=self.question, response='Back')])
+
+        list(delete_abandoned_responses(get_cutoff()))
+        self.assertEqual(set(SurveyResponse.objects.all()), {self.abandoned[0], self.completed, self.recent})
+
+    def test_command_archives_deleted_responses(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'archive.ndjson')
+            out = StringIO()
+            call_command('delete_abandoned_responses', '--archive', path, '--chunk-size', '3', stdout=out)
+
+            with open(path) as archive:
+                rows = [json.loads(line) for line in archive]
+
+        self.assertIn('Deleted 5 abandoned responses with 5 answers', out.getvalue())
+        self.assertEqual([row['response_id'] for row in rows], [response.pk for response in self.abandoned])
+        self.assertEqual(rows[0]['answers'], {str(self.question.pk): 'Answer 0'})
+
+    def test_command_age_option(self):
+        call_command('delete_abandoned_responses', '--older-than-days', '50', stdout=StringIO())
+        self.assertEqual(SurveyResponse.objects.count(), 7)
+
+    @override_settings(SURVEY_ABANDONED_RESPONSE_AGE=30 * 24 * 60 * 60)
+    def test_command_rejects_age_below_cookie_age(self):
+        with self.assertRaises(CommandError):
+            call_command('delete_abandoned_responses', '--older-than-days', '29', stdout=StringIO())
+        self.assertEqual(SurveyResponse.objects.count(), 7)
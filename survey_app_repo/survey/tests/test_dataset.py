@@ -0,0 +1,80 @@
+'''Test cases for synthetic dataset generation'''
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..dataset import generate_dataset
+from ..models import Survey, Question, QuestionTypes, SurveyResponse, ResponseText, ResponseChoice
+from . import factory
+
+
+class TestGenerateDataset(TestCase):
+
+    def test_generates_requested_volumes(self):
+        existing = factory.create_survey_with_questions()
+        counts = generate_dataset(surveys=3, questions_per_survey=10, responses_per_survey=20, seed=1)
+
+        self.assertEqual(counts['surveys'], 3)
+        self.assertEqual(Survey.objects.exclude(pk=existing.pk).count(), 3)
+        self.assertEqual(Question.objects.exclude(survey=existing).count(), 30)
+        self.assertEqual(SurveyResponse.objects.count(), counts['responses'])
+        self.assertTrue(30 <= counts['responses'] <= 90)
+        self.assertEqual(ResponseText.objects.count(), counts['text_answers'])
+        self.assertEqual(ResponseChoice.objects.count(), counts['choice_answers'])
+
+        for survey in Survey.objects.exclude(pk=existing.pk):
+            self.assertEqual(survey.completed_response_count,
+                             survey.surveyresponse_set.exclude(completed_date=None).count())
+        self.assertTrue(0.3 < counts['completed'] / counts['responses'] < 0.9)
+
+    def test_generated_answers_are_valid(self):
+        generate_dataset(surveys=2, questions_per_survey=20, responses_per_survey=10, completion_ratio=1,
+                         answer_ratio=1, seed=2)
+
+        self.assertFalse(ResponseText.objects.exclude(question__question_type=QuestionTypes.TEXT.name).exists())
+        for answer in ResponseChoice.objects.select_related('question'):
+            self.assertTrue(answer.question.get_choice_answer(answer.value))
+        # every answerable question of every completed response is answered
+        for survey in Survey.objects.all():
+            answerable = survey.questions.exclude(question_type=QuestionTypes.DESC.name).count()
+            answers = ResponseText.objects.filter(question__survey=survey).count() + \
+                ResponseChoice.objects.filter(question__survey=survey).count()
+            self.assertEqual(answers, answerable * survey.surveyresponse_set.count())
+
+    def test_written_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            counts = generate_dataset(surveys=4, questions_per_survey=10, responses_per_survey=50, batch_size=100000)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT')]
+        self.assertLess(len(inserts), (counts['text_answers'] + counts['choice_answers']) / 20)
+
+    def test_new_rows_created_after_generated_rows(self):
+        generate_dataset(surveys=1, questions_per_survey=2, responses_per_survey=2)
+        survey = Survey.objects.create(title='After')
+        self.assertEqual(survey.pk, Survey.objects.order_by('pk').last().pk)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('generate_dataset', '--surveys', '2', '--questions', '3', '--responses', '4', '--seed', '3',
+                     stdout=out)
+        self.assertIn('2 surveys, 6 questions', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('generate_dataset', '--completion-ratio', '2', stdout=out)
+
+
+@pytest.mark.benchmark
+def test_survey_list_queries_do_not_grow_with_dataset(synthetic_dataset, client):
+    synthetic_dataset(surveys=2, questions_per_survey=5, responses_per_survey=5, seed=4)
+    with CaptureQueriesContext(connection) as small:
+        client.get(reverse('home'))
+
+    synthetic_dataset(surveys=20, questions_per_survey=5, responses_per_survey=20, seed=5)
+    with CaptureQueriesContext(connection) as large:
+        client.get(reverse('home'))
+    assert len(large) == len(small)
@@ -0,0 +1,57 @@
+'''Test cases for streaming export of responses'''
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Question, QuestionTypes, SurveyResponse, ResponseText
+from ..export import export_csv, export_ndjson
+from . import factory
+
+
+class TestExport(TestCase):
+    '''Test responses are exported one row per response'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+        self.question, _ = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        self.question2 = Question.objects.create(survey=self.survey, question='Second', description='',
+                                                 question_type=QuestionTypes.TEXT.name)
+        self.completed = SurveyResponse.objects.create(survey=self.survey)
+        ResponseText.objects.create(survey_response=self.completed, question=self.question, response='a, "quoted"')
+        ResponseText.objects.create(survey_response=self.completed, question=self.question2, response='b')
+        self.completed.complete()
+        self.incomplete = SurveyResponse.objects.create(survey=self.survey)
+
+    def test_csv_has_row_per_response_and_column_per_question(self):
+        rows = list(csv.reader(export_csv(self.survey)))
+        self.assertEqual(rows[0], ['response_id', 'user_id', 'completed_date', self.question.question, 'Second'])
+        self.assertEqual(rows[1], [str(self.completed.pk), '', self.completed.completed_date.isoformat(),
+                                   'a, "quoted"', 'b'])
+        self.assertEqual(rows[2], [str(self.incomplete.pk), '', '', '', ''])
+
+    def test_ndjson_completed_only(self):
+        rows = [json.loads(line) for line in export_ndjson(self.survey, completed_only=True)]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['answers'], {str(self.question.pk): 'a, "quoted"', str(self.question2.pk): 'b'})
+
+    def test_view_streams_export_to_staff(self):
+        url = reverse('survey:export', args=[self.survey.pk, 'csv'])
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(get_user_model().objects.create(username='staff', is_staff=True))
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(len(list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))), 3)
+
+        self.assertEqual(self.client.get(reverse('survey:export', args=[self.survey.pk, 'xml'])).status_code, 404)
+
+    def test_command_writes_export(self):
+        out = StringIO()
+        call_command('export_responses', self.survey.pk, format='ndjson', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
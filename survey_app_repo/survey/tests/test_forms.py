@@ -96,3 +96,13 @@ class TestTextQuestionForm(TestCase):
         self.assertEqual(answer.question, self.question)
         self.assertEqual(answer.survey_response, self.survey_response)
 
+    def test_save_upserts_without_loading_answer(self):
+        ResponseText.objects.create(response='first', question=self.question, survey_response=self.survey_response)
+
+        # one upsert of answer and one update of survey response's updated_date
+        with self.assertNumQueries(2):
+            form = TextQuestionForm.get_form_instance(self.question, self.survey_response,
+                                                      data={'response': 'second'})
+            form.save()
+
+        self.assertEqual(ResponseText.objects.get().response, 'second')
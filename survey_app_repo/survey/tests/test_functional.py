@@ -189,10 +189,19 @@ class TakeSurveyFunctionalTest(FunctionalTestCase):
 
 
     def test_survey_response_id_cookie_set(self):
+        '''Test cookie is set once first answer is submitted'''
         url = reverse('survey:take_survey', args=[self.survey.pk, 1])
         self.browser.get(self.live_server_url+url)
+        self.assertIsNone(self.browser.get_cookie(f'survey_response_id_{self.survey.pk}'))
+
+        _, index = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        btn_next, _ = self.load_question_at(index)
+        self.browser.find_element_by_css_selector("input#id_response").send_keys("First answer")
+        btn_next.click()
+        wait_until_document_ready(self.browser)
         value = self.browser.get_cookie(f'survey_response_id_{self.survey.pk}')['value']
-        self.assertTrue(value.isnumeric())
+        survey_response = SurveyResponse.objects.get(survey=self.survey)
+        self.assertEqual(value, factory.get_response_cookie(survey_response)[1])
 
 
 
@@ -248,9 +257,9 @@ class TestFinishSurveyView(FunctionalTestCase):
     def setUp(self):
         super().setUp()
         self.survey, self.survey_response = factory.create_survey_with_text_question_and_answer()
-        self.cookie_key = f'survey_response_id_{self.survey.pk}'
+        self.cookie_key, cookie_value = factory.get_response_cookie(self.survey_response)
         self.browser.get(self.live_server_url)
-        self.browser.add_cookie({'name': self.cookie_key, 'value': str(self.survey_response.pk)})
+        self.browser.add_cookie({'name': self.cookie_key, 'value': cookie_value})
         url = reverse('survey:finish_survey', args=[self.survey.pk])
         self.browser.get(self.live_server_url+url)
 
@@ -0,0 +1,121 @@
+'''Test cases for importing surveys from files'''
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..importer import SurveyImportError, import_surveys, read_json
+from ..models import Survey, Question, QuestionTypes
+
+CSV_SURVEYS = '''survey,summary,question,description,question_type,choices
+Lunch,What do you eat,Favourite food,Pick one,single_choice,Rice|Noodles
+Lunch,,Why,Tell us,TEXT,
+Dinner,Evening meals,How was it,Rate it,RATING,
+'''
+
+JSON_SURVEY = dict(title='Breakfast', summary='Mornings', questions=[
+    dict(question='Drinks', description='Pick all', question_type='MULTI_CHOICE', choices=['Tea', 'Coffee']),
+    dict(question='About', description='Just read', question_type='DESC'),
+])
+
+
+class TestImportSurveys(TestCase):
+
+    def test_import_csv(self):
+        self.assertEqual(import_surveys(StringIO(CSV_SURVEYS), 'csv'), (2, 3))
+
+        lunch = Survey.objects.get(title='Lunch')
+        self.assertEqual(lunch.summary, 'What do you eat')
+        questions = list(lunch.questions.all())
+        self.assertEqual([question.question for question in questions], ['Favourite food', 'Why'])
+        self.assertEqual(questions[0].question_type, QuestionTypes.SINGLE_CHOICE.name)
+        self.assertEqual(questions[0].get_choice_labels(), ['Rice', 'Noodles'])
+        self.assertEqual(Survey.objects.get(title='Dinner').questions.get().question_type, 'RATING')
+
+    def test_import_json_lines_and_json_list(self):
+        self.assertEqual(import_surveys(StringIO(json.dumps(JSON_SURVEY) + '\n\n' + json.dumps(JSON_SURVEY)), 'json'),
+                         (2, 4))
+        self.assertEqual(import_surveys(StringIO(json.dumps([JSON_SURVEY], indent=2)), 'json'), (1, 2))
+        question = Question.objects.filter(question_type=QuestionTypes.MULTI_CHOICE.name).first()
+        self.assertEqual(question.get_choices(), [(1, 'Tea'), (2, 'Coffee')])
+
+    @mock.patch('survey_app_repo.survey.importer.JSON_READ_SIZE', 100)
+    def test_json_list_decoded_one_survey_at_a_time(self):
+        lines = json.dumps([JSON_SURVEY] * 100, indent=2).splitlines(True)
+        remaining = iter(lines)
+
+        surveys = read_json(remaining)
+        self.assertEqual(next(surveys), ('Survey 1', JSON_SURVEY))
+        self.assertGreater(len(list(remaining)), len(lines) * 0.9)
+
+    def test_invalid_json_list(self):
+        for text in ['[{"title": "Unclosed"}', '[{"title": "A"} {"title": "B"}]', '[{"title": "A"},]', '[] []']:
+            with self.assertRaises(SurveyImportError):
+                import_surveys(StringIO(text), 'json')
+        self.assertFalse(Survey.objects.exists())
+
+    def test_questions_inserted_in_bulk(self):
+        survey = dict(title='Long', questions=[dict(question=f'Question {index}', description='Answer it',
+                                                    question_type='TEXT') for index in range(2500)])
+        with CaptureQueriesContext(connection) as queries:
+            import_surveys(StringIO(json.dumps(survey)), 'json')
+        self.assertLess(len(queries), 25)
+        self.assertEqual(Question.objects.filter(survey__title='Long').count(), 2500)
+        self.assertEqual(Question.objects.last().question, 'Question 2499')
+
+    def test_invalid_file_imports_nothing(self):
+        lines = [json.dumps(JSON_SURVEY),
+                 json.dumps(dict(title='', questions=[dict(question='Q', description='D', question_type='AUDIO')])),
+                 json.dumps(dict(title='Choices', questions=[dict(question='Q', description='D',
+                                                                  question_type='SINGLE_CHOICE')])),
+                 '{not json']
+        with self.assertRaises(SurveyImportError) as context:
+            import_surveys(StringIO('\n'.join(lines)), 'json')
+
+        errors = context.exception.errors
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(errors[0].startswith('Line 2: title:'))
+        self.assertEqual(errors[1], 'Line 2, question 1: Unknown question type "AUDIO"')
+        self.assertTrue(errors[2].startswith('Line 3, question 1: choices:'))
+        self.assertTrue(errors[3].startswith('File is not valid json'))
+        self.assertFalse(Survey.objects.exists())
+
+
+class TestImportCommandAndAdmin(TestCase):
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write(CSV_SURVEYS)
+        self.addCleanup(os.remove, csv_file.name)
+
+        out = StringIO()
+        call_command('import_surveys', csv_file.name, stdout=out)
+        self.assertIn('Imported 2 surveys with 3 questions', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('import_surveys', csv_file.name, '--format', 'json', stdout=out)
+
+    def test_admin_import(self):
+        self.client.force_login(get_user_model().objects.create(username='admin', is_staff=True, is_superuser=True))
+        url = reverse('admin:survey_survey_import')
+        self.assertContains(self.client.get(reverse('admin:survey_survey_changelist')), url)
+
+        response = self.client.post(url, dict(file=SimpleUploadedFile('surveys.csv', CSV_SURVEYS.encode())))
+        self.assertRedirects(response, reverse('admin:survey_survey_changelist'))
+        self.assertEqual(Question.objects.count(), 3)
+
+        response = self.client.post(url, dict(file=SimpleUploadedFile('surveys.csv', b'survey,question\n,Q\n')))
+        self.assertContains(response, 'Unknown question type')
+        response = self.client.post(url, dict(file=SimpleUploadedFile('surveys.txt', b'title')))
+        self.assertContains(response, 'can be imported')
+        self.assertEqual(Survey.objects.count(), 2)
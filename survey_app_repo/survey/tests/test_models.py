@@ -1,5 +1,6 @@
 '''Test cases for models'''
 from datetime import timedelta, datetime
+from io import StringIO
 
 from django.test import TestCase
 from django.urls import reverse
@@ -7,6 +8,7 @@ from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.db.utils import IntegrityError
 from django.db import transaction
+from django.core.management import call_command
 
 
 
@@ -42,6 +44,16 @@ class TestSurveyModel(TestCase):
         expected_url = reverse('survey:detail', args=[self.survey.pk])
         self.assertEqual(self.survey.get_absolute_url(), expected_url)
 
+    def test_rebuild_completed_response_counts(self):
+        '''Test counter is rebuilt from completed responses only'''
+        models.SurveyResponse.objects.create(survey=self.survey, completed_date=timezone.now())
+        models.SurveyResponse.objects.create(survey=self.survey)
+        models.Survey.objects.filter(pk=self.survey.pk).update(completed_response_count=10)
+
+        call_command('rebuild_response_counts', stdout=StringIO())
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.completed_response_count, 1)
+
 class TestQuestionModel(TestCase):
     '''Test case for question model'''
 
@@ -67,6 +79,15 @@ class TestSurveyResponseModel(TestCase):
         models.SurveyResponse.objects.create(survey=self.survey)
         self.assertEqual(models.SurveyResponse.objects.count(), 2)
 
+    def test_complete_sets_completed_date_and_counts_once(self):
+        survey_response = models.SurveyResponse.objects.create(survey=self.survey)
+        self.assertTrue(survey_response.complete())
+        self.assertIsNotNone(survey_response.completed_date)
+        self.assertFalse(survey_response.complete())
+
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.completed_response_count, 1)
+
 
 class TestResponseText(TestCase):
     '''Test model ResponseText'''
@@ -92,3 +113,18 @@ class TestResponseText(TestCase):
                                            response='This is my response2')
 
         self.assertEqual(models.SurveyResponse.objects.count(), 2)
+
+    def test_upsert_inserts_and_updates_answers(self):
+        survey_response = models.SurveyResponse.objects.create(survey=self.survey)
+        questions = list(self.survey.questions.all())
+        models.ResponseText.objects.create(survey_response=survey_response, question=questions[0], response='old')
+
+        answers = [models.ResponseText(survey_response=survey_response, question=question, response=question.question)
+                   for question in questions]
+        # answering same question twice in a batch keeps the last answer
+        answers.append(models.ResponseText(survey_response=survey_response, question=questions[1], response='last'))
+        self.assertEqual(models.ResponseText.objects.upsert(answers), 3)
+
+        saved = dict(models.ResponseText.objects.values_list('question', 'response'))
+        self.assertEqual(saved, {questions[0].pk: questions[0].question, questions[1].pk: 'last',
+                                 questions[2].pk: questions[2].question})
@@ -0,0 +1,76 @@
+'''Test cases for cached question index'''
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.db import transaction
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+
+from ..models import Question, QuestionTypes
+from ..versioning import get_survey_version
+from ..question_index import get_cache_key, get_question_index
+from . import factory
+
+
+class TestQuestionIndex(TestCase):
+    '''Test get_question_index caches ordered questions and is invalidated on change'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+
+    def test_returns_ordered_question_ids_and_types(self):
+        expected = [(question.pk, question.question_type) for question in self.survey.questions.all()]
+        self.assertEqual(get_question_index(self.survey.pk), expected)
+
+    def test_cached_after_first_call(self):
+        get_question_index(self.survey.pk)
+        with self.assertNumQueries(0):
+            get_question_index(self.survey.pk)
+
+    def test_invalidated_when_question_saved_or_deleted(self):
+        get_question_index(self.survey.pk)
+        question = Question.objects.create(survey=self.survey, question='New', description='',
+                                           question_type=QuestionTypes.TEXT.name)
+        self.assertEqual(get_question_index(self.survey.pk)[-1], (question.pk, question.question_type))
+
+        question.delete()
+        self.assertEqual(len(get_question_index(self.survey.pk)), 3)
+
+    def test_both_surveys_invalidated_when_question_moved(self):
+        other_survey = factory.create_survey_with_questions()
+        question = Question.objects.filter(survey=self.survey).first()
+        get_question_index(self.survey.pk)
+        get_question_index(other_survey.pk)
+        version = get_survey_version(self.survey.pk)
+
+        question.survey = other_survey
+        question.save()
+        self.assertNotIn(question.pk, [question_id for question_id, _ in get_question_index(self.survey.pk)])
+        self.assertIn(question.pk, [question_id for question_id, _ in get_question_index(other_survey.pk)])
+        self.assertNotEqual(get_survey_version(self.survey.pk), version)
+
+    def test_empty_index_not_cached(self):
+        self.assertEqual(get_question_index(self.survey.pk + 100), [])
+        self.assertIsNone(cache.get(get_cache_key(self.survey.pk + 100)))
+
+    def test_take_survey_runs_single_lookup_with_warm_index(self):
+        url = reverse('survey:take_survey', args=[self.survey.pk, 2])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        question_queries = [query for query in queries if 'survey_question' in query['sql']]
+        self.assertEqual(len(question_queries), 1)
+
+
+class TestQuestionIndexInvalidatedOnCommit(TransactionTestCase):
+    '''Test index cached while a question change isn't committed is dropped after commit'''
+
+    def test_index_cached_before_commit_invalidated(self):
+        survey = factory.create_survey_with_questions()
+        with transaction.atomic():
+            question = Question.objects.create(survey=survey, question='New', description='',
+                                               question_type=QuestionTypes.TEXT.name)
+            # a concurrent request caches the index it read before commit
+            cache.set(get_cache_key(survey.pk), [], None)
+
+        self.assertEqual(get_question_index(survey.pk)[-1], (question.pk, question.question_type))
@@ -0,0 +1,68 @@
+'''Test cases for incremental survey results'''
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Question, QuestionTypes, SurveyResponse, ResponseText, QuestionResult
+from ..results import get_results
+from . import factory
+
+
+class TestResults(TestCase):
+    '''Test aggregates are updated when responses complete'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+        self.question = Question.objects.create(survey=self.survey, question='Second text', description='',
+                                                question_type=QuestionTypes.TEXT.name)
+        self.text_question, _ = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+
+    def complete_response(self, answers):
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        for question, answer in answers.items():
+            ResponseText.objects.create(survey_response=survey_response, question=question, response=answer)
+        survey_response.complete()
+        return survey_response
+
+    def test_aggregates_updated_on_complete(self):
+        self.complete_response({self.text_question: 'Yes', self.question: ''})
+        self.complete_response({self.text_question: ' yes  '})
+        self.complete_response({self.text_question: 'Maybe not'})
+
+        results = {result['question']: result for result in get_results(self.survey)}
+        self.assertEqual(set(results), {self.text_question.pk, self.question.pk})
+
+        text_result = results[self.text_question.pk]
+        self.assertEqual((text_result['answered'], text_result['blank']), (3, 0))
+        self.assertEqual(text_result['length'], dict(min=3, max=9, mean=5))
+        self.assertEqual(text_result['top_answers'], [dict(answer='yes', count=2), dict(answer='maybe not', count=1)])
+
+        self.assertEqual((results[self.question.pk]['answered'], results[self.question.pk]['blank']), (0, 3))
+
+    def test_rebuild_matches_incremental_aggregates(self):
+        self.complete_response({self.text_question: 'Yes', self.question: 'Long answer'})
+        self.complete_response({self.text_question: 'no'})
+        SurveyResponse.objects.create(survey=self.survey)
+        incremental = get_results(self.survey)
+
+        QuestionResult.objects.all().delete()
+        call_command('rebuild_results', self.survey.pk, stdout=StringIO())
+        self.assertEqual(get_results(self.survey), incremental)
+
+    def test_results_views_are_staff_only(self):
+        self.complete_response({self.text_question: 'Yes'})
+        url = reverse('survey:results_json', args=[self.survey.pk])
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        staff = get_user_model().objects.create(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(url)
+        self.assertEqual(response.json()['completed_responses'], 1)
+        self.assertEqual(len(response.json()['questions']), 2)
+
+        response = self.client.get(reverse('survey:results', args=[self.survey.pk]))
+        self.assertTemplateUsed(response, 'survey/results.html')
+        self.assertContains(response, 'Second text')
@@ -0,0 +1,60 @@
+'''Test cases for full text search over answers'''
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import QuestionTypes, SurveyResponse, ResponseText
+from ..search import search_answers
+from .. import views
+from . import factory
+
+
+class TestSearchAnswers(TestCase):
+    '''Test answers are searchable as soon as they are saved'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+        self.question, _ = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+
+    def add_answer(self, response):
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        return ResponseText.objects.create(survey_response=survey_response, question=self.question, response=response)
+
+    def test_finds_answers_with_all_words(self):
+        inflation = self.add_answer('Inflation is too high this year')
+        self.add_answer('Prices are fine')
+        self.assertEqual(search_answers(self.survey, 'inflation year', 10), [inflation])
+        self.assertEqual(search_answers(self.survey, 'inflation "low', 10), [])
+        self.assertEqual(search_answers(self.survey, '   ', 10), [])
+
+    def test_index_follows_upserts_and_deletes(self):
+        answer = self.add_answer('first words')
+        answer.response = 'second words'
+        ResponseText.objects.upsert([answer])
+        self.assertEqual(search_answers(self.survey, 'first', 10), [])
+        self.assertEqual(search_answers(self.survey, 'second', 10), [answer])
+
+        answer.delete()
+        self.assertEqual(search_answers(self.survey, 'second', 10), [])
+
+    def test_only_searches_given_survey(self):
+        other_survey = factory.create_survey_with_questions()
+        other_question = other_survey.questions.get(question_type=QuestionTypes.TEXT.name)
+        ResponseText.objects.create(survey_response=SurveyResponse.objects.create(survey=other_survey),
+                                    question=other_question, response='common word')
+        self.add_answer('common word')
+        self.assertEqual(len(search_answers(self.survey, 'common', 10)), 1)
+
+    def test_view_paginates_results(self):
+        for i in range(views.SEARCH_PAGE_SIZE + 1):
+            self.add_answer(f'answer number {i}')
+        self.client.force_login(get_user_model().objects.create(username='staff', is_staff=True))
+
+        url = reverse('survey:search', args=[self.survey.pk])
+        response = self.client.get(url, data=dict(q='answer'))
+        self.assertEqual(len(response.context['answers']), views.SEARCH_PAGE_SIZE)
+        self.assertTrue(response.context['has_next'])
+
+        response = self.client.get(url, data=dict(q='answer', page=2))
+        self.assertEqual(len(response.context['answers']), 1)
+        self.assertFalse(response.context['has_next'])
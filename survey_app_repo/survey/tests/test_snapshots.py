@@ -0,0 +1,103 @@
+'''Test cases for result snapshots of choice questions'''
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..answers import save_answers
+from ..models import Question, QuestionTypes, Survey, SurveyResponse, SurveyResultSnapshot
+from ..results import get_results, refresh_snapshot, rebuild_snapshot
+from . import factory
+
+
+class TestResultSnapshot(TestCase):
+    '''Test snapshots only count responses completed since their high-water mark'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_choice_questions()
+        self.single = Question.objects.get(survey=self.survey, question_type=QuestionTypes.SINGLE_CHOICE.name)
+
+    def complete_response(self, value, completed_date=None):
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        save_answers(survey_response, {self.single.pk: {'value': value}})
+        survey_response.complete()
+        if completed_date is not None:
+            SurveyResponse.objects.filter(pk=survey_response.pk).update(completed_date=completed_date)
+        return survey_response
+
+    def get_counts(self):
+        return dict(SurveyResultSnapshot.objects.filter(survey=self.survey).values_list('value', 'count'))
+
+    def test_refresh_counts_only_new_responses(self):
+        self.complete_response('0')
+        self.complete_response('1')
+        self.assertEqual(refresh_snapshot(self.survey.pk, timezone.now()), 2)
+        self.assertEqual(refresh_snapshot(self.survey.pk, timezone.now()), 0)
+
+        self.complete_response('0')
+        self.assertEqual(refresh_snapshot(self.survey.pk, timezone.now()), 1)
+        self.assertEqual(self.get_counts(), {0: 2, 1: 1})
+
+        survey = Survey.objects.get(pk=self.survey.pk)
+        self.assertEqual(survey.snapshot_response_count, 3)
+        self.assertEqual(survey.snapshot_pending_count, 0)
+        self.assertIsNotNone(survey.snapshot_refreshed_date)
+
+    def test_responses_completed_in_settle_time_are_left_for_next_refresh(self):
+        self.complete_response('0', timezone.now() - timedelta(minutes=5))
+        self.complete_response('2')
+        self.assertEqual(refresh_snapshot(self.survey.pk), 1)
+
+        survey = Survey.objects.get(pk=self.survey.pk)
+        self.assertEqual(survey.snapshot_pending_count, 1)
+        self.assertEqual(self.get_counts(), {0: 1})
+
+    def test_results_read_from_snapshot(self):
+        self.complete_response('2')
+        refresh_snapshot(self.survey.pk, timezone.now())
+        self.complete_response('2')
+
+        survey = Survey.objects.get(pk=self.survey.pk)
+        result = next(result for result in get_results(survey) if result['question'] == self.single.pk)
+        self.assertEqual(result['choices'][2]['count'], 1)
+        self.assertEqual(result['blank'], 0)
+
+    def test_rebuild_counts_all_responses_again(self):
+        self.complete_response('1')
+        refresh_snapshot(self.survey.pk, timezone.now())
+        SurveyResultSnapshot.objects.update(count=10)
+
+        self.assertEqual(rebuild_snapshot(self.survey.pk, timezone.now()), 1)
+        self.assertEqual(self.get_counts(), {1: 1})
+
+    def test_command_refreshes_surveys_with_new_responses(self):
+        self.complete_response('1')
+        out = StringIO()
+        call_command('refresh_result_snapshots', '--settle-seconds', '0', stdout=out)
+        self.assertIn(f'Counted 1 responses in snapshot of survey {self.survey.pk}', out.getvalue())
+        self.assertEqual(self.get_counts(), {1: 1})
+
+        out = StringIO()
+        call_command('refresh_result_snapshots', '--settle-seconds', '0', stdout=out)
+        self.assertNotIn('Counted', out.getvalue())
+
+    def test_results_views_show_staleness(self):
+        self.complete_response('1')
+        self.client.force_login(get_user_model().objects.create(username='staff', is_staff=True))
+
+        response = self.client.get(reverse('survey:results_json', args=[self.survey.pk]))
+        self.assertEqual(response.json()['snapshot']['pending_responses'], 1)
+        response = self.client.get(reverse('survey:results', args=[self.survey.pk]))
+        self.assertContains(response, 'newer responses are not counted yet')
+
+    def test_admin_shows_snapshot(self):
+        self.complete_response('1')
+        refresh_snapshot(self.survey.pk, timezone.now())
+        self.client.force_login(get_user_model().objects.create(username='admin', is_staff=True,
+                                                                is_superuser=True))
+        response = self.client.get(reverse('admin:survey_survey_change', args=[self.survey.pk]))
+        self.assertContains(response, 'result snapshot')
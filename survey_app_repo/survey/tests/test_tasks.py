@@ -0,0 +1,115 @@
+'''Test cases for background tasks'''
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ..models import QueuedTask, QuestionResult, SurveyResponse, ResponseText, QuestionTypes
+from .. import tasks
+from ..tasks import task, get_executor, claim_tasks, run_pending_tasks, run_queued_task
+from . import factory
+
+calls = []
+
+
+@task
+def record_call(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise ValueError('Task failed')
+
+
+@override_settings(SURVEY_TASKS_EAGER=False, SURVEY_TASK_BACKEND='database')
+class TestDatabaseBackend(TestCase):
+    '''Test tasks queued in database are run by worker and retried when they fail'''
+
+    def setUp(self):
+        calls.clear()
+
+    def test_task_queued_and_run_by_worker(self):
+        record_call.enqueue('first')
+        record_call.enqueue(value='second')
+        self.assertEqual(calls, [])
+        self.assertEqual(QueuedTask.objects.count(), 2)
+
+        out = StringIO()
+        call_command('run_task_worker', '--once', stdout=out)
+        self.assertEqual(calls, ['first', 'second'])
+        self.assertEqual(QueuedTask.objects.count(), 0)
+        self.assertIn('Ran 2 tasks, 0 failed', out.getvalue())
+
+    @override_settings(SURVEY_TASK_MAX_ATTEMPTS=2, SURVEY_TASK_RETRY_DELAY=0)
+    def test_failed_task_retried_until_max_attempts(self):
+        record_call.enqueue('failing', fail=True)
+
+        self.assertEqual(run_pending_tasks(), (0, 1))
+        queued_task = QueuedTask.objects.get()
+        self.assertIn('Task failed', queued_task.last_error)
+        self.assertIsNotNone(queued_task.available_date)
+
+        self.assertEqual(run_pending_tasks(), (0, 1))
+        self.assertIsNone(QueuedTask.objects.get().available_date)
+        self.assertEqual(run_pending_tasks(), (0, 0))
+        self.assertEqual(calls, ['failing', 'failing'])
+
+    def test_claimed_task_not_run_again_while_locked(self):
+        record_call.enqueue('once')
+        QueuedTask.objects.update(available_date=None)
+        self.assertEqual(run_pending_tasks(), (0, 0))
+
+    def test_task_finished_by_other_worker_not_run_again(self):
+        record_call.enqueue('once')
+        queued_task, = claim_tasks(10, 300)
+        QueuedTask.objects.all().delete()
+
+        self.assertTrue(run_queued_task(queued_task))
+        self.assertEqual(calls, [])
+
+    def test_task_row_kept_when_task_fails(self):
+        record_call.enqueue('failing', fail=True)
+        queued_task, = claim_tasks(10, 300)
+
+        self.assertFalse(run_queued_task(queued_task))
+        self.assertEqual(QueuedTask.objects.get().pk, queued_task.pk)
+
+    def test_completed_response_added_to_results_by_worker(self):
+        survey = factory.create_survey_with_questions()
+        question, _ = factory.get_question_and_index_of_type(survey, QuestionTypes.TEXT.name)
+        survey_response = SurveyResponse.objects.create(survey=survey)
+        ResponseText.objects.create(survey_response=survey_response, question=question, response='Answer')
+
+        survey_response.complete()
+        self.assertFalse(QuestionResult.objects.exists())
+
+        run_pending_tasks()
+        self.assertEqual(QuestionResult.objects.get(question=question).answered_count, 1)
+
+
+@override_settings(SURVEY_TASKS_EAGER=False, SURVEY_TASK_BACKEND='thread')
+class TestThreadBackend(TransactionTestCase):
+    '''Test tasks run on thread pool only after enqueueing transaction commits'''
+
+    def setUp(self):
+        calls.clear()
+
+    def wait_for_tasks(self):
+        get_executor().shutdown()
+        tasks._executor = None
+
+    def test_task_run_after_commit(self):
+        with transaction.atomic():
+            record_call.enqueue('committed')
+            self.assertEqual(calls, [])
+        self.wait_for_tasks()
+        self.assertEqual(calls, ['committed'])
+
+    def test_task_not_run_on_rollback(self):
+        try:
+            with transaction.atomic():
+                record_call.enqueue('rolled back')
+                raise ValueError
+        except ValueError:
+            pass
+        self.wait_for_tasks()
+        self.assertEqual(calls, [])
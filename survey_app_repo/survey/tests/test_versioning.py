@@ -0,0 +1,142 @@
+'''Test cases for version stamps and cached page fragments'''
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ..models import Question, QuestionTypes, Survey, SurveyResponse
+from ..versioning import get_survey_key, get_survey_version, get_survey_list_version, get_version_timestamp
+from . import factory
+
+
+class TestVersioning(TestCase):
+    '''Test versions change with survey content and pages are served from cache until then'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+
+    def test_survey_version_changes_when_survey_or_question_changes(self):
+        version = get_survey_version(self.survey.pk)
+        self.assertEqual(get_survey_version(self.survey.pk), version)
+
+        self.survey.save()
+        self.assertNotEqual(get_survey_version(self.survey.pk), version)
+
+        version = get_survey_version(self.survey.pk)
+        self.survey.questions.first().delete()
+        self.assertNotEqual(get_survey_version(self.survey.pk), version)
+
+    def test_list_version_changes_when_response_completed(self):
+        version = get_survey_list_version()
+        SurveyResponse.objects.create(survey=self.survey).complete()
+        self.assertNotEqual(get_survey_list_version(), version)
+
+    @override_settings(SURVEY_LIST_COUNT_DELAY=60)
+    def test_list_version_replaced_at_most_once_per_delay(self):
+        version = get_survey_list_version()
+        SurveyResponse.objects.create(survey=self.survey).complete()
+        self.assertEqual(get_survey_list_version(), version)
+
+        with patch('survey_app_repo.survey.versioning.time.time', return_value=time.time() + 60):
+            changed = get_survey_list_version()
+            self.assertNotEqual(changed, version)
+            self.assertEqual(get_survey_list_version(), changed)
+
+    def test_unchanged_list_served_from_cache(self):
+        self.client.get(reverse('home'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        self.assertFalse([query for query in queries if 'survey_survey' in query['sql']])
+        self.assertContains(response, self.survey.title)
+
+        SurveyResponse.objects.create(survey=self.survey).complete()
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, '<div class="col-sm-1 resp_count">1</div>', html=True)
+
+    def test_detail_rendered_again_after_question_added(self):
+        url = self.survey.get_absolute_url()
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse([query for query in queries if 'survey_question' in query['sql']])
+
+        empty_survey = factory.create_surveys()[0]
+        self.assertContains(self.client.get(empty_survey.get_absolute_url()), 'disabled')
+        Question.objects.create(survey=empty_survey, question='New', description='',
+                                question_type=QuestionTypes.TEXT.name)
+        self.assertNotContains(self.client.get(empty_survey.get_absolute_url()), 'disabled')
+
+
+class TestConditionalGet(TestCase):
+    '''Test survey list and detail answer 304 while their version is unchanged'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+
+    def test_list_not_modified_until_response_completed(self):
+        response = self.client.get(reverse('home'))
+        self.assertIn('Cookie', response['Vary'])
+        self.assertEqual(response['Last-Modified'], http_date(get_version_timestamp(get_survey_list_version())))
+
+        response = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        SurveyResponse.objects.create(survey=self.survey).complete()
+        response = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_not_modified_without_reading_survey(self):
+        url = self.survey.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse([query for query in queries if 'survey_survey' in query['sql']])
+
+        self.survey.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_differs_for_logged_in_user(self):
+        url = self.survey.get_absolute_url()
+        anonymous = self.client.get(url)
+        self.assertIn('public', anonymous['Cache-Control'])
+
+        user = get_user_model().objects.create(username='dev')
+        self.client.force_login(user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], anonymous['ETag'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_missing_survey_still_404(self):
+        # ids of surveys of earlier tests are reused
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('survey:detail', args=[self.survey.pk + 10])).status_code, 404)
+        self.assertIsNone(cache.get(get_survey_key(self.survey.pk + 10)))
+
+    def test_deleted_survey_version_dropped(self):
+        url = self.survey.get_absolute_url()
+        self.client.get(url)
+        survey_id = self.survey.pk
+        Survey.objects.get(pk=survey_id).delete()
+
+        self.assertIsNone(cache.get(get_survey_key(survey_id)))
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertIsNone(cache.get(get_survey_key(survey_id)))
+
+    def test_etag_differs_per_language(self):
+        url = self.survey.get_absolute_url()
+        english = self.client.get(url, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertIn('Accept-Language', english['Vary'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=english['ETag'], HTTP_ACCEPT_LANGUAGE='de')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], english['ETag'])
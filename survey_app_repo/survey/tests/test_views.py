@@ -1,9 +1,14 @@
 '''Test cases for views'''
-from unittest.mock import patch, Mock
+import json
+import time
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse, resolve
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.http import QueryDict
 
 from .. import views
@@ -38,7 +43,18 @@ class TestSurveysView(TestCase):
         resp_counts = [SurveyResponse.objects.exclude(completed_date=None).filter(survey=survey).count()
                        for survey in all_surveys]
         response = self.client.get(reverse("home"))
-        self.assertEqual(response.context["surveys"], list(zip(all_surveys, resp_counts)))
+        self.assertEqual(list(response.context["surveys"]), list(all_surveys))
+        self.assertEqual([survey.completed_response_count for survey in response.context["surveys"]], resp_counts)
+
+    def test_query_count_does_not_grow_with_surveys(self):
+        '''Test surveys view runs same number of queries regardless of number of surveys'''
+        with CaptureQueriesContext(connection) as few_surveys:
+            self.client.get(reverse("home"))
+
+        factory.add_responses_to_surveys(factory.create_surveys())
+        with CaptureQueriesContext(connection) as more_surveys:
+            self.client.get(reverse("home"))
+        self.assertEqual(len(few_surveys), len(more_surveys))
 
 
 class TestSurveyView(TestCase):
@@ -101,14 +117,23 @@ class TestTakeSurveyView(TestCase):
         self.assertEqual(response.context['cur_index'], 2)
         self.assertEqual(response.context['next_url'], views.get_next_question_url(self.survey, 2))
 
-    @patch.object(views, 'get_or_create_survey_response')
-    def test_survey_response_id_cookie_set(self, mock_get_or_create_survey_response):
-        '''Test survey_response_id cookie is set when take survey url invoked'''
-        mock_get_or_create_survey_response.return_value = Mock(pk=15)
+    def test_survey_response_created_on_first_answer_only(self):
+        '''Test viewing questions doesn't create survey response and posting first answer does'''
         takesurvey_url = reverse('survey:take_survey', args=[self.survey.pk, 1])
         response = self.client.get(takesurvey_url)
-        mock_get_or_create_survey_response.assert_called_once_with(response.wsgi_request, self.survey)
-        self.assertEqual(response.cookies.get(f'survey_response_id_{self.survey.pk}').value, '15')
+        self.assertEqual(SurveyResponse.objects.count(), 0)
+        self.assertIsNone(response.cookies.get(f'survey_response_id_{self.survey.pk}'))
+
+        _, index = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        takesurvey_url = reverse('survey:take_survey', args=[self.survey.pk, index])
+        response = self.client.post(takesurvey_url, data=dict(response='First answer'))
+        survey_response = SurveyResponse.objects.get()
+        self.assertEqual(response.cookies.get(f'survey_response_id_{self.survey.pk}').value,
+                         factory.get_response_cookie(survey_response)[1])
+
+        self.client.post(takesurvey_url, data=dict(response='Changed answer'))
+        self.assertEqual(SurveyResponse.objects.count(), 1)
+        self.assertEqual(ResponseText.objects.get().response, 'Changed answer')
     
     def test_404_status_sent_if_survey_not_exists(self):
         '''Test 404 page is shown if survey does not exist'''
@@ -129,7 +154,7 @@ class TestTakeSurveyView(TestCase):
         self.assertIsNotNone(form, "Last question of fixture survey must have form")
 
         survey_response = SurveyResponse.objects.create(survey=self.survey)
-        self.client.cookies[f'survey_response_id_{self.survey.pk}'] = survey_response.pk
+        factory.set_response_cookie(self.client, survey_response)
 
         with patch.object(views, 'FormRegistar'):
             takesurvey_url = reverse('survey:take_survey', args=[self.survey.pk, last_index])
@@ -159,36 +184,56 @@ class TestTextQuestion(TestQuestionTypeSubView):
         ResponseText.objects.create(survey_response=survey_response, question=self.question,
                                     response="This response need to be preloaded")
         
-        self.client.cookies[f'survey_response_id_{self.survey.pk}'] = survey_response.pk
+        factory.set_response_cookie(self.client, survey_response)
 
         response = self.client.get(self.url)
         self.assertContains(response, "This response need to be preloaded")
 
+    def test_answer_loaded_without_looking_up_survey_response(self):
+        '''Test signed cookie is trusted so survey response row isn't read when showing question'''
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        ResponseText.objects.create(survey_response=survey_response, question=self.question, response='Saved')
+        factory.set_response_cookie(self.client, survey_response)
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Saved')
+        self.assertFalse([query for query in queries if 'FROM "survey_surveyresponse"' in query['sql']])
+
+    def test_tampered_cookie_is_ignored(self):
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        ResponseText.objects.create(survey_response=survey_response, question=self.question, response='Secret')
+        self.client.cookies[f'survey_response_id_{self.survey.pk}'] = f'{survey_response.pk}:{self.survey.pk}'
+
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'Secret')
+
     def test_forms_save_method_called_on_post_request(self):
         dummy_data = dict(name='my_name')
         dummy_post = QueryDict('', mutable=True)
         dummy_post.update(dummy_data)
         survey_response = SurveyResponse.objects.create(survey=self.survey)
         # when answer doesn't exists
-        self.client.cookies[f'survey_response_id_{self.survey.pk}'] = survey_response.pk
+        factory.set_response_cookie(self.client, survey_response)
         TextQuestionForm = FormRegistar.get_instance().get_form_class_for(self.question_type.name)
         
-        with patch.object(forms, 'TextQuestionForm', side_effect=TextQuestionForm) as MockTextQuestionForm:
-            TextQuestionForm.save = Mock()
+        with patch.object(forms, 'TextQuestionForm', side_effect=TextQuestionForm) as MockTextQuestionForm, \
+             patch.object(TextQuestionForm, 'save') as mock_save:
             self.client.post(self.url, data=dummy_data)
             MockTextQuestionForm.assert_called_once_with(data=dummy_post)
-            TextQuestionForm.save.assert_called_once_with()
+            mock_save.assert_called_once_with()
 
-        # when answer exists
-        answer = ResponseText.objects.create(question=self.question, survey_response=survey_response)
-        self.client.cookies[f'survey_response_id_{self.survey.pk}'] = survey_response.pk
+        # when answer exists it is upserted without being loaded
+        ResponseText.objects.create(question=self.question, survey_response=survey_response)
+        factory.set_response_cookie(self.client, survey_response)
         TextQuestionForm = FormRegistar.get_instance().get_form_class_for(self.question_type.name)
         
-        with patch.object(forms, 'TextQuestionForm', side_effect=TextQuestionForm) as MockTextQuestionForm:
-            TextQuestionForm.save = Mock()
+        with patch.object(forms, 'TextQuestionForm', side_effect=TextQuestionForm) as MockTextQuestionForm, \
+             patch.object(TextQuestionForm, 'save') as mock_save:
             self.client.post(self.url, data=dummy_data)
-            MockTextQuestionForm.assert_called_once_with(data=dummy_post, instance=answer)
-            TextQuestionForm.save.assert_called_once_with()
+            MockTextQuestionForm.assert_called_once_with(data=dummy_post)
+            mock_save.assert_called_once_with()
 
     def test_redirects_to_next_question_on_form_post(self):
         response = self.client.post(self.url, data=dict(response="Response from test_views.py"))
@@ -201,7 +246,7 @@ class TestFinishSurveyView(TestCase):
     def setUp(self):
         self.survey, self.survey_response = factory.create_survey_with_text_question_and_answer()
         self.cookie_key = f'survey_response_id_{self.survey.pk}'
-        self.client.cookies[self.cookie_key] = self.survey_response.pk
+        factory.set_response_cookie(self.client, self.survey_response)
 
     def test_renders_correct_template(self):
         response = self.client.get(reverse('survey:finish_survey', args=[self.survey.pk]))
@@ -212,11 +257,19 @@ class TestFinishSurveyView(TestCase):
         response = self.client.get(reverse('survey:finish_survey', args=[self.survey.pk]))
         self.assertEqual(response.context['survey'], self.survey)
 
-    def test_gives_404_if_no_survey_response(self):
-        '''Test gives 404 error if survey_response is invalid or doesn't exists'''
+    def test_renders_without_survey_response(self):
+        '''Test finish page is shown when nothing is answered yet'''
         del self.client.cookies[f'survey_response_id_{self.survey.pk}']
         response = self.client.get(reverse('survey:finish_survey', args=[self.survey.pk]))
-        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(response.context['survey_response'])
+        self.assertContains(response, 'no-answers')
+
+    def test_post_without_survey_response_creates_completed_response(self):
+        del self.client.cookies[f'survey_response_id_{self.survey.pk}']
+        response = self.client.post(reverse('survey:finish_survey', args=[self.survey.pk]), data={})
+        self.assertRedirects(response, reverse('survey:thank_you'))
+        self.assertEqual(SurveyResponse.objects.exclude(completed_date=None).count(), 1)
+        self.assertEqual(Survey.objects.get(pk=self.survey.pk).completed_response_count, 1)
 
     def test_post_updates_completed_date_of_survey_response(self):
         response = self.client.post(reverse('survey:finish_survey', args=[self.survey.pk]), data={})
@@ -224,8 +277,77 @@ class TestFinishSurveyView(TestCase):
         self.assertIsNotNone(changed_survey_response.completed_date)
         self.assertEqual(self.client.cookies.get(self.cookie_key)['max-age'],  0, "cookie for survey_response not cleared")
         self.assertRedirects(response, reverse('survey:thank_you'))
+
+    def test_post_increments_completed_response_count_once(self):
+        '''Test finishing increments survey counter and finishing again doesn't count twice'''
+        self.client.post(reverse('survey:finish_survey', args=[self.survey.pk]), data={})
+        self.assertEqual(Survey.objects.get(pk=self.survey.pk).completed_response_count, 1)
+
+        factory.set_response_cookie(self.client, self.survey_response)
+        self.client.post(reverse('survey:finish_survey', args=[self.survey.pk]), data={})
+        self.assertEqual(Survey.objects.get(pk=self.survey.pk).completed_response_count, 1)
         
 
+class TestSubmitSurveyView(TestCase):
+    '''Test case for submit_survey view'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+        self.question, _ = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        self.url = reverse('survey:submit_survey', args=[self.survey.pk])
+
+    def post_json(self, payload):
+        return self.client.post(self.url, data=json.dumps(payload), content_type='application/json')
+
+    def test_saves_all_answers_and_sets_cookie(self):
+        response = self.post_json({'answers': {str(self.question.pk): {'response': 'Batch answer'}}})
+        self.assertEqual(response.status_code, 200)
+
+        survey_response = SurveyResponse.objects.get()
+        self.assertEqual(response.json(), {'survey_response': survey_response.pk, 'completed': False})
+        self.assertEqual(ResponseText.objects.get(survey_response=survey_response).response, 'Batch answer')
+        self.assertEqual(response.cookies[f'survey_response_id_{self.survey.pk}'].value,
+                         factory.get_response_cookie(survey_response)[1])
+
+    def test_updates_existing_answer(self):
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        ResponseText.objects.create(survey_response=survey_response, question=self.question, response='old')
+        factory.set_response_cookie(self.client, survey_response)
+
+        self.post_json({'answers': {str(self.question.pk): {'response': 'new'}}})
+        self.assertEqual(ResponseText.objects.get().response, 'new')
+
+    def test_can_complete_response(self):
+        response = self.post_json({'answers': {str(self.question.pk): {'response': 'done'}}, 'complete': True})
+        self.assertTrue(response.json()['completed'])
+        self.assertIsNotNone(SurveyResponse.objects.get().completed_date)
+        self.assertEqual(Survey.objects.get(pk=self.survey.pk).completed_response_count, 1)
+
+    def test_invalid_answer_saves_nothing(self):
+        other_survey = factory.create_survey_with_questions()
+        response = self.post_json({'answers': {str(self.question.pk): {'response': 'x' * 401},
+                                               str(other_survey.questions.first().pk): {}}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {str(self.question.pk),
+                                                          str(other_survey.questions.first().pk)})
+        self.assertEqual(ResponseText.objects.count(), 0)
+        self.assertEqual(SurveyResponse.objects.count(), 0)
+        self.assertNotIn(f'survey_response_id_{self.survey.pk}', response.cookies)
+
+    def test_answer_not_object_gives_400(self):
+        response = self.post_json({'answers': {str(self.question.pk): 'text'}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][str(self.question.pk)]['__all__'][0]['code'], 'invalid')
+        self.assertEqual(SurveyResponse.objects.count(), 0)
+
+    def test_invalid_json_gives_400(self):
+        response = self.client.post(self.url, data='not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_not_allowed(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+
 class TestThankYouPage(TestCase):
     '''Test case for thank_you view'''
 
@@ -237,24 +359,95 @@ class TestThankYouPage(TestCase):
 class TestGetOrCreateSurveyResponse(TestCase):
     '''Test get_or_create_sruvey_response'''
 
+    def get_request(self, user=None, cookies=None):
+        request = RequestFactory().get('/')
+        request.user = user or AnonymousUser()
+        request.COOKIES.update(cookies or {})
+        return request
+
     def test_get_or_create_survey_response(self):
         User = get_user_model()
         user = User.objects.create(username='dev')
         survey = factory.create_survey_with_questions()
 
-        request = Mock()
-        request.user = user
-        request.COOKIES = {}
-
-        views.get_or_create_survey_response(request, survey)
+        views.get_or_create_survey_response(self.get_request(user), survey)
 
         survey_response = SurveyResponse.objects.first()
         self.assertEqual(survey_response.survey, survey)
         self.assertEqual(survey_response.user, user)
 
-        request.COOKIES = {f'survey_response_id_{survey.pk}': str(survey_response.pk)}
+        request = self.get_request(user, dict([factory.get_response_cookie(survey_response)]))
+        with self.assertNumQueries(1):
+            self.assertEqual(views.get_or_create_survey_response(request, survey), survey_response)
+        with self.assertNumQueries(0):
+            self.assertEqual(views.get_survey_response(request, survey), survey_response)
+
+    def test_get_survey_response_ignores_missing_forged_or_foreign_cookie(self):
+        survey = factory.create_survey_with_questions()
+        other_survey = factory.create_survey_with_questions()
+        other_response = SurveyResponse.objects.create(survey=other_survey)
+        cookie_name = f'survey_response_id_{survey.pk}'
+
+        self.assertIsNone(views.get_survey_response(self.get_request(), survey))
+
+        request = self.get_request(cookies={cookie_name: 'abc'})
+        self.assertIsNone(views.get_survey_response(request, survey))
+
+        request = self.get_request(cookies={cookie_name: str(other_response.pk)})
+        self.assertIsNone(views.get_survey_response(request, survey))
+
+        request = self.get_request(cookies={cookie_name: f'{other_response.pk}:{survey.pk}'})
+        self.assertIsNone(views.get_survey_response(request, survey))
+
+        _, other_value = factory.get_response_cookie(other_response)
+        request = self.get_request(cookies={cookie_name: other_value})
+        self.assertIsNone(views.get_survey_response(request, survey))
+        self.assertEqual(SurveyResponse.objects.count(), 1)
+
+    @override_settings(SURVEY_ABANDONED_RESPONSE_AGE=60)
+    def test_get_survey_response_ignores_expired_cookie(self):
+        survey = factory.create_survey_with_questions()
+        survey_response = SurveyResponse.objects.create(survey=survey)
+        request = self.get_request(cookies=dict([factory.get_response_cookie(survey_response)]))
+
+        with patch('time.time', return_value=time.time() + 120):
+            self.assertIsNone(views.get_survey_response(request, survey))
+
+
+class TestDeletedSurveyResponse(TestCase):
+    '''Test writes with valid token of deleted response start a new response'''
+
+    def setUp(self):
+        self.survey = factory.create_survey_with_questions()
+        survey_response = SurveyResponse.objects.create(survey=self.survey)
+        factory.set_response_cookie(self.client, survey_response)
+        survey_response.delete()
+
+    def test_answer_creates_new_response(self):
+        _, index = factory.get_question_and_index_of_type(self.survey, QuestionTypes.TEXT.name)
+        response = self.client.post(reverse('survey:take_survey', args=[self.survey.pk, index]),
+                                    data={'response': 'Answer'})
+
+        survey_response = SurveyResponse.objects.get()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(ResponseText.objects.get().survey_response, survey_response)
+        cookie_name, cookie_value = factory.get_response_cookie(survey_response)
+        self.assertEqual(response.cookies[cookie_name].value, cookie_value)
+
+    def test_finish_records_completion(self):
+        self.client.post(reverse('survey:finish_survey', args=[self.survey.pk]))
+
+        self.assertIsNotNone(SurveyResponse.objects.get().completed_date)
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.completed_response_count, 1)
+
+    def test_submit_creates_new_response(self):
+        response = self.client.post(reverse('survey:submit_survey', args=[self.survey.pk]),
+                                    data=json.dumps({'answers': {}, 'complete': True}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(SurveyResponse.objects.get().completed_date)
 
-        self.assertEqual(views.get_or_create_survey_response(request, survey), survey_response)
 
 class TestGetNextQuestionUrl(TestCase):
     '''Test get_next_question_url returns correct url'''
@@ -0,0 +1,61 @@
+'''Signed respondent tokens identifying survey response of a browser
+
+Token carries survey response id and survey id and is signed with HMAC in a cookie, so a request
+is checked and routed to its response without any database query and ids can't be forged. Only
+requests writing to the response check its row still exists.
+'''
+from django.conf import settings
+
+from .models import SurveyResponse
+
+COOKIE_SALT = 'survey.survey_response'
+
+
+def get_cookie_name(survey_id):
+    return f'survey_response_id_{survey_id}'
+
+
+def get_token_value(survey_response):
+    return f'{survey_response.pk}:{survey_response.survey_id}'
+
+
+def set_response_cookie(response, survey_response):
+    response.set_signed_cookie(get_cookie_name(survey_response.survey_id), get_token_value(survey_response),
+                               salt=COOKIE_SALT, httponly=True, max_age=settings.SURVEY_ABANDONED_RESPONSE_AGE)
+
+
+def delete_response_cookie(response, survey_id):
+    response.delete_cookie(get_cookie_name(survey_id))
+
+
+def get_survey_response_reference(request, survey_id):
+    '''returns SurveyResponse with only pk and survey_id set from signed cookie of request
+
+    the row is not loaded, None is returned if cookie is missing, forged, for other survey or
+    older than SURVEY_ABANDONED_RESPONSE_AGE after which its response may have been deleted
+    '''
+    value = request.get_signed_cookie(get_cookie_name(survey_id), default=None, salt=COOKIE_SALT,
+                                      max_age=settings.SURVEY_ABANDONED_RESPONSE_AGE)
+    try:
+        response_id, token_survey_id = [int(part) for part in value.split(':')]
+    except (AttributeError, ValueError):
+        return None
+
+    if token_survey_id != survey_id:
+        return None
+
+    survey_response = SurveyResponse(pk=response_id, survey_id=survey_id)
+    survey_response._state.adding = False
+    return survey_response
+
+
+def get_saved_survey_response(request, survey_id):
+    '''like get_survey_response_reference but checks its row still exists, for requests writing to it
+
+    a response deleted while its token is valid would otherwise fail writes of its answers and
+    completion, None is returned then so a new response is created and its token replaces the old one
+    '''
+    survey_response = get_survey_response_reference(request, survey_id)
+    if survey_response is not None and not SurveyResponse.objects.filter(pk=survey_response.pk).exists():
+        return None
+    return survey_response
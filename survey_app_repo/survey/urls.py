@@ -1,12 +1,20 @@
 '''url patterns for survey app'''
 from django.urls import path
-from .views import survey, take_survey, finish_survey, thank_you
+from .views import (survey, survey_bundle, results, results_json, search, export_responses, take_survey, finish_survey,
+                    submit_survey, thank_you)
 
 
 app_name = "survey"
 urlpatterns = [
     path("<int:pk>", survey, name="detail"),
+    path("<int:pk>/bundle.json", survey_bundle, name="bundle"),
+    path("<int:pk>/bundle/<str:version>.json", survey_bundle, name="bundle_version"),
+    path("<int:pk>/results", results, name="results"),
+    path("<int:pk>/results.json", results_json, name="results_json"),
+    path("<int:pk>/search", search, name="search"),
+    path("<int:pk>/export.<str:export_format>", export_responses, name="export"),
     path("takesurvey/<int:pk>/<int:index>", take_survey, name="take_survey"),
     path("takesurvey/finish/<int:survey_id>", finish_survey, name="finish_survey"),
+    path("takesurvey/submit/<int:survey_id>", submit_survey, name="submit_survey"),
     path("thank_you", thank_you, name="thank_you"),
 ]
@@ -0,0 +1,90 @@
+'''Version stamps of survey content used to key cached renderings
+
+A version is a random token replaced whenever content changes, so a cached rendering is never
+served after a change and losing a version from cache only makes it look changed. Versions are
+replaced when content changes and again after the change is committed, so anything rendered
+from data read before the commit is cached under a version that is already replaced. Response
+counts only mark the survey list changed, it is replaced at most once per SURVEY_LIST_COUNT_DELAY
+so the cached list and its ETag last while surveys collect responses.
+'''
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+SURVEY_LIST_KEY = 'survey:list:version'
+SURVEY_LIST_STALE_KEY = 'survey:list:stale'
+
+
+def get_survey_key(survey_id):
+    return f'survey:{survey_id}:version'
+
+
+def new_version():
+    return f'{int(time.time())}.{uuid.uuid4().hex}'
+
+
+def get_version(key, exists=None):
+    '''returns version of key, made when missing unless exists() tells its content doesn't exist, None then'''
+    version = cache.get(key)
+    if version is None:
+        if exists is not None and not exists():
+            return None
+        cache.add(key, new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_version_timestamp(version):
+    '''returns unix time version was made, None for versions without it'''
+    try:
+        return int(version.split('.', 1)[0])
+    except (AttributeError, ValueError):
+        return None
+
+
+def get_survey_version(survey_id, exists=None):
+    return get_version(get_survey_key(survey_id), exists)
+
+
+def get_survey_list_version():
+    version = get_version(SURVEY_LIST_KEY)
+    made = get_version_timestamp(version)
+    if (made is None or time.time() - made >= settings.SURVEY_LIST_COUNT_DELAY) and cache.get(SURVEY_LIST_STALE_KEY):
+        cache.delete(SURVEY_LIST_STALE_KEY)
+        cache.set(SURVEY_LIST_KEY, new_version(), None)
+        version = cache.get(SURVEY_LIST_KEY)
+    return version
+
+
+def bump_version(key):
+    def bump():
+        cache.set(key, new_version(), None)
+    bump()
+    transaction.on_commit(bump)
+
+
+def bump_survey_version(survey_id):
+    bump_version(get_survey_key(survey_id))
+
+
+def delete_survey_version(survey_id):
+    '''drop version of deleted survey now and after commit, so deleted ids keep nothing in cache'''
+    key = get_survey_key(survey_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def bump_survey_list_version():
+    bump_version(SURVEY_LIST_KEY)
+
+
+def survey_list_counts_changed():
+    '''mark response counts of survey list changed, its version is replaced when it is next read
+    if it is at least SURVEY_LIST_COUNT_DELAY seconds old, so counts are shown that much late at most'''
+    def mark():
+        cache.set(SURVEY_LIST_STALE_KEY, True, None)
+    mark()
+    transaction.on_commit(mark)
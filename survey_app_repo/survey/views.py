@@ -1,88 +1,265 @@
 '''module for views'''
+import hashlib
+import json
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
-from django.http import Http404
-from django.utils import timezone
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils import translation
+from django.utils.http import http_date
+from django.contrib.messages import get_messages
+from django.db import router, transaction
+from django.views.decorators.http import require_POST
+from django.contrib.admin.views.decorators import staff_member_required
+
+from survey_app_repo.utils.db_router import read_from_replica, stream_from, use_primary_if_changed_since
 
 from .models import Survey, Question, SurveyResponse
 from .forms import FormRegistar
+from .answers import validate_answers, store_response_answers
+from .question_index import get_question_index
+from .results import get_results
+from .analytics import get_statistics
+from .export import EXPORTERS, CONTENT_TYPES
+from .search import search_answers
+from .bundle import get_bundle
+from .versioning import get_survey_version, get_survey_list_version, get_version_timestamp
+from .tokens import (set_response_cookie, delete_response_cookie, get_survey_response_reference,
+                     get_saved_survey_response)
+
+SEARCH_PAGE_SIZE = 20
+BUNDLE_MAX_AGE = 365 * 24 * 60 * 60
+
 
+def render_conditional(request, version, template_name, get_context):
+    '''Render page of content version or answer 304 if client already has it
 
+    pages show navigation of user and are translated to active language so ETag differs per user
+    and language and response varies on cookie and Accept-Language, get_context is only called
+    when page is rendered and pages with messages are always rendered
+    '''
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    language = translation.get_language()
+    etag = 'W/"{}"'.format(hashlib.sha1(f'{version}:{user_id}:{language}'.encode()).hexdigest())
+    last_modified = get_version_timestamp(version)
+
+    response = None
+    if not len(get_messages(request)):
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        # page is cached under version so it must not be rendered from replica lagging behind it
+        with use_primary_if_changed_since(last_modified):
+            response = render(request, template_name, context=get_context())
+
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ['Cookie', 'Accept-Language'])
+    if user_id:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@read_from_replica
 def surveys(request):
     '''View to show list of all surveys'''
-    _surveys = Survey.objects.all()
-    resp_counts = [SurveyResponse.objects.exclude(completed_date=None).filter(survey=survey).count()
-                   for survey in _surveys]
-
-    context = dict(surveys=list(zip(_surveys, resp_counts)))
-    return render(request, 'survey/surveys.html', context=context)
+    version = get_survey_list_version()
+    return render_conditional(request, version, 'survey/surveys.html', lambda: dict(
+        surveys=Survey.objects.all(), version=version, cache_timeout=settings.SURVEY_FRAGMENT_CACHE_TIMEOUT))
 
 
+@read_from_replica
 def survey(request, pk):
-    '''Detail view for survey'''
+    '''Detail view for survey, survey isn't read when client has current version
+
+    only surveys with a cached version are known to exist, others are checked before a version is made
+    '''
+    version = get_survey_version(pk, exists=Survey.objects.filter(pk=pk).exists)
+    if version is None:
+        raise Http404('No Survey matches the given query.')
+    return render_conditional(request, version, 'survey/survey.html', lambda: dict(
+        survey=get_object_or_404(Survey, pk=pk), version=version,
+        cache_timeout=settings.SURVEY_FRAGMENT_CACHE_TIMEOUT))
+
+
+@read_from_replica
+def survey_bundle(request, pk, version=None):
+    '''Survey with its questions and answer form schemas as json, for clients taking survey in the browser
+
+    unversioned url is revalidated on each use with ETag, versioned url never changes so it is
+    cached for long and redirects to current version once survey changes
+    '''
     _survey = get_object_or_404(Survey, pk=pk)
-    return render(request, 'survey/survey.html', context=dict(survey=_survey))
+    current_version, etag, content = get_bundle(_survey)
+    if version is not None and version != current_version:
+        return redirect('survey:bundle_version', pk=_survey.pk, version=current_version)
 
-def take_survey(request, pk, index):
-    '''View where user responds to survey'''
+    response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    if version is None:
+        patch_cache_control(response, public=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=BUNDLE_MAX_AGE, immutable=True)
+    return get_conditional_response(request, etag=etag, response=response)
+
+@read_from_replica
+@staff_member_required
+def results(request, pk):
+    '''Results of survey read from per question aggregates'''
     _survey = get_object_or_404(Survey, pk=pk)
-    survey_response = get_or_create_survey_response(request, _survey)
+    return render(request, 'survey/results.html', context=dict(survey=_survey, results=get_results(_survey)))
+
+@read_from_replica
+@staff_member_required
+def results_json(request, pk):
+    '''Results of survey as json for live dashboards'''
+    _survey = get_object_or_404(Survey, pk=pk)
+    return JsonResponse(dict(survey=_survey.pk, completed_responses=_survey.completed_response_count,
+                             questions=get_results(_survey), statistics=get_statistics(_survey),
+                             snapshot=dict(completed_until=_survey.snapshot_completed_until,
+                                           refreshed_date=_survey.snapshot_refreshed_date,
+                                           pending_responses=_survey.snapshot_pending_count)))
+
+@read_from_replica
+@staff_member_required
+def search(request, pk):
+    '''Paginated full text search over answers of survey'''
+    _survey = get_object_or_404(Survey, pk=pk)
+    query = request.GET.get('q', '')
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    # one extra row tells if there is a next page without counting all matches
+    answers = search_answers(_survey, query, SEARCH_PAGE_SIZE + 1, (page - 1) * SEARCH_PAGE_SIZE)
+    context = dict(survey=_survey, query=query, page=page, answers=answers[:SEARCH_PAGE_SIZE],
+                   has_next=len(answers) > SEARCH_PAGE_SIZE)
+    return render(request, 'survey/search.html', context=context)
+
+@transaction.non_atomic_requests
+@read_from_replica
+@staff_member_required
+def export_responses(request, pk, export_format):
+    '''Streams responses of survey as csv or ndjson, rows are sent while they are read from database'''
+    _survey = get_object_or_404(Survey, pk=pk)
+    if export_format not in EXPORTERS:
+        raise Http404("Export format doesn't exists")
 
-    questions = Question.objects.filter(survey=_survey)
-    if index < 1 or index > questions.count():
+    completed_only = 'completed' in request.GET
+    # rows are read after view returns so database chosen for view is kept while streaming
+    rows = stream_from(router.db_for_read(SurveyResponse), EXPORTERS[export_format](_survey,
+                                                                                    completed_only=completed_only))
+    response = StreamingHttpResponse(rows, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="survey_{_survey.pk}.{export_format}"'
+    return response
+
+def take_survey(request, pk, index):
+    '''View where user responds to survey'''
+    question_index = get_question_index(pk)
+    if index < 1 or index > len(question_index):
         raise Http404("Question doesn't exists")
 
-    question = questions[index-1]
-    count = questions.count()
+    question_id, _ = question_index[index-1]
+    question = get_object_or_404(Question.objects.select_related('survey'), pk=question_id)
+    _survey = question.survey
+    survey_response = get_survey_response(request, _survey, request.method == "POST")
+
     form_registar = FormRegistar.get_instance()
     FormClass = form_registar.get_form_class_for(question.question_type)
 
     if request.method == "POST":
         question_form = FormClass.get_form_instance(question, survey_response, data=request.POST)
-        question_form.save()
-        return redirect(get_next_question_url(_survey, index))
-
-    question_form = FormClass.get_form_instance(question, survey_response)
+        if question_form is not None and question_form.is_valid():
+            # response is created with first answer, so page views alone never write to database
+            if survey_response is None:
+                survey_response = create_survey_response(request, _survey)
+                question_form.instance.survey_response = survey_response
+            question_form.save()
+            response = redirect(get_next_question_url(_survey, index))
+            set_response_cookie(response, survey_response)
+            return response
+    else:
+        question_form = FormClass.get_form_instance(question, survey_response)
 
-    response = render(request, f'survey/questions/{question.question_type}.html',
-                      context=dict(survey=_survey, question=question, cur_index=index,
-                                   next_url=get_next_question_url(_survey, index), form=question_form))
-
-    response.set_cookie(f'survey_response_id_{_survey.pk}', survey_response.pk)
-    return response
+    return render(request, f'survey/questions/{question.question_type}.html',
+                  context=dict(survey=_survey, question=question, cur_index=index,
+                               next_url=get_next_question_url(_survey, index), form=question_form))
 
 def finish_survey(request, survey_id):
     _survey = get_object_or_404(Survey, pk=survey_id)
-    response_id = request.COOKIES.get(f'survey_response_id_{_survey.pk}')
-    survey_response = get_object_or_404(SurveyResponse, pk=response_id)
+    survey_response = get_survey_response(request, _survey, request.method == "POST")
 
     if request.method == "POST":
-        survey_response.completed_date = timezone.now()
-        survey_response.save()
+        # survey without answered questions is completed with an empty response
+        if survey_response is None:
+            survey_response = create_survey_response(request, _survey)
+        survey_response.complete()
         response = redirect(reverse('survey:thank_you'))
-        response.delete_cookie(f'survey_response_id_{_survey.pk}')
+        delete_response_cookie(response, _survey.pk)
         return response
 
-    return render(request, 'survey/questions/finish.html', context=dict(survey=_survey))
+    return render(request, 'survey/questions/finish.html',
+                  context=dict(survey=_survey, survey_response=survey_response))
+
+@require_POST
+def submit_survey(request, survey_id):
+    '''Saves answers to all questions of survey posted as json in one request
+
+    expects {"answers": {"<question_id>": {<form data>}}, "complete": true|false}
+    '''
+    _survey = get_object_or_404(Survey, pk=survey_id)
+    try:
+        payload = json.loads(request.body)
+        answers = {int(question_id): data for question_id, data in payload.get('answers', {}).items()}
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'Invalid json payload'}, status=400)
+
+    errors = {question_id: {'__all__': [{'message': 'Answer must be an object', 'code': 'invalid'}]}
+              for question_id, data in answers.items() if not isinstance(data, dict)}
+    if errors:
+        return JsonResponse({'errors': errors}, status=400)
+
+    # answers are validated before response is created, so invalid payloads leave nothing behind
+    instances, errors = validate_answers(_survey.pk, answers)
+    if errors:
+        return JsonResponse({'errors': errors}, status=400)
+
+    survey_response = get_or_create_survey_response(request, _survey)
+    store_response_answers(survey_response, instances)
+
+    completed = bool(payload.get('complete')) and survey_response.complete()
+    response = JsonResponse({'survey_response': survey_response.pk, 'completed': completed})
+    if completed:
+        delete_response_cookie(response, _survey.pk)
+    else:
+        set_response_cookie(response, survey_response)
+    return response
 
 def thank_you(request):
     return render(request, 'survey/thank_you.html')
 
 def get_next_question_url(_survey, cur_index):
     index = cur_index + 1
-    if index > _survey.questions.count():
+    if index > len(get_question_index(_survey.pk)):
         return reverse('survey:finish_survey', args=[_survey.pk])
 
     return reverse('survey:take_survey', args=[_survey.pk, index])    
 
-def get_or_create_survey_response(request, _survey):
-    response_id = request.COOKIES.get(f'survey_response_id_{_survey.pk}')
-    response_id = int(response_id) if response_id is not None else None
-    user = request.user if request.user.is_authenticated else None
-
-    response_query = SurveyResponse.objects.filter(pk=response_id)
-
-    if response_query.count() > 0:
-        return response_query.first()
+def get_survey_response(request, _survey, for_write=False):
+    '''returns survey response of respondent from signed cookie without loading it,
+    None if nothing is answered yet, or when writing if the response no longer exists'''
+    if for_write:
+        return get_saved_survey_response(request, _survey.pk)
+    return get_survey_response_reference(request, _survey.pk)
 
+def create_survey_response(request, _survey):
+    user = request.user if request.user.is_authenticated else None
     return SurveyResponse.objects.create(survey=_survey, user=user)
+
+def get_or_create_survey_response(request, _survey):
+    return get_survey_response(request, _survey, for_write=True) or create_survey_response(request, _survey)
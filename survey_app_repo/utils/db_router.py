@@ -0,0 +1,107 @@
+"""
+Routing of reads to database replicas with read-your-writes stickiness.
+
+Writes always go to "default". Reads go to "default" too unless code opts in with
+read_from_replica / use_replica, which pick one of DATABASE_REPLICAS. After a request that may
+write, the client gets a cookie keeping its reads on the primary for
+DATABASE_REPLICA_STICKY_SECONDS, so a respondent always sees what they just wrote.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY = "default"
+STICKY_COOKIE = "use_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_local = threading.local()
+
+
+def get_replica():
+    """returns alias of a random replica, primary if there are none"""
+    return random.choice(settings.DATABASE_REPLICAS) if settings.DATABASE_REPLICAS else PRIMARY
+
+
+@contextmanager
+def use_database(alias):
+    previous = getattr(_local, "alias", None)
+    _local.alias = alias
+    try:
+        yield alias
+    finally:
+        _local.alias = previous
+
+
+def use_replica():
+    """read from a replica in the block, data written shortly before may not be there yet"""
+    return use_database(get_replica())
+
+
+def use_primary():
+    return use_database(PRIMARY)
+
+
+def use_primary_if_changed_since(timestamp):
+    """read from primary if content changed at unix time timestamp or later may not be replicated yet"""
+    if timestamp is None or time.time() - timestamp < settings.DATABASE_REPLICA_STICKY_SECONDS:
+        return use_primary()
+    return use_database(getattr(_local, "alias", None))
+
+
+def stream_from(alias, iterable):
+    """iterate iterable reading from alias, for streamed responses consumed after view returns"""
+    iterator = iter(iterable)
+    while True:
+        with use_database(alias):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def is_sticky(request):
+    return request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES
+
+
+def read_from_replica(view):
+    """decorate read only view so its queries go to a replica unless client has to stick to primary"""
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if is_sticky(request):
+            return view(request, *args, **kwargs)
+        with use_replica():
+            return view(request, *args, **kwargs)
+
+    return wrapped
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return getattr(_local, "alias", None) or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class StickyPrimaryMiddleware:
+    """Sets cookie keeping reads of client on primary for a while after a request that may write"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE, "1", max_age=settings.DATABASE_REPLICA_STICKY_SECONDS, httponly=True
+            )
+        return response
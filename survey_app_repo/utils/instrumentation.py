@@ -0,0 +1,194 @@
+"""
+Per request instrumentation of SQL, cache and template time, reported as Server-Timing
+headers and kept in a rolling window per view for the request stats endpoint.
+
+Everything is measured with a few counters in a thread local, so it is cheap enough to
+leave on in production. The window is kept per process.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import connections
+from django.template.base import Template
+
+from survey_app_repo.utils.stats import percentile
+
+_local = threading.local()
+_MISSING = object()
+
+
+class Measurement:
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+
+def current_measurement():
+    return getattr(_local, "measurement", None)
+
+
+class RequestStats:
+    """Rolling window of measurements of latest requests of each view"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.windows = defaultdict(self.new_window)
+
+    @staticmethod
+    def new_window():
+        return deque(maxlen=settings.REQUEST_STATS_WINDOW)
+
+    def add(self, view_name, total_time, measurement):
+        sample = (
+            total_time,
+            measurement.sql_time,
+            measurement.queries,
+            measurement.template_time,
+            measurement.cache_hits,
+            measurement.cache_misses,
+        )
+        with self.lock:
+            self.windows[view_name].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.windows.clear()
+
+    def summary(self):
+        with self.lock:
+            windows = {view_name: list(window) for view_name, window in self.windows.items()}
+
+        summary = {}
+        for view_name, samples in sorted(windows.items()):
+            total, sql, queries, template, hits, misses = zip(*samples)
+            total = sorted(total)
+            summary[view_name] = {
+                "requests": len(samples),
+                "p50_ms": percentile(total, 50),
+                "p95_ms": percentile(total, 95),
+                "p99_ms": percentile(total, 99),
+                "sql_ms_mean": sum(sql) / len(samples),
+                "queries_mean": sum(queries) / len(samples),
+                "template_ms_mean": sum(template) / len(samples),
+                "cache_hits": sum(hits),
+                "cache_misses": sum(misses),
+            }
+        return summary
+
+
+request_stats = RequestStats()
+
+
+def record_sql(execute, sql, params, many, context):
+    measurement = current_measurement()
+    if measurement is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        measurement.sql_time += (time.perf_counter() - start) * 1000
+        measurement.queries += 1
+
+
+def instrument_templates():
+    """Time outermost Template.render, included templates are part of their parent's time"""
+    original_render = Template.render
+    if getattr(original_render, "instrumented", False):
+        return
+
+    def render(self, context):
+        measurement = current_measurement()
+        if measurement is None:
+            return original_render(self, context)
+
+        measurement.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            measurement.template_depth -= 1
+            if measurement.template_depth == 0:
+                measurement.template_time += (time.perf_counter() - start) * 1000
+
+    render.instrumented = True
+    Template.render = render
+
+
+def instrument_cache(cache_class):
+    """Count hits and misses of get and get_many of cache backend class"""
+    if getattr(cache_class.get, "instrumented", False):
+        return
+    original_get, original_get_many = cache_class.get, cache_class.get_many
+    # BaseCache.get_many calls get for each key, those are counted by get already
+    count_get_many = original_get_many is not BaseCache.get_many
+
+    def get(self, key, default=None, version=None):
+        value = original_get(self, key, _MISSING, version)
+        measurement = current_measurement()
+        if measurement is not None:
+            if value is _MISSING:
+                measurement.cache_misses += 1
+            else:
+                measurement.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = original_get_many(self, keys, version)
+        measurement = current_measurement()
+        if measurement is not None:
+            measurement.cache_hits += len(values)
+            measurement.cache_misses += len(keys) - len(values)
+        return values
+
+    get.instrumented = True
+    cache_class.get = get
+    if count_get_many:
+        cache_class.get_many = get_many
+
+
+class ServerTimingMiddleware:
+    """Adds Server-Timing header with SQL, cache and template measurements to each response"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_templates()
+        for alias in settings.CACHES:
+            instrument_cache(type(caches[alias]))
+
+    def __call__(self, request):
+        measurement = _local.measurement = Measurement()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record_sql))
+                response = self.get_response(request)
+        finally:
+            _local.measurement = None
+        total_time = (time.perf_counter() - start) * 1000
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f"total;dur={total_time:.1f}",
+                f'sql;dur={measurement.sql_time:.1f};desc="{measurement.queries} queries"',
+                f"template;dur={measurement.template_time:.1f}",
+                f'cache;desc="{measurement.cache_hits} hits {measurement.cache_misses} misses"',
+            ]
+        )
+
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None:
+            request_stats.add(resolver_match.view_name, total_time, measurement)
+        return response
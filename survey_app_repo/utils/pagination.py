@@ -0,0 +1,106 @@
+"""
+Admin pagination for tables too large for exact counts and OFFSET pages.
+
+EstimatedCountPaginator reports the planner's row estimate instead of running COUNT(*) over a
+whole table, and KeysetPaginationMixin pages a change list by primary key, newest first, with
+links to older and newer rows, so every page is an index range scan however deep it is.
+"""
+from django.conf import settings
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+AFTER_VAR = "after"
+BEFORE_VAR = "before"
+
+
+def get_estimated_count(queryset):
+    """planner's estimate of rows of unfiltered queryset, None when filtered or not on Postgres"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or queryset.query.has_filters():
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    # reltuples is negative for tables never analyzed
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting with the planner's estimate once tables are larger than ADMIN_ESTIMATED_COUNT_THRESHOLD"""
+
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        estimate = get_estimated_count(self.object_list)
+        if estimate is not None and estimate > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            self.count_is_estimate = True
+            return estimate
+        return super().count
+
+
+def get_keyset_value(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class KeysetChangeList(ChangeList):
+    """Change list showing rows older than ?after=pk or newer than ?before=pk instead of page numbers"""
+
+    def __init__(self, request, *args, **kwargs):
+        self.after, self.before = request.keyset
+        super().__init__(request, *args, **kwargs)
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        per_page = self.list_per_page
+
+        if self.before is not None:
+            newer = list(
+                self.queryset.filter(pk__gt=self.before).order_by("pk").values_list("pk", flat=True)[: per_page + 1]
+            )
+            has_newer, has_older = len(newer) > per_page, True
+            result_list = list(self.queryset.filter(pk__in=newer[:per_page]))
+        else:
+            queryset = self.queryset if self.after is None else self.queryset.filter(pk__lt=self.after)
+            result_list = list(queryset[: per_page + 1])
+            has_newer, has_older = self.after is not None, len(result_list) > per_page
+            result_list = result_list[:per_page]
+
+        self.newer_url = self.get_query_string({BEFORE_VAR: result_list[0].pk}) if has_newer and result_list else None
+        self.older_url = self.get_query_string({AFTER_VAR: result_list[-1].pk}) if has_older and result_list else None
+        self.result_count = paginator.count
+        self.count_is_estimate = paginator.count_is_estimate
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = has_newer or has_older
+        self.paginator = paginator
+
+
+class KeysetPaginationMixin:
+    """ModelAdmin mixin paging change list by primary key, newest first, columns can't be sorted"""
+
+    ordering = ["-pk"]
+    sortable_by = ()
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    change_list_template = "admin/keyset_change_list.html"
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        # keyset parameters aren't lookups, so they are taken out before change list reads filters
+        request.GET = request.GET.copy()
+        request.keyset = (
+            get_keyset_value(request.GET.pop(AFTER_VAR, [None])[-1]),
+            get_keyset_value(request.GET.pop(BEFORE_VAR, [None])[-1]),
+        )
+        return super().changelist_view(request, extra_context)
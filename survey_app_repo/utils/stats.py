@@ -0,0 +1,11 @@
+"""
+Small statistics helpers shared by request instrumentation and the load test.
+"""
+import math
+
+
+def percentile(values, percent):
+    """nearest rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
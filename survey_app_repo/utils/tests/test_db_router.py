@@ -0,0 +1,41 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from survey_app_repo.survey.models import Survey, SurveyResponse
+from survey_app_repo.utils.db_router import STICKY_COOKIE, stream_from, use_replica
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], DATABASE_REPLICA_STICKY_SECONDS=0)
+class TestReplicaRouting(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        Survey.objects.create(title="Written to primary")
+        Survey.objects.using("replica").create(title="Only on replica")
+
+    def test_read_only_views_read_from_replica(self):
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "Only on replica")
+        self.assertNotContains(response, "Written to primary")
+
+    def test_writes_go_to_primary_and_client_sticks_to_it(self):
+        url = reverse("survey:submit_survey", args=[Survey.objects.get().pk])
+        with override_settings(DATABASE_REPLICA_STICKY_SECONDS=10):
+            response = self.client.post(url, data="{}", content_type="application/json")
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 10)
+        self.assertEqual(SurveyResponse.objects.count(), 1)
+        self.assertEqual(SurveyResponse.objects.using("replica").count(), 0)
+
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "Written to primary")
+
+    def test_recently_changed_content_rendered_from_primary(self):
+        with override_settings(DATABASE_REPLICA_STICKY_SECONDS=10):
+            response = self.client.get(reverse("home"))
+        self.assertContains(response, "Written to primary")
+
+    def test_stream_keeps_database_after_block(self):
+        with use_replica():
+            titles = stream_from("replica", (survey.title for survey in Survey.objects.all()))
+        self.assertEqual(list(titles), ["Only on replica"])
+        self.assertEqual(Survey.objects.get().title, "Written to primary")
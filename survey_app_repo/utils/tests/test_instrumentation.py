@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+
+from survey_app_repo.survey.tests import factory
+from survey_app_repo.utils import instrumentation
+from survey_app_repo.utils.instrumentation import Measurement, instrument_cache, request_stats
+
+
+class TestServerTimingMiddleware(TestCase):
+    def setUp(self):
+        request_stats.clear()
+        self.survey = factory.create_survey_with_questions()
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.survey.get_absolute_url())
+        metrics = {metric.split(";")[0]: metric for metric in response["Server-Timing"].split(", ")}
+
+        self.assertEqual(set(metrics), {"total", "sql", "template", "cache"})
+        self.assertRegex(metrics["sql"], r'sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertRegex(metrics["cache"], r'cache;desc="\d+ hits [1-9]\d* misses"')
+
+    def test_stats_endpoint_is_staff_only_and_aggregates_views(self):
+        for _ in range(3):
+            self.client.get(self.survey.get_absolute_url())
+        self.client.get(reverse("home"))
+
+        url = reverse("request_stats")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(get_user_model().objects.create(username="staff", is_staff=True))
+        stats = self.client.get(url).json()["views"]
+        self.assertEqual(stats["survey:detail"]["requests"], 3)
+        self.assertEqual(stats["home"]["requests"], 1)
+        self.assertGreater(stats["survey:detail"]["queries_mean"], 0)
+        self.assertIsNotNone(stats["survey:detail"]["p95_ms"])
+
+
+class TestInstrumentCache(TestCase):
+    """Test cache hits and misses are counted once per key"""
+
+    def setUp(self):
+        self.cache = caches["default"]
+        instrument_cache(type(self.cache))
+        self.cache.clear()
+        self.cache.set("present", 1)
+        self.measurement = instrumentation._local.measurement = Measurement()
+
+    def tearDown(self):
+        instrumentation._local.measurement = None
+
+    def test_get(self):
+        self.assertEqual(self.cache.get("present"), 1)
+        self.assertEqual(self.cache.get("missing", "default"), "default")
+        self.assertEqual((self.measurement.cache_hits, self.measurement.cache_misses), (1, 1))
+
+    def test_version_passed_positionally(self):
+        self.cache.set("versioned", 2, version=3)
+        self.assertEqual(self.cache.get("versioned", None, 3), 2)
+        self.assertEqual(self.cache.get_many(["versioned"], 3), {"versioned": 2})
+
+    def test_get_many_implemented_with_get(self):
+        self.assertEqual(self.cache.get_many(["present", "missing"]), {"present": 1})
+        self.assertEqual((self.measurement.cache_hits, self.measurement.cache_misses), (1, 1))
+
@@ -0,0 +1,101 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from survey_app_repo.survey.admin import ResponseChoiceAdmin, ResponseTextAdmin, SurveyResponseAdmin
+from survey_app_repo.survey.models import Question, QuestionTypes, ResponseChoice, ResponseText, Survey, SurveyResponse
+from survey_app_repo.utils.pagination import EstimatedCountPaginator, get_estimated_count
+
+
+class TestEstimatedCountPaginator(TestCase):
+    def setUp(self):
+        survey = Survey.objects.create(title="Survey")
+        SurveyResponse.objects.bulk_create([SurveyResponse(survey=survey) for _ in range(3)])
+
+    def test_exact_count_without_estimate(self):
+        self.assertIsNone(get_estimated_count(SurveyResponse.objects.all()))
+        paginator = EstimatedCountPaginator(SurveyResponse.objects.all(), 2)
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_is_estimate)
+
+    @mock.patch("survey_app_repo.utils.pagination.get_estimated_count", return_value=5000000)
+    def test_estimate_used_above_threshold(self, _):
+        paginator = EstimatedCountPaginator(SurveyResponse.objects.all(), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 5000000)
+        self.assertTrue(paginator.count_is_estimate)
+
+    @mock.patch("survey_app_repo.utils.pagination.get_estimated_count", return_value=10)
+    def test_exact_count_below_threshold(self, _):
+        self.assertEqual(EstimatedCountPaginator(SurveyResponse.objects.all(), 2).count, 3)
+
+
+@mock.patch.object(SurveyResponseAdmin, "list_per_page", 2)
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        survey = Survey.objects.create(title="Survey")
+        self.responses = [SurveyResponse.objects.create(survey=survey) for _ in range(5)]
+        self.client.force_login(get_user_model().objects.create(username="admin", is_staff=True, is_superuser=True))
+        self.url = reverse("admin:survey_surveyresponse_changelist")
+
+    def get_page(self, query=""):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        for query in queries:
+            self.assertNotIn("OFFSET", query["sql"])
+        return response.context["cl"]
+
+    def pks(self, changelist):
+        return [survey_response.pk for survey_response in changelist.result_list]
+
+    def test_pages_newest_first_by_primary_key(self):
+        pks = [survey_response.pk for survey_response in reversed(self.responses)]
+
+        changelist = self.get_page()
+        self.assertEqual(self.pks(changelist), pks[:2])
+        self.assertEqual(changelist.result_count, 5)
+        self.assertIsNone(changelist.newer_url)
+        self.assertEqual(changelist.older_url, f"?after={pks[1]}")
+
+        changelist = self.get_page(changelist.older_url)
+        self.assertEqual(self.pks(changelist), pks[2:4])
+        changelist = self.get_page(changelist.older_url)
+        self.assertEqual(self.pks(changelist), pks[4:])
+        self.assertIsNone(changelist.older_url)
+
+        changelist = self.get_page(changelist.newer_url)
+        self.assertEqual(self.pks(changelist), pks[2:4])
+        changelist = self.get_page(changelist.newer_url)
+        self.assertEqual(self.pks(changelist), pks[:2])
+        self.assertIsNone(changelist.newer_url)
+
+    def test_invalid_keyset_value_shows_first_page(self):
+        changelist = self.get_page("?after=abc")
+        self.assertEqual(len(changelist.result_list), 2)
+
+    def test_related_rows_not_queried_per_row(self):
+        survey = self.responses[0].survey
+        text_question = Question.objects.create(survey=survey, question="Why?", question_type=QuestionTypes.TEXT.name)
+        rating_question = Question.objects.create(
+            survey=survey, question="How good?", question_type=QuestionTypes.RATING.name
+        )
+        for survey_response in self.responses:
+            ResponseText.objects.create(survey_response=survey_response, question=text_question, response="Answer")
+            ResponseChoice.objects.create(survey_response=survey_response, question=rating_question, value=3)
+
+        for model_admin, url in [
+            (SurveyResponseAdmin, self.url),
+            (ResponseTextAdmin, reverse("admin:survey_responsetext_changelist")),
+            (ResponseChoiceAdmin, reverse("admin:survey_responsechoice_changelist")),
+        ]:
+            with self.subTest(model_admin.__name__), mock.patch.object(model_admin, "list_per_page", 2):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                with mock.patch.object(model_admin, "list_per_page", 5):
+                    with self.assertNumQueries(len(queries)):
+                        self.client.get(url)
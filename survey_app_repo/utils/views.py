@@ -0,0 +1,10 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .instrumentation import request_stats
+
+
+@staff_member_required
+def request_stats_view(request):
+    """Rolling latency percentiles, SQL, template and cache stats of each view in this process"""
+    return JsonResponse({"views": request_stats.summary()})